@@ -0,0 +1,84 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Run the client benchmarks and write the results as JSON.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --group search --group memory
+    python -m benchmarks compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import importlib
+import json
+import sys
+
+from benchmarks import harness
+
+MODULES = [
+    "benchmarks.bench_client",
+    "benchmarks.bench_build_response",
+    "benchmarks.bench_search",
+    "benchmarks.bench_memory",
+    "benchmarks.bench_rerank",
+    "benchmarks.bench_import",
+]
+
+
+def run(args: argparse.Namespace) -> int:
+    for module in MODULES:
+        importlib.import_module(module)
+
+    selected = [
+        bench
+        for bench in harness.BENCHMARKS
+        if (not args.group or bench.group in args.group)
+        and (not args.keyword or args.keyword in bench.name)
+    ]
+    results = harness.run_all(selected, rounds=args.rounds)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    regressions = harness.compare(
+        harness.load(args.baseline), harness.load(args.current), args.threshold
+    )
+    for regression in regressions:
+        print(regression)
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--group", action="append", help="only run this group")
+    parser.add_argument("-k", "--keyword", help="only run benchmarks matching this")
+    parser.add_argument("--rounds", type=int, help="override the number of rounds")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.set_defaults(func=run)
+
+    subparsers = parser.add_subparsers()
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare two result files and fail on regressions"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown of the median time (default: 0.1 = 10%%)",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Decode and validation cost of `build_response` for similarity search payloads of
+increasing size, and client-side cost of similarity searches in every validation mode.
+"""
+
+import json
+
+import httpx
+
+from benchmarks.fixtures import COLLECTION, CREDENTIALS, make_server, search_payload
+from benchmarks.harness import benchmark
+from pydi_client.api.search import SimilaritySearchAPI
+from pydi_client.api.utils import build_response
+from pydi_client.data.pipeline import V1SimilaritySearchResponse
+from pydi_client.sessions.session import Session
+
+server = make_server()
+
+for top_k in (10, 100, 1000):
+    payload = search_payload(server, top_k)
+    content = json.dumps(payload).encode()
+    response = httpx.Response(200, content=content)
+    rounds = 200 if top_k < 1000 else 50
+
+    def _build_response(response=response, validation="lenient"):
+        build_response(
+            response=response,
+            response_cls=V1SimilaritySearchResponse,
+            validation=validation,
+        )
+
+    def _decode(content=content):
+        json.loads(content)
+
+    def _validate(payload=payload):
+        V1SimilaritySearchResponse(**payload)
+
+    params = {"top_k": top_k, "payload_bytes": len(content)}
+    for name, func in (
+        ("build_response", _build_response),
+        ("decode", _decode),
+        ("validate", _validate),
+    ):
+        benchmark(
+            group="build_response",
+            name=f"{name}[top_k={top_k}]",
+            rounds=rounds,
+            **params,
+        )(func)
+    benchmark(
+        group="build_response",
+        name=f"build_response[top_k={top_k}][validation=strict]",
+        rounds=rounds,
+        validation="strict",
+        **params,
+    )(lambda func=_build_response: func(validation="strict"))
+
+    # the whole search, from the response bytes to the returned results, which is where
+    # the validation modes differ: trusted results skip the models
+    transport = httpx.MockTransport(
+        lambda request, content=content: httpx.Response(200, content=content)
+    )
+    for validation in ("strict", "lenient", "trusted"):
+        search_api = SimilaritySearchAPI(
+            Session(
+                uri=server.uri,
+                validation=validation,
+                httpx_args={"transport": transport},
+            )
+        )
+        benchmark(
+            group="build_response",
+            name=f"search[top_k={top_k}][validation={validation}]",
+            rounds=rounds,
+            validation=validation,
+            **params,
+        )(
+            lambda search_api=search_api, top_k=top_k: search_api.search(
+                collection_name=COLLECTION,
+                query="benchmark",
+                top_k=top_k,
+                **CREDENTIALS,
+            )
+            and None
+        )
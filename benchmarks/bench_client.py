@@ -0,0 +1,76 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Per-call client overhead of every DIClient/DIAdminClient method.
+
+The fake server answers in-process without latency, so the measured time is the cost of
+building the request, going through the session and transport, and decoding/validating
+the response.
+"""
+
+from benchmarks.fixtures import COLLECTION, CREDENTIALS, PIPELINE, make_server
+from benchmarks.harness import benchmark
+
+server = make_server()
+client = server.client()
+admin_client = server.admin_client()
+
+
+@benchmark(group="client", rounds=200)
+def get_collection():
+    client.get_collection(name=COLLECTION)
+
+
+@benchmark(group="client", rounds=200)
+def get_all_collections():
+    client.get_all_collections()
+
+
+@benchmark(group="client", rounds=200)
+def get_pipeline():
+    client.get_pipeline(name=PIPELINE)
+
+
+@benchmark(group="client", rounds=200)
+def get_all_pipelines():
+    client.get_all_pipelines()
+
+
+@benchmark(group="client", rounds=200)
+def get_model():
+    client.get_model(name="embedding-model")
+
+
+@benchmark(group="client", rounds=200)
+def get_all_models():
+    client.get_all_models()
+
+
+@benchmark(group="client", rounds=200, top_k=10)
+def similarity_search():
+    client.similarity_search(
+        collection_name=COLLECTION, query="benchmark", top_k=10, **CREDENTIALS
+    )
+
+
+@benchmark(group="admin", rounds=200)
+def get_schema():
+    admin_client.get_schema(name="default-schema")
+
+
+@benchmark(group="admin", rounds=200)
+def get_all_schemas():
+    admin_client.get_all_schemas()
+
+
+@benchmark(group="admin", rounds=200)
+def assign_buckets_to_collection():
+    admin_client.assign_buckets_to_collection(
+        collection_name=COLLECTION, buckets=["bucket-1"]
+    )
+
+
+@benchmark(group="admin", rounds=100)
+def create_and_delete_collection():
+    admin_client.create_collection(name="bench", pipeline=PIPELINE)
+    admin_client.delete_collection(name="bench")
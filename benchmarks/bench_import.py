@@ -0,0 +1,24 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Time to import the package in a fresh interpreter.
+"""
+
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import benchmark
+
+
+def _run(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+@benchmark(group="import", rounds=5, warmup=1)
+def import_time():
+    baseline = _run("pass")
+    total = _run("import pydi_client")
+    return {"import_seconds": total - baseline}
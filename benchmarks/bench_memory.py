@@ -0,0 +1,48 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Memory retained per similarity search result, for the default dictionaries and the compact
+`SearchHit` objects.
+"""
+
+import gc
+import tracemalloc
+
+from benchmarks.fixtures import COLLECTION, CREDENTIALS, make_server
+from benchmarks.harness import benchmark
+
+TOP_K = 1000
+
+server = make_server()
+client = server.client()
+
+for result_type in ("dict", "hit"):
+
+    def _search_result_memory(result_type=result_type):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            results = client.similarity_search(
+                collection_name=COLLECTION,
+                query="benchmark",
+                top_k=TOP_K,
+                result_type=result_type,
+                **CREDENTIALS,
+            )
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            "bytes_per_result": (after - before) / len(results),
+            "peak_bytes": peak - before,
+        }
+
+    benchmark(
+        group="memory",
+        name=f"search_result_memory[top_k={TOP_K}][result_type={result_type}]",
+        rounds=3,
+        warmup=1,
+        top_k=TOP_K,
+        result_type=result_type,
+    )(_search_result_memory)
@@ -0,0 +1,40 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Lexical reranking of similarity search results with BM25 and TF-IDF.
+
+The fake server returns the same text for every chunk, so the results are built from a
+random vocabulary instead, with chunks of about the size returned by DI.
+"""
+
+import random
+
+from benchmarks.harness import benchmark
+from pydi_client.api.rerank import LexicalReranker
+
+TOP_K = 1000
+WORDS_PER_CHUNK = 80
+
+_random = random.Random(0)
+_vocabulary = [f"term{index}" for index in range(5000)]
+results = [
+    {
+        "score": 1.0 - rank / (TOP_K + 1),
+        "dataChunk": " ".join(_random.choices(_vocabulary, k=WORDS_PER_CHUNK)),
+        "chunkMetadata": {"objectKey": f"object-{rank // 4}.txt"},
+    }
+    for rank in range(TOP_K)
+]
+query = " ".join(_random.choices(_vocabulary, k=8))
+
+for method in ("bm25", "tfidf"):
+    reranker = LexicalReranker(method=method)
+
+    benchmark(
+        group="rerank",
+        name=f"rerank[top_k={TOP_K}][method={method}]",
+        rounds=20,
+        warmup=2,
+        top_k=TOP_K,
+        method=method,
+    )(lambda reranker=reranker: reranker.rerank(query, results) and None)
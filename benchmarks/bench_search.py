@@ -0,0 +1,45 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Similarity search throughput at increasing client-side concurrency.
+
+Every search waits for a simulated server latency, so the achieved throughput shows how
+well the client overlaps requests from many threads sharing one DIClient.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import COLLECTION, CREDENTIALS, make_server
+from benchmarks.harness import benchmark
+
+SERVER_LATENCY = 0.002
+REQUESTS = 200
+
+server = make_server(latency=SERVER_LATENCY)
+client = server.client()
+
+
+def _search(_):
+    return client.similarity_search(
+        collection_name=COLLECTION, query="benchmark", top_k=10, **CREDENTIALS
+    )
+
+
+for concurrency in (1, 4, 16, 64):
+
+    def _throughput(concurrency=concurrency):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(_search, range(REQUESTS)))
+        elapsed = time.perf_counter() - start
+        return {"requests": REQUESTS, "throughput_rps": REQUESTS / elapsed}
+
+    benchmark(
+        group="search",
+        name=f"search_throughput[concurrency={concurrency}]",
+        rounds=3,
+        warmup=1,
+        concurrency=concurrency,
+        server_latency=SERVER_LATENCY,
+    )(_throughput)
@@ -0,0 +1,30 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+from typing import Any
+
+from pydi_client.testing import FakeDIServer
+
+COLLECTION = "docs"
+PIPELINE = "rag-pipeline"
+CREDENTIALS = {"access_key": "access-key", "secret_key": "secret-key"}
+
+
+def make_server(**kwargs: Any) -> FakeDIServer:
+    """Create a FakeDIServer with one pipeline and one collection to benchmark against."""
+    server = FakeDIServer(seed=0, **kwargs)
+    server.add_pipeline(name=PIPELINE)
+    server.add_collection(
+        name=COLLECTION, pipeline=PIPELINE, buckets=["bucket-1", "bucket-2"]
+    )
+    return server
+
+
+def search_payload(server: FakeDIServer, top_k: int) -> dict:
+    """Build the JSON payload the server returns for a search with `top_k` results."""
+    return {
+        "success": True,
+        "message": "Similarity search completed successfully.",
+        "results": server.search_results(
+            collection_name=COLLECTION, query="benchmark", top_k=top_k
+        ),
+    }
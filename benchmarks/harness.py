@@ -0,0 +1,170 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import json
+import platform
+import statistics
+import sys
+import time
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Optional
+
+# Registered benchmarks, in definition order
+BENCHMARKS: List["Benchmark"] = []
+
+
+class Benchmark:
+    """
+    A single registered benchmark.
+
+    The benchmark function receives no arguments and returns either None, in which case the
+    wall time of the call is measured, or a dictionary of extra metrics that are reported
+    as-is (e.g. throughput or memory measurements that do their own timing).
+    """
+
+    def __init__(
+        self,
+        func: Callable[[], Optional[Dict[str, Any]]],
+        *,
+        name: str,
+        group: str,
+        rounds: int,
+        warmup: int,
+        params: Dict[str, Any],
+    ) -> None:
+        self.func = func
+        self.name = name
+        self.group = group
+        self.rounds = rounds
+        self.warmup = warmup
+        self.params = params
+
+    def run(self, rounds: Optional[int] = None) -> Dict[str, Any]:
+        rounds = rounds or self.rounds
+        for _ in range(self.warmup):
+            self.func()
+
+        timings = []
+        extra: Dict[str, Any] = {}
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = self.func()
+            timings.append(time.perf_counter() - start)
+            if result:
+                extra = result
+
+        return {
+            "name": self.name,
+            "group": self.group,
+            "params": self.params,
+            "rounds": rounds,
+            "stats": _stats(timings),
+            "extra": extra,
+        }
+
+
+def benchmark(
+    *,
+    group: str,
+    name: Optional[str] = None,
+    rounds: int = 50,
+    warmup: int = 5,
+    **params: Any,
+) -> Callable:
+    """
+    Register a function as a benchmark.
+
+    Args:
+        group (str): Group the benchmark belongs to, e.g. "client" or "search".
+        name (Optional[str]): Benchmark name. Defaults to the function name followed by the params.
+        rounds (int): Number of measured calls.
+        warmup (int): Number of calls made before measuring.
+        **params: Parameters of the benchmark, reported with the results.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        suffix = "".join(f"[{key}={value}]" for key, value in params.items())
+        BENCHMARKS.append(
+            Benchmark(
+                func,
+                name=name or f"{func.__name__}{suffix}",
+                group=group,
+                rounds=rounds,
+                warmup=warmup,
+                params=params,
+            )
+        )
+        return func
+
+    return decorator
+
+
+def _stats(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    mean = statistics.fmean(ordered)
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": mean,
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "stddev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "ops": 1.0 / mean if mean else 0.0,
+    }
+
+
+def machine_info() -> Dict[str, Any]:
+    try:
+        version = metadata.version("pydi-client")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pydi_client": version,
+    }
+
+
+def run_all(
+    benchmarks: List[Benchmark], rounds: Optional[int] = None
+) -> Dict[str, Any]:
+    results = []
+    for bench in benchmarks:
+        result = bench.run(rounds)
+        results.append(result)
+        print(
+            f"{result['group']:>16} {result['name']:<56} "
+            f"median {result['stats']['median'] * 1e3:9.3f} ms",
+            file=sys.stderr,
+        )
+    return {
+        "machine_info": machine_info(),
+        "datetime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "benchmarks": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Compare two result files and return the benchmarks whose median time regressed by more
+    than `threshold` (e.g. 0.1 for 10%).
+    """
+    previous = {b["name"]: b["stats"]["median"] for b in baseline["benchmarks"]}
+    regressions = []
+    for bench in current["benchmarks"]:
+        before = previous.get(bench["name"])
+        after = bench["stats"]["median"]
+        if before and after > before * (1 + threshold):
+            regressions.append(
+                f"{bench['name']}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms "
+                f"(+{(after / before - 1) * 100:.1f}%)"
+            )
+    return regressions
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
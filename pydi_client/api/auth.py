@@ -2,10 +2,12 @@
 
 from pydi_client.sessions.authenticated_session import AuthenticatedSession
 from pydi_client.sessions.session import Session
+from pydi_client.sessions.token_cache import TokenCache
 from pydi_client.errors import NotImplementedException
 from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client import tracing
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import httpx
 
 # Initialize logger for this module
@@ -15,21 +17,56 @@ logger = get_logger()
 class AuthAPI:
 
     @classmethod
-    def login(cls, *, uri, username, password) -> AuthenticatedSession:
+    @tracing.traced()
+    def login(
+        cls,
+        *,
+        uri,
+        username,
+        password,
+        per_endpoint_tokens=False,
+        token_cache: Optional[TokenCache] = None,
+        **session_args,
+    ) -> AuthenticatedSession:
         """
         Login to the DI server using the provided username and password
         It returns the AuthenticatedSession object
+
+        Any additional keyword arguments (headers, timeout, httpx_args, balancer, limits,
+        scheduler, batcher, size_limits, compression, validation) are used for the login request and passed on to the returned
+        AuthenticatedSession.
+        When `uri` is a list of endpoints and `per_endpoint_tokens` is set, the returned
+        session logs in to every endpoint it sends requests to.
+        With a `token_cache` holding a valid token for the URI and username, no login request
+        is made; otherwise the token obtained by the login is stored in the cache.
         """
-        logger.info("Attempting to log in with username: %s", username)
+        if tracing.record_username:
+            tracing.set_current_attributes({tracing.ATTR_USERNAME: username})
+
+        if token_cache is not None:
+            token = token_cache.get(uri, username)
+            if token is not None:
+                logger.info("Using cached token for username: %s", username)
+                return AuthenticatedSession(  # type: ignore
+                    uri=uri,  # type: ignore
+                    token=token,  # type: ignore
+                    username=username,  # type: ignore
+                    password=password,  # type: ignore
+                    per_endpoint_tokens=per_endpoint_tokens,  # type: ignore
+                    token_cache=token_cache,  # type: ignore
+                    **session_args,
+                )
 
-        s = Session(uri=uri)  # type: ignore
+        logger.info("Attempting to log in with username: %s", username)
 
         _kwargs: Dict[str, Any] = {"method": "post", "url": "/api/v1/login"}
         _kwargs["data"] = {"username": username, "password": password}
 
-        response = s.get_httpx_client().request(
-            **_kwargs,
-        )
+        # the login connection is not reused, the authenticated session opens its own
+        with Session(uri=uri, **session_args) as s:  # type: ignore
+            response = s.get_httpx_client().request(
+                **_kwargs,
+            )
         logger.debug("Login response status code: %s", response.status_code)
 
         if response.status_code != httpx.codes.OK:
@@ -56,28 +93,69 @@ class AuthAPI:
             token=token,  # type: ignore
             username=username,  # type: ignore
             password=password,  # type: ignore
+            per_endpoint_tokens=per_endpoint_tokens,  # type: ignore
+            token_cache=token_cache,  # type: ignore
+            **session_args,
         )
+        if token_cache is not None:
+            token_cache.set(uri, username, token)
         logger.info("Login successful for username: %s", username)
         return authenticated_session
 
     @classmethod
-    def refresh(cls, *, session: AuthenticatedSession):
+    @tracing.traced()
+    def refresh(
+        cls, *, session: AuthenticatedSession, stale_token: Optional[str] = None
+    ):
         """
         Refresh the session
         This method uses the AuthenticatedSession class to refresh the session
-        """
-        logger.info("Refreshing session for username: %s", session.username)
-
-        new_session = AuthAPI.login(
-            uri=session.uri,
-            username=session.username,
-            password=session.password,
-        )
 
-        session.token = new_session.token
-        session.username = new_session.username
-        session.password = new_session.password
-        session.set_httpx_client(new_session.get_httpx_client())
+        Refreshes are single-flight: concurrent callers wait for the refresh in progress.
+        When `stale_token` (the token a request was rejected with) is given and the session
+        already holds another token, it was refreshed meanwhile and no new login is made.
+        The token is swapped atomically in the existing HTTP client, so requests in flight
+        are not affected.
+        """
+        with session._lock:
+            if stale_token is not None and session.token != stale_token:
+                logger.info(
+                    "Session already refreshed for username: %s", session.username
+                )
+                return
+
+            cache = session.token_cache
+            if cache is not None:
+                # another process may have logged in already
+                token = cache.get(session.uri, session.username)
+                if token is not None and token not in (session.token, stale_token):
+                    logger.info("Using cached token for username: %s", session.username)
+                    session.set_token(token)
+                    return
+
+            logger.info("Refreshing session for username: %s", session.username)
+            new_session = AuthAPI.login(
+                uri=session.uri,
+                username=session.username,
+                password=session.password,
+                headers={
+                    name: value
+                    for name, value in session._headers.items()
+                    if name != session.auth_header_name
+                },
+                timeout=session._timeout,
+                httpx_args=session._httpx_args,
+                balancer=session.balancer,
+                limits=session.limits,
+                scheduler=session.scheduler,
+                batcher=session.batcher,
+                size_limits=session.size_limits,
+                compression=session.compression,
+                per_endpoint_tokens=session.per_endpoint_tokens,
+            )
+            session.set_token(new_session.token)
+            if cache is not None:
+                cache.set(session.uri, session.username, new_session.token)
         logger.info("Session refreshed successfully for username: %s", session.username)
 
     @classmethod
@@ -0,0 +1,283 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Concurrent creation and deletion of several pipelines and collections.
+
+The operations are grouped in dependency tiers: pipelines are created before collections, and
+collections are deleted before pipelines. The operations of a tier run concurrently, and the
+next tier starts once every operation of the tier completed. `run_tiers` also runs the steps
+of `PlanAPI.apply`.
+"""
+
+import functools
+from collections import Counter
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple, Union, cast
+
+from pydi_client.sessions.authenticated_session import AuthenticatedSession
+from pydi_client.api.collection import CollectionAPI
+from pydi_client.api.pipeline import PipelineAPI
+from pydi_client.api.utils import error_message, submit_in_context
+from pydi_client.data.plan import (
+    BulkItemResult,
+    BulkResponse,
+    CollectionSpec,
+    PipelineSpec,
+)
+from pydi_client import tracing
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+# Initialize logger for this module
+logger = get_logger()
+
+PIPELINES = "pipelines"
+COLLECTIONS = "collections"
+# (key, operation) of the operations of a tier
+Tier = Sequence[Tuple[Hashable, Callable[[], Any]]]
+
+
+class _Failed(Exception):
+    """Stops a tier on the first failure."""
+
+
+def pipeline_arguments(spec: PipelineSpec) -> Dict[str, Any]:
+    """Keyword arguments of `PipelineAPI.create_pipeline` creating the pipeline of a spec."""
+    return dict(
+        name=spec.name,
+        pipeline_type=spec.pipeline_type,
+        event_filter_object_suffix=spec.event_filter_object_suffix,
+        event_filter_max_object_size=spec.event_filter_max_object_size,
+        schema=spec.schema_name,
+        model=spec.model,
+        custom_func=spec.custom_func,
+    )
+
+
+def run_tiers(
+    tiers: Sequence[Tier],
+    *,
+    max_workers: int,
+    stop_on_failure: bool = False,
+    stop_after_failed_tier: bool = False,
+) -> Dict[Hashable, BulkItemResult]:
+    """
+    Run tiers of operations in order, the operations of a tier concurrently.
+
+    Args:
+        tiers (Sequence[Tier]): The (key, operation) pairs of every tier.
+        max_workers (int): Maximum number of operations running at once.
+        stop_on_failure (bool): Skip the operations not started yet after a failure.
+        stop_after_failed_tier (bool): Skip the next tiers once an operation of a tier
+            failed, after the other operations of the tier completed.
+
+    Returns:
+        Dict[Hashable, BulkItemResult]: The outcome of every operation, by key, in order.
+    """
+    results: Dict[Hashable, BulkItemResult] = {}
+    stopped = False
+
+    def run(operation: Callable[[], Any]) -> BulkItemResult:
+        try:
+            response = operation()
+        except Exception as e:
+            result = BulkItemResult(success=False, error=error_message(e))
+        else:
+            # some responses report failures in their body
+            if getattr(response, "success", None) is False:
+                result = BulkItemResult(
+                    success=False,
+                    response=response,
+                    error=getattr(response, "message", None) or "Operation failed",
+                )
+            else:
+                result = BulkItemResult(success=True, response=response)
+        if not result.success and stop_on_failure:
+            raise _Failed(result)
+        return result
+
+    for tier in tiers:
+        if stopped:
+            for key, _ in tier:
+                results[key] = BulkItemResult(
+                    success=False,
+                    error="Skipped after an earlier failure",
+                    skipped=True,
+                )
+            continue
+        if not tier:
+            continue
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tier))) as executor:
+            futures = [
+                submit_in_context(executor, run, operation) for _, operation in tier
+            ]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            if any(future.done() and future.exception() for future in futures):
+                stopped = True
+                for future in futures:
+                    future.cancel()
+
+        for (key, _), future in zip(tier, futures):
+            if future.cancelled():
+                result = BulkItemResult(
+                    success=False,
+                    error="Skipped after an earlier failure",
+                    skipped=True,
+                )
+            elif isinstance(future.exception(), _Failed):
+                result = future.exception().args[0]  # type: ignore
+            else:
+                result = future.result()
+            results[key] = result
+            if not result.success and stop_after_failed_tier:
+                stopped = True
+    return results
+
+
+def _check_unique(kind: str, names: List[str]) -> None:
+    duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Duplicate {kind}: {', '.join(duplicates)}")
+
+
+class BulkAPI:
+    """
+    BulkAPI - a class to create and delete several pipelines and collections concurrently
+    It uses the AuthenticatedSession class to make HTTP requests to the server.
+    """
+
+    def __init__(self, session: AuthenticatedSession, *, max_workers: int = 8):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._session = session
+        self._max_workers = max_workers
+
+    @tracing.traced()
+    def create_many(
+        self,
+        *,
+        pipelines: Sequence[Union[PipelineSpec, Dict[str, Any]]] = (),
+        collections: Sequence[Union[CollectionSpec, Dict[str, Any]]] = (),
+        stop_on_failure: bool = False,
+    ) -> BulkResponse:
+        """
+        Create the pipelines, then the collections.
+
+        Args:
+            pipelines (Sequence[Union[PipelineSpec, Dict[str, Any]]]): The pipelines to
+                create, with the arguments of `create_pipeline`.
+            collections (Sequence[Union[CollectionSpec, Dict[str, Any]]]): The collections
+                to create.
+            stop_on_failure (bool): Skip the operations not started yet after a failure.
+
+        Returns:
+            BulkResponse: The outcome of every operation.
+
+        Raises:
+            ValueError: If two pipelines or two collections have the same name.
+        """
+        pipeline_api = PipelineAPI(session=self._session)
+        collection_api = CollectionAPI(session=self._session)
+        pipeline_specs = [PipelineSpec.model_validate(spec) for spec in pipelines]
+        collection_specs = [CollectionSpec.model_validate(spec) for spec in collections]
+        _check_unique(PIPELINES, [spec.name for spec in pipeline_specs])
+        _check_unique(COLLECTIONS, [spec.name for spec in collection_specs])
+
+        return self._run_tiers(
+            [
+                [
+                    (
+                        (PIPELINES, spec.name),
+                        functools.partial(
+                            pipeline_api.create_pipeline, **pipeline_arguments(spec)
+                        ),
+                    )
+                    for spec in pipeline_specs
+                ],
+                [
+                    (
+                        (COLLECTIONS, spec.name),
+                        functools.partial(
+                            collection_api.create_collection,
+                            name=spec.name,
+                            pipeline=spec.pipeline,
+                            buckets=spec.buckets or [],
+                        ),
+                    )
+                    for spec in collection_specs
+                ],
+            ],
+            stop_on_failure=stop_on_failure,
+        )
+
+    @tracing.traced()
+    def delete_many(
+        self,
+        *,
+        collections: Sequence[str] = (),
+        pipelines: Sequence[str] = (),
+        stop_on_failure: bool = False,
+    ) -> BulkResponse:
+        """
+        Delete the collections, then the pipelines.
+
+        Args:
+            collections (Sequence[str]): Names of the collections to delete.
+            pipelines (Sequence[str]): Names of the pipelines to delete.
+            stop_on_failure (bool): Skip the operations not started yet after a failure.
+
+        Returns:
+            BulkResponse: The outcome of every operation.
+        """
+        pipeline_api = PipelineAPI(session=self._session)
+        collection_api = CollectionAPI(session=self._session)
+        return self._run_tiers(
+            [
+                [
+                    (
+                        (COLLECTIONS, name),
+                        functools.partial(collection_api.delete_collection, name=name),
+                    )
+                    for name in dict.fromkeys(collections)
+                ],
+                [
+                    (
+                        (PIPELINES, name),
+                        functools.partial(pipeline_api.delete_pipeline, name=name),
+                    )
+                    for name in dict.fromkeys(pipelines)
+                ],
+            ],
+            stop_on_failure=stop_on_failure,
+        )
+
+    def _run_tiers(
+        self, tiers: Sequence[Tier], *, stop_on_failure: bool
+    ) -> BulkResponse:
+        results: Dict[str, Dict[str, BulkItemResult]] = {PIPELINES: {}, COLLECTIONS: {}}
+        for key, result in run_tiers(
+            tiers, max_workers=self._max_workers, stop_on_failure=stop_on_failure
+        ).items():
+            kind, name = cast(Tuple[str, str], key)
+            results[kind][name] = result
+
+        success = all(
+            result.success
+            for by_name in results.values()
+            for result in by_name.values()
+        )
+        if not success:
+            logger.error(
+                "Failed operations: %s",
+                {
+                    f"{kind} {name}": result.error
+                    for kind, by_name in results.items()
+                    for name, result in by_name.items()
+                    if not result.success and not result.skipped
+                },
+            )
+        return BulkResponse(
+            success=success,
+            pipelines=results[PIPELINES],
+            collections=results[COLLECTIONS],
+        )
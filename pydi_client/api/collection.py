@@ -1,6 +1,10 @@
 # Copyright Hewlett Packard Enterprise Development LP
 
-from typing import Any, Dict, Optional, Union, List, Type
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Optional, Tuple, Union, List, Type
+
+import httpx
 
 from pydi_client.sessions.authenticated_session import AuthenticatedSession
 from pydi_client.sessions.session import Session
@@ -10,16 +14,28 @@ from pydi_client.data.collection_manager import (
     V1DeleteCollectionResponse,
     ListCollection,
 )
-from pydi_client.data.pipeline import BucketUpdateResponse
+from pydi_client.data.pipeline import BucketUpdateResponse, BulkBucketUpdateResponse
 from pydi_client.errors import (
     NotImplementedException,
+    UnexpectedStatus,
+)
+from pydi_client.sessions.limits import OVERLOAD_STATUSES, retry_after
+from pydi_client.api.utils import (
+    execute_with_retry,
+    build_response,
+    error_message,
+    submit_in_context,
 )
-from pydi_client.api.utils import execute_with_retry, build_response
+from pydi_client import tracing
 from pydi_client.logger import get_logger  # Importing the logger utility
 
 # Initialize logger for this module
 logger = get_logger()
 
+# Statuses of bucket update requests worth retrying
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+ProgressCallback = Callable[[int, int], None]
+
 
 class MethodFactory:
     BASE_URL = "/api/v1/collections"
@@ -86,6 +102,12 @@ class CollectionAPI:
             "CollectionAPI initialized with session: %s", type(session).__name__
         )
 
+    @tracing.traced(
+        attributes={
+            tracing.ATTR_COLLECTION_NAME: "name",
+            tracing.ATTR_PIPELINE_NAME: "pipeline",
+        }
+    )
     def create_collection(
         self,
         *,
@@ -111,9 +133,12 @@ class CollectionAPI:
         )
         logger.info("Collection created successfully: %s", name)
         return build_response(
-            response=response, response_cls=DataModelFactory.create_collection()
+            response=response,
+            response_cls=DataModelFactory.create_collection(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced()
     def get_collections(
         self,
     ) -> ListCollection:
@@ -128,9 +153,12 @@ class CollectionAPI:
         )
         logger.info("Fetched all collections successfully")
         return build_response(
-            response=response, response_cls=DataModelFactory.get_collections()
+            response=response,
+            response_cls=DataModelFactory.get_collections(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced(attributes={tracing.ATTR_COLLECTION_NAME: "name"})
     def get_collection(self, *, name: str) -> V1CollectionResponse:
         logger.info("Fetching collection with name: %s", name)
         kwargs: Dict[str, Any] = MethodFactory().get_collection(name=name)
@@ -143,9 +171,12 @@ class CollectionAPI:
         )
         logger.info("Fetched collection successfully: %s", name)
         return build_response(
-            response=response, response_cls=DataModelFactory.get_collection()
+            response=response,
+            response_cls=DataModelFactory.get_collection(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced(attributes={tracing.ATTR_COLLECTION_NAME: "name"})
     def delete_collection(self, *, name: str) -> V1DeleteCollectionResponse:
         logger.info("Deleting collection with name: %s", name)
         kwargs: Dict[str, Any] = MethodFactory().delete_collection(name=name)
@@ -158,9 +189,12 @@ class CollectionAPI:
         )
         logger.info("Deleted collection successfully: %s", name)
         return build_response(
-            response=response, response_cls=DataModelFactory.delete_collection()
+            response=response,
+            response_cls=DataModelFactory.delete_collection(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced(attributes={tracing.ATTR_COLLECTION_NAME: "collection_name"})
     def assign_buckets_to_collection(
         self, *, collection_name: str, buckets: List[str]
     ) -> BucketUpdateResponse:
@@ -176,9 +210,12 @@ class CollectionAPI:
         )
         logger.info("Buckets assigned successfully to collection: %s", collection_name)
         return build_response(
-            response=response, response_cls=DataModelFactory.assign_buckets()
+            response=response,
+            response_cls=DataModelFactory.assign_buckets(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced(attributes={tracing.ATTR_COLLECTION_NAME: "collection_name"})
     def unassign_buckets_from_collection(
         self, *, collection_name: str, buckets: List[str]
     ) -> BucketUpdateResponse:
@@ -196,5 +233,184 @@ class CollectionAPI:
             "Buckets unassigned successfully from collection: %s", collection_name
         )
         return build_response(
-            response=response, response_cls=DataModelFactory.unassign_buckets()
+            response=response,
+            response_cls=DataModelFactory.unassign_buckets(),
+            validation=self._session.validation,
+        )
+
+    @tracing.traced(attributes={tracing.ATTR_COLLECTION_NAME: "collection_name"})
+    def assign_buckets_bulk(
+        self,
+        *,
+        collection_name: str,
+        buckets: List[str],
+        chunk_size: int = 100,
+        max_concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+        progress: Optional[ProgressCallback] = None,
+    ) -> BulkBucketUpdateResponse:
+        """
+        Assign many buckets to a collection, `chunk_size` buckets per request with up to
+        `max_concurrency` requests at once.
+
+        Assigning buckets is idempotent, so a chunk failing with a transport error or a
+        429/5xx status is sent again up to `retries` times, waiting `backoff` seconds doubled
+        at every attempt, or as long as asked by the `Retry-After` header of a 429/503
+        response. A chunk rejected with 413 is split in halves. A chunk failing otherwise,
+        e.g. with an unexpected response, does not stop the other chunks: its buckets are
+        reported in `failed`.
+
+        Args:
+            collection_name (str): The name of the collection.
+            buckets (List[str]): The buckets to assign. Duplicates are sent once.
+            chunk_size (int): Number of buckets per request.
+            max_concurrency (int): Maximum number of requests sent at once.
+            retries (int): Number of retries of a failed chunk.
+            backoff (float): Seconds waited before the first retry of a chunk.
+            progress (Optional[Callable[[int, int], None]]): Called from the calling thread
+                after every chunk with the number of buckets processed and the total.
+
+        Returns:
+            BulkBucketUpdateResponse: The buckets updated and the ones which failed.
+        """
+        return self._update_buckets_bulk(
+            self.assign_buckets_to_collection,
+            collection_name=collection_name,
+            buckets=buckets,
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            retries=retries,
+            backoff=backoff,
+            progress=progress,
+        )
+
+    @tracing.traced(attributes={tracing.ATTR_COLLECTION_NAME: "collection_name"})
+    def unassign_buckets_bulk(
+        self,
+        *,
+        collection_name: str,
+        buckets: List[str],
+        chunk_size: int = 100,
+        max_concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+        progress: Optional[ProgressCallback] = None,
+    ) -> BulkBucketUpdateResponse:
+        """
+        Unassign many buckets from a collection, `chunk_size` buckets per request with up to
+        `max_concurrency` requests at once. The arguments are the same as for
+        `assign_buckets_bulk`.
+        """
+        return self._update_buckets_bulk(
+            self.unassign_buckets_from_collection,
+            collection_name=collection_name,
+            buckets=buckets,
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            retries=retries,
+            backoff=backoff,
+            progress=progress,
+        )
+
+    def _update_buckets_bulk(
+        self,
+        update: Callable[..., BucketUpdateResponse],
+        *,
+        collection_name: str,
+        buckets: List[str],
+        chunk_size: int,
+        max_concurrency: int,
+        retries: int,
+        backoff: float,
+        progress: Optional[ProgressCallback],
+    ) -> BulkBucketUpdateResponse:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        buckets = list(dict.fromkeys(buckets))
+        chunks = [
+            buckets[start : start + chunk_size]
+            for start in range(0, len(buckets), chunk_size)
+        ]
+        logger.info(
+            "Updating %d buckets of collection %s in %d requests",
+            len(buckets),
+            collection_name,
+            len(chunks),
+        )
+
+        def send(chunk: List[str]) -> List[Tuple[List[str], Any]]:
+            attempt = 0
+            while True:
+                delay = backoff * 2**attempt
+                try:
+                    return [
+                        (chunk, update(collection_name=collection_name, buckets=chunk))
+                    ]
+                except UnexpectedStatus as e:
+                    if e.status_code == 413 and len(chunk) > 1:
+                        middle = len(chunk) // 2
+                        logger.debug(
+                            "Bucket update of %d buckets too large, splitting it",
+                            len(chunk),
+                        )
+                        return send(chunk[:middle]) + send(chunk[middle:])
+                    error: Exception = e
+                    retryable = e.status_code in RETRYABLE_STATUSES
+                    if e.status_code in OVERLOAD_STATUSES:
+                        delay = retry_after(e.headers) or delay
+                except httpx.TransportError as e:
+                    error, retryable = e, True
+                except Exception as e:
+                    # e.g. a failed login or an invalid response, reported for the chunk only
+                    error, retryable = e, False
+                if not retryable or attempt >= retries:
+                    return [(chunk, error)]
+                logger.warning(
+                    "Bucket update of %d buckets failed (%s), retrying",
+                    len(chunk),
+                    error,
+                )
+                time.sleep(delay)
+                attempt += 1
+
+        # error message of every bucket, None when updated
+        outcome: Dict[str, Optional[str]] = {}
+        responses: List[BucketUpdateResponse] = []
+        done = 0
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(chunks) or 1)
+        ) as executor:
+            futures = [submit_in_context(executor, send, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for chunk, result in future.result():
+                    message: Optional[str] = None
+                    if isinstance(result, Exception):
+                        message = error_message(result)
+                    elif result is not None and not result.success:
+                        message = result.message or "Bucket update failed"
+                    if isinstance(result, BucketUpdateResponse):
+                        responses.append(result)
+                    outcome.update(dict.fromkeys(chunk, message))
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, len(buckets))
+
+        failed = {
+            bucket: outcome[bucket] for bucket in buckets if outcome[bucket] is not None
+        }
+        if failed:
+            logger.error(
+                "Failed to update %d of %d buckets of collection %s",
+                len(failed),
+                len(buckets),
+                collection_name,
+            )
+        return BulkBucketUpdateResponse(
+            success=not failed,
+            succeeded=[bucket for bucket in buckets if outcome[bucket] is None],
+            failed=failed,  # type: ignore
+            responses=responses,
         )
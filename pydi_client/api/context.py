@@ -0,0 +1,244 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Assembly of similarity search results into the context of a LLM prompt.
+
+Search results of the same object often overlap or sit next to each other, and the same
+text may be returned for several objects, so sending the results as they are wastes tokens.
+`assemble_context` removes the repeated chunks, merges the results of every object and
+version whose character ranges (`startCharIndex`/`endCharIndex`) overlap or touch, and keeps
+the best passages, by score, which fit into a character and/or token budget.
+"""
+
+import math
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydi_client import tracing
+from pydi_client.data.pipeline import ContextPassage, SearchHit
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+# Initialize logger for this module
+logger = get_logger()
+
+
+class _Chunk(NamedTuple):
+    # ordering key: the score, or minus the position of ranked results
+    priority: float
+    score: float
+    text: str
+    objectKey: Optional[str]
+    bucketName: Optional[str]
+    versionId: Optional[str]
+    start: Optional[int]
+    end: Optional[int]
+    pageLabel: Optional[str]
+
+
+def approximate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text, about 4 characters per token."""
+    return math.ceil(len(text) / 4)
+
+
+def assemble_context(
+    results: Iterable[Union[SearchHit, Dict[str, Any]]],
+    *,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    count_tokens: Callable[[str], int] = approximate_tokens,
+    ranked: bool = False,
+) -> List[ContextPassage]:
+    """
+    Assemble similarity search results into non-redundant passages of context.
+
+    The results, as dictionaries or `SearchHit` objects, are processed as follows:
+
+    - chunks whose text was already returned with a higher score are dropped;
+    - the chunks of the same bucket, object and version are sorted by offset and merged
+      when their character ranges overlap or touch, in O(n log n). Chunks without offsets,
+      or whose text length does not match them, are kept as passages of their own;
+    - the passages are ranked by their highest score and added while they fit into the
+      budget. A passage larger than the remaining budget is skipped, so smaller passages
+      with lower scores may still be added.
+
+    Args:
+        results (Iterable[Union[SearchHit, Dict[str, Any]]]): Similarity search results.
+        max_chars (Optional[int]): Maximum total number of characters of the passages.
+        max_tokens (Optional[int]): Maximum total number of tokens of the passages.
+        count_tokens (Callable[[str], int]): Function counting the tokens of a text, e.g.
+            the tokenizer of the LLM. Defaults to an estimate of 4 characters per token.
+        ranked (bool): The results are in order of relevance, e.g. reranked by a
+            `LexicalReranker`: their position is used instead of their score to drop the
+            repeated chunks and rank the passages.
+
+    Returns:
+        List[ContextPassage]: The passages, highest score (or best ranked) first.
+    """
+    with tracing.start_span("pydi.assemble"):
+        chunks = _deduplicate(
+            _chunk(result, -position if ranked else None)
+            for position, result in enumerate(results)
+        )
+        ranked_passages = _merge(chunks)
+        ranked_passages.sort(key=lambda passage: passage[0], reverse=True)
+        selected = _pack(
+            [passage for _, passage in ranked_passages],
+            max_chars,
+            max_tokens,
+            count_tokens,
+        )
+    logger.debug(
+        "Assembled %d passages from %d distinct chunks", len(selected), len(chunks)
+    )
+    return selected
+
+
+def _chunk(
+    result: Union[SearchHit, Dict[str, Any]], priority: Optional[float]
+) -> _Chunk:
+    if isinstance(result, SearchHit):
+        return _Chunk(
+            result.score if priority is None else priority,
+            result.score,
+            result.dataChunk,
+            result.objectKey,
+            result.bucketName,
+            result.versionId,
+            result.startCharIndex,
+            result.endCharIndex,
+            result.pageLabel,
+        )
+    metadata = result.get("chunkMetadata") or {}
+    score = float(result["score"])
+    start = metadata.get("startCharIndex")
+    end = metadata.get("endCharIndex")
+    return _Chunk(
+        score if priority is None else priority,
+        score,
+        result["dataChunk"],
+        metadata.get("objectKey"),
+        metadata.get("bucketName"),
+        metadata.get("versionId"),
+        None if start is None else int(start),
+        None if end is None else int(end),
+        metadata.get("pageLabel"),
+    )
+
+
+def _deduplicate(chunks: Iterable[_Chunk]) -> List[_Chunk]:
+    """Keep the highest priority chunk of every text, highest priority first."""
+    best: Dict[str, _Chunk] = {}
+    for chunk in chunks:
+        kept = best.get(chunk.text)
+        if kept is None or chunk.priority > kept.priority:
+            best[chunk.text] = chunk
+    return sorted(best.values(), key=lambda chunk: chunk.priority, reverse=True)
+
+
+def _passage(chunk: _Chunk) -> ContextPassage:
+    return ContextPassage(
+        text=chunk.text,
+        score=chunk.score,
+        objectKey=chunk.objectKey,
+        bucketName=chunk.bucketName,
+        versionId=chunk.versionId,
+        startCharIndex=chunk.start,
+        endCharIndex=chunk.end,
+        pageLabels=() if chunk.pageLabel is None else (chunk.pageLabel,),
+    )
+
+
+def _merge(chunks: List[_Chunk]) -> List[Tuple[float, ContextPassage]]:
+    """
+    Merge the chunks of every object whose character ranges overlap or touch, and get the
+    passages with their highest priority.
+    """
+    passages: List[Tuple[float, ContextPassage]] = []
+    groups: Dict[Tuple[Any, Any, Any], List[_Chunk]] = {}
+    for chunk in chunks:
+        if (
+            chunk.objectKey is None
+            or chunk.start is None
+            or chunk.end is None
+            or chunk.end - chunk.start != len(chunk.text)
+        ):
+            passages.append((chunk.priority, _passage(chunk)))
+        else:
+            key = (chunk.bucketName, chunk.objectKey, chunk.versionId)
+            groups.setdefault(key, []).append(chunk)
+
+    for group in groups.values():
+        # longest chunk first among the chunks starting at the same offset
+        group.sort(key=lambda chunk: (chunk.start, -chunk.end))  # type: ignore
+        run = [group[0]]
+        run_end: int = group[0].end  # type: ignore
+        for chunk in group[1:]:
+            if chunk.start > run_end:  # type: ignore
+                passages.append(_merge_run(run))
+                run = []
+            run.append(chunk)
+            run_end = max(run_end, chunk.end)  # type: ignore
+        passages.append(_merge_run(run))
+    return passages
+
+
+def _merge_run(run: List[_Chunk]) -> Tuple[float, ContextPassage]:
+    priority = max(chunk.priority for chunk in run)
+    if len(run) == 1:
+        return priority, _passage(run[0])
+    first = run[0]
+    parts = [first.text]
+    end: int = first.end  # type: ignore
+    pages: List[str] = []
+    for chunk in run:
+        if chunk.end > end:  # type: ignore
+            # only the characters after the end of the passage are new
+            parts.append(chunk.text[end - chunk.start :])  # type: ignore
+            end = chunk.end  # type: ignore
+        if chunk.pageLabel is not None and chunk.pageLabel not in pages:
+            pages.append(chunk.pageLabel)
+    return priority, ContextPassage(
+        text="".join(parts),
+        score=max(chunk.score for chunk in run),
+        objectKey=first.objectKey,
+        bucketName=first.bucketName,
+        versionId=first.versionId,
+        startCharIndex=first.start,
+        endCharIndex=end,
+        pageLabels=tuple(pages),
+        chunks=len(run),
+    )
+
+
+def _pack(
+    passages: List[ContextPassage],
+    max_chars: Optional[int],
+    max_tokens: Optional[int],
+    count_tokens: Callable[[str], int],
+) -> List[ContextPassage]:
+    """Select the passages, in order, which fit into the remaining budget."""
+    if max_chars is None and max_tokens is None:
+        return passages
+    chars = max_chars if max_chars is not None else math.inf
+    tokens = max_tokens if max_tokens is not None else math.inf
+    selected = []
+    for passage in passages:
+        size = len(passage.text)
+        if size > chars:
+            continue
+        cost = count_tokens(passage.text) if max_tokens is not None else 0
+        if cost > tokens:
+            continue
+        selected.append(passage)
+        chars -= size
+        tokens -= cost
+    return selected
@@ -0,0 +1,221 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, List, Optional
+
+import httpx
+
+from pydi_client.api.utils import submit_in_context
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.sessions.balancer import FAILOVER_STATUSES
+from pydi_client.utils.utils import ResetOnPickle
+
+# Initialize logger for this module
+logger = get_logger()
+
+
+class HedgingPolicy(ResetOnPickle):
+    """
+    HedgingPolicy - hedged requests to cut tail latency
+    When the first attempt of a request has not completed after the `percentile` of the
+    latencies observed so far, a duplicate attempt is sent. The first attempt to succeed
+    wins; the others are cancelled if they have not started yet, otherwise their responses
+    are discarded and closed as soon as they arrive. An attempt raising an error or answered
+    with a 502/503/504 status fails, and does not win while another attempt may still
+    succeed.
+
+    The extra load is capped by a budget: every request earns `budget` hedges (e.g. 0.1
+    allows at most 10% more requests in the long run), with bursts of at most `max_burst`
+    hedges. The same policy should be reused across requests so it learns the latency
+    distribution; it is thread-safe.
+
+    With a session using several endpoints, the hedge is sent to the endpoint chosen by the
+    load balancer, which is another endpoint unless only one is healthy.
+
+    Example usage:
+        ```python
+        hedging = HedgingPolicy(percentile=95, budget=0.05)
+        results = client.similarity_search(..., hedging=hedging)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 95.0,
+        budget: float = 0.1,
+        max_burst: float = 10.0,
+        initial_delay: float = 0.1,
+        min_delay: float = 0.001,
+        min_samples: int = 20,
+        window: int = 1000,
+        max_workers: int = 32,
+    ) -> None:
+        """
+        Args:
+            percentile (float): Percentile of the observed latencies after which a hedge is sent.
+            budget (float): Hedges earned per request, i.e. the maximum fraction of extra requests.
+            max_burst (float): Maximum number of hedges that can be sent in a row.
+            initial_delay (float): Hedge delay in seconds until `min_samples` latencies are known.
+            min_delay (float): Lower bound of the hedge delay in seconds.
+            min_samples (int): Number of latencies observed before the percentile is used.
+            window (int): Number of most recent latencies the percentile is computed over.
+            max_workers (int): Maximum number of attempts in flight across all requests.
+        """
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if budget < 0:
+            raise ValueError("budget must not be negative")
+        self.percentile = percentile
+        self.budget = budget
+        self.max_burst = max_burst
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._delay: Optional[float] = None
+        self._tokens = min(1.0, max_burst)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def delay(self) -> float:
+        """Get the current hedge delay in seconds."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            if self._delay is None:
+                ordered = sorted(self._latencies)
+                index = math.ceil(self.percentile / 100 * len(ordered)) - 1
+                self._delay = ordered[max(0, index)]
+            return max(self.min_delay, self._delay)
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a completed attempt."""
+        with self._lock:
+            self._latencies.append(latency)
+            # recomputed on the next call to delay()
+            self._delay = None
+
+    def execute(self, send: Callable[[], httpx.Response]) -> httpx.Response:
+        """
+        Send a request with hedging.
+
+        Args:
+            send (Callable[[], httpx.Response]): Sends one attempt of the request.
+
+        Returns:
+            httpx.Response: The response of the first attempt to succeed. When every attempt
+            failed, the response of the first attempt answered with an error status.
+
+        Raises:
+            Exception: The error of the first attempt, when no attempt got a response.
+        """
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.max_burst, self._tokens + self.budget)
+
+        executor = self._get_executor()
+        attempts: List[Future] = [self._submit(executor, send)]
+        delay = self.delay()
+        done, pending = wait(attempts, timeout=delay, return_when=FIRST_COMPLETED)
+
+        if not done and self._take_token():
+            logger.debug("No response after %.3fs, sending a hedged request", delay)
+            attempts.append(self._submit(executor, send))
+            pending.add(attempts[-1])
+
+        winner: Optional[Future] = None
+        while True:
+            # prefer the first attempt when several succeeded at once
+            winner = next(
+                (
+                    attempt
+                    for attempt in attempts
+                    if attempt in done and _succeeded(attempt)
+                ),
+                None,
+            )
+            if winner is not None or not pending:
+                break
+            # a failed attempt does not win while another one may still succeed
+            completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+            done |= completed
+
+        for attempt in pending:
+            self._discard(attempt)
+        if winner is None:
+            # every attempt failed, prefer an error response to an exception
+            winner = next(
+                (attempt for attempt in attempts if attempt.exception() is None),
+                attempts[0],
+            )
+        elif winner is not attempts[0]:
+            with self._lock:
+                self.hedge_wins += 1
+        for attempt in done:
+            if attempt is not winner and attempt.exception() is None:
+                attempt.result().close()
+        return winner.result()
+
+    def _submit(
+        self, executor: ThreadPoolExecutor, send: Callable[[], httpx.Response]
+    ) -> Future:
+        start = time.perf_counter()
+
+        def attempt() -> httpx.Response:
+            response = send()
+            self.record(time.perf_counter() - start)
+            return response
+
+        return submit_in_context(executor, attempt)
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+    @staticmethod
+    def _discard(attempt: Future) -> None:
+        if attempt.cancel():
+            return
+
+        def close(future: Future) -> None:
+            if future.exception() is None:
+                future.result().close()
+
+        attempt.add_done_callback(close)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pydi-hedge"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker threads of the policy."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _succeeded(attempt: Future) -> bool:
+    return (
+        attempt.exception() is None
+        and attempt.result().status_code not in FAILOVER_STATUSES
+    )
@@ -12,6 +12,7 @@ from pydi_client.data.model import (
 )
 
 from pydi_client.api.utils import execute_with_retry, build_response
+from pydi_client import tracing
 from pydi_client.logger import get_logger  # Importing the logger utility
 
 # Initialize logger for this module
@@ -56,6 +57,7 @@ class ModelAPI:
             "ModelAPI initialized with session: %s", type(session).__name__
         )
 
+    @tracing.traced(attributes={tracing.ATTR_MODEL_NAME: "name"})
     def get_model(self, *, name: str) -> V1ModelsResponse:
         logger.info("Retrieving model with name: %s", name)
 
@@ -70,9 +72,12 @@ class ModelAPI:
         logger.info("Received response for get_model with name: %s", name)
 
         return build_response(
-            response=response, response_cls=DataModelFactory.get_model()
+            response=response,
+            response_cls=DataModelFactory.get_model(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced()
     def get_models(self) -> V1ListModelsResponse:
         logger.info("Retrieving all models")
 
@@ -87,5 +92,7 @@ class ModelAPI:
         logger.info("Received response for get_models: %s", response.text)
 
         return build_response(
-            response=response, response_cls=DataModelFactory.get_models()
+            response=response,
+            response_cls=DataModelFactory.get_models(),
+            validation=self._session.validation,
         )
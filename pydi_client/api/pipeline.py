@@ -15,6 +15,7 @@ from pydi_client.data.collection_manager import (
     ListPipelines,
 )
 from pydi_client.api.utils import execute_with_retry, build_response
+from pydi_client import tracing
 from pydi_client.logger import get_logger  # Importing the logger utility
 
 # Initialize logger for this module
@@ -70,6 +71,7 @@ class PipelineAPI:
         self._session = session
         logger.info("PipelineAPI initialized with session: %s", type(session).__name__)
 
+    @tracing.traced(attributes={tracing.ATTR_PIPELINE_NAME: "name"})
     def create_pipeline(
         self,
         *,
@@ -119,9 +121,12 @@ class PipelineAPI:
         )
         logger.info("Pipeline created successfully: %s", name)
         return build_response(
-            response=response, response_cls=DataModelFactory.create_pipeline()
+            response=response,
+            response_cls=DataModelFactory.create_pipeline(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced(attributes={tracing.ATTR_PIPELINE_NAME: "name"})
     def get_pipeline(self, *, name: str) -> V1PipelineResponse:
         """
         Get a pipeline by name.
@@ -144,9 +149,12 @@ class PipelineAPI:
         )
         logger.info("Fetched pipeline successfully: %s", name)
         return build_response(
-            response=response, response_cls=DataModelFactory.get_pipeline()
+            response=response,
+            response_cls=DataModelFactory.get_pipeline(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced()
     def get_pipelines(self) -> ListPipelines:
         """
         Get all pipelines.
@@ -166,9 +174,12 @@ class PipelineAPI:
         )
         logger.info("Fetched all pipelines successfully")
         return build_response(
-            response=response, response_cls=DataModelFactory.get_pipelines()
+            response=response,
+            response_cls=DataModelFactory.get_pipelines(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced(attributes={tracing.ATTR_PIPELINE_NAME: "name"})
     def delete_pipeline(self, *, name: str) -> V1DeletePipelineResponse:
         """
         Delete a pipeline by name.
@@ -191,5 +202,7 @@ class PipelineAPI:
         )
         logger.info("Deleted pipeline successfully: %s", name)
         return build_response(
-            response=response, response_cls=DataModelFactory.delete_pipeline()
+            response=response,
+            response_cls=DataModelFactory.delete_pipeline(),
+            validation=self._session.validation,
         )
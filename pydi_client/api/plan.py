@@ -0,0 +1,294 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Declarative reconciliation of pipelines, collections and bucket assignments.
+
+`PlanAPI.plan` fetches the current pipelines and collections concurrently and computes the
+changes turning them into a desired state; `PlanAPI.apply` runs these changes step by step in
+dependency order (collections are deleted before their pipeline, pipelines are created before
+their collections), with the changes of a step running concurrently.
+"""
+
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
+
+from pydi_client.sessions.authenticated_session import AuthenticatedSession
+from pydi_client.api.collection import CollectionAPI
+from pydi_client.api.pipeline import PipelineAPI
+from pydi_client.api.bulk import pipeline_arguments, run_tiers
+from pydi_client.api.utils import submit_in_context
+from pydi_client.data.collection_manager import V1CollectionResponse, V1PipelineResponse
+from pydi_client.data.plan import (
+    ApplyResult,
+    CollectionSpec,
+    DesiredState,
+    PipelineSpec,
+    Plan,
+)
+from pydi_client import tracing
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+# Initialize logger for this module
+logger = get_logger()
+
+Change = Tuple[str, Callable[[], Any]]
+
+
+def _pipeline_differs(spec: PipelineSpec, current: V1PipelineResponse) -> bool:
+    event_filter = current.eventFilter or {}
+    compared: List[Tuple[Any, Any]] = [(spec.pipeline_type, current.type)]
+    # optional settings left unset are chosen by the server
+    compared += [
+        (wanted, actual or None)
+        for wanted, actual in (
+            (spec.schema_name, current.schema),
+            (spec.model, current.model),
+            (spec.custom_func, current.customFunction),
+            (spec.event_filter_object_suffix, event_filter.get("objectSuffix")),
+            (spec.event_filter_max_object_size, event_filter.get("maxObjectSize")),
+        )
+        if wanted is not None
+    ]
+    return any(wanted != actual for wanted, actual in compared)
+
+
+class PlanAPI:
+    """
+    PlanAPI - a class to reconcile pipelines and collections with a desired state
+    It uses the AuthenticatedSession class to make HTTP requests to the server.
+    """
+
+    def __init__(self, session: AuthenticatedSession, *, max_workers: int = 8):
+        self._session = session
+        self._max_workers = max_workers
+
+    @tracing.traced()
+    def plan(
+        self, *, desired_state: Union[DesiredState, Dict[str, Any]], prune: bool = False
+    ) -> Plan:
+        """
+        Compute the changes turning the current state into `desired_state`.
+
+        Args:
+            desired_state (Union[DesiredState, Dict[str, Any]]): The desired pipelines and
+                collections.
+            prune (bool): Also delete the pipelines and collections missing from the desired
+                state. Pipelines used by desired collections are kept.
+
+        Returns:
+            Plan: The changes to apply.
+        """
+        desired = DesiredState.model_validate(desired_state)
+        pipelines = {spec.name: spec for spec in desired.pipelines}
+        collections = {spec.name: spec for spec in desired.collections}
+        current_pipelines, current_collections = self._fetch()
+
+        for spec in collections.values():
+            if (
+                spec.pipeline not in pipelines
+                and spec.pipeline not in current_pipelines
+            ):
+                raise ValueError(
+                    f"Collection {spec.name!r} uses unknown pipeline {spec.pipeline!r}"
+                )
+
+        plan = Plan()
+        replaced = {
+            name
+            for name, spec in pipelines.items()
+            if name in current_pipelines
+            and _pipeline_differs(spec, current_pipelines[name])
+        }
+        plan.create_pipelines = [
+            spec
+            for name, spec in pipelines.items()
+            if name not in current_pipelines or name in replaced
+        ]
+        kept_pipelines = set(pipelines) | {
+            spec.pipeline for spec in collections.values()
+        }
+        plan.delete_pipelines = [
+            name
+            for name in current_pipelines
+            if name in replaced or (prune and name not in kept_pipelines)
+        ]
+
+        deleted: Set[str] = set(plan.delete_pipelines)
+        for name, current in current_collections.items():
+            wanted = collections.get(name)
+            if wanted is None:
+                if prune:
+                    plan.delete_collections.append(name)
+                elif current.pipeline in deleted:
+                    # a collection outside the desired state survives the replacement of its
+                    # pipeline as it is
+                    plan.delete_collections.append(name)
+                    self._add_collection(
+                        plan,
+                        CollectionSpec(
+                            name=name,
+                            pipeline=current.pipeline,
+                            buckets=list(current.buckets or []),
+                        ),
+                    )
+            elif current.pipeline != wanted.pipeline or current.pipeline in deleted:
+                plan.delete_collections.append(name)
+                if wanted.buckets is None:
+                    # unmanaged buckets are assigned again to the new collection
+                    wanted = wanted.model_copy(
+                        update={"buckets": list(current.buckets or [])}
+                    )
+                self._add_collection(plan, wanted)
+            elif wanted.buckets is not None:
+                buckets = set(current.buckets or [])
+                added = [bucket for bucket in wanted.buckets if bucket not in buckets]
+                removed = [
+                    bucket
+                    for bucket in current.buckets or []
+                    if bucket not in wanted.buckets
+                ]
+                if added:
+                    plan.assign_buckets[name] = added
+                if removed:
+                    plan.unassign_buckets[name] = removed
+
+        for name, spec in collections.items():
+            if name not in current_collections:
+                self._add_collection(plan, spec)
+
+        logger.info(
+            "Planned %d pipeline and %d collection creations, %d pipeline and %d collection "
+            "deletions, bucket changes for %d collections",
+            len(plan.create_pipelines),
+            len(plan.create_collections),
+            len(plan.delete_pipelines),
+            len(plan.delete_collections),
+            len(set(plan.assign_buckets) | set(plan.unassign_buckets)),
+        )
+        return plan
+
+    @tracing.traced()
+    def apply(self, *, plan: Plan) -> ApplyResult:
+        """
+        Apply the changes of a plan, in dependency order.
+
+        The changes of a step run concurrently, and the next step only runs when every change
+        of the step succeeded.
+
+        Args:
+            plan (Plan): The changes to apply, as computed by `plan`.
+
+        Returns:
+            ApplyResult: The changes applied and the changes which failed.
+        """
+        pipeline_api = PipelineAPI(session=self._session)
+        collection_api = CollectionAPI(session=self._session)
+
+        def update_buckets(name: str) -> None:
+            for update, buckets in (
+                (collection_api.unassign_buckets_bulk, plan.unassign_buckets.get(name)),
+                (collection_api.assign_buckets_bulk, plan.assign_buckets.get(name)),
+            ):
+                if buckets:
+                    response = update(collection_name=name, buckets=buckets)
+                    if not response.success:
+                        raise RuntimeError(
+                            f"{len(response.failed)} of {len(buckets)} buckets failed, "
+                            f"first error: {next(iter(response.failed.values()))}"
+                        )
+
+        steps: List[List[Change]] = [
+            [
+                (
+                    f"delete collection {name}",
+                    functools.partial(collection_api.delete_collection, name=name),
+                )
+                for name in plan.delete_collections
+            ],
+            [
+                (
+                    f"delete pipeline {name}",
+                    functools.partial(pipeline_api.delete_pipeline, name=name),
+                )
+                for name in plan.delete_pipelines
+            ],
+            [
+                (
+                    f"create pipeline {spec.name}",
+                    functools.partial(
+                        pipeline_api.create_pipeline, **pipeline_arguments(spec)
+                    ),
+                )
+                for spec in plan.create_pipelines
+            ],
+            [
+                (
+                    f"create collection {spec.name}",
+                    functools.partial(
+                        collection_api.create_collection,
+                        name=spec.name,
+                        pipeline=spec.pipeline,
+                        buckets=[],
+                    ),
+                )
+                for spec in plan.create_collections
+            ],
+            [
+                (
+                    f"update buckets of collection {name}",
+                    functools.partial(update_buckets, name),
+                )
+                for name in dict.fromkeys(
+                    [*plan.unassign_buckets, *plan.assign_buckets]
+                )
+            ],
+        ]
+
+        results = run_tiers(
+            steps, max_workers=self._max_workers, stop_after_failed_tier=True
+        )
+        applied = [str(change) for change, result in results.items() if result.success]
+        failed = {
+            str(change): result.error or "Change failed"
+            for change, result in results.items()
+            if not result.success and not result.skipped
+        }
+        if failed:
+            logger.error("Failed to apply %d changes: %s", len(failed), failed)
+        return ApplyResult(success=not failed, applied=applied, failed=failed)
+
+    def _fetch(
+        self,
+    ) -> Tuple[Dict[str, V1PipelineResponse], Dict[str, V1CollectionResponse]]:
+        pipeline_api = PipelineAPI(session=self._session)
+        collection_api = CollectionAPI(session=self._session)
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            pipeline_names = submit_in_context(executor, pipeline_api.get_pipelines)
+            collection_names = submit_in_context(
+                executor, collection_api.get_collections
+            )
+            pipelines = {
+                item.name: submit_in_context(
+                    executor, pipeline_api.get_pipeline, name=item.name
+                )
+                for item in pipeline_names.result().root
+                if item.name
+            }
+            collections = {
+                item.name: submit_in_context(
+                    executor, collection_api.get_collection, name=item.name
+                )
+                for item in collection_names.result().root
+                if item.name
+            }
+            return (
+                {name: future.result() for name, future in pipelines.items()},
+                {name: future.result() for name, future in collections.items()},
+            )
+
+    @staticmethod
+    def _add_collection(plan: Plan, spec: CollectionSpec) -> None:
+        plan.create_collections.append(spec.model_copy(update={"buckets": []}))
+        if spec.buckets:
+            plan.assign_buckets[spec.name] = list(dict.fromkeys(spec.buckets))
@@ -0,0 +1,165 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Lexical reranking of similarity search results.
+
+Dense similarity misses exact matches of rare terms such as product names or error codes.
+`LexicalReranker` scores the returned chunks against the query with BM25 or TF-IDF and fuses
+both rankings with reciprocal rank fusion (RRF):
+
+    fused(result) = 1 / (rrf_k + dense rank) + weight / (rrf_k + lexical rank)
+
+Every chunk is tokenized once, and only the counts of the query terms are kept. Tokenizing
+and counting take nearly all of the time, the scoring itself is cheap.
+"""
+
+import math
+import string
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Union
+
+from pydi_client import tracing
+from pydi_client.data.pipeline import SearchHit
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+# Initialize logger for this module
+logger = get_logger()
+
+METHODS = ("bm25", "tfidf")
+
+# ASCII punctuation separates the tokens like whitespace; translate and split are several
+# times faster than a regular expression
+_SEPARATORS = str.maketrans(dict.fromkeys(string.punctuation.replace("_", ""), " "))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text into lowercase tokens at whitespace and ASCII punctuation."""
+    return text.lower().translate(_SEPARATORS).split()
+
+
+class LexicalReranker:
+    """
+    LexicalReranker - rerank similarity search results by fusing their DI score with a
+    lexical score of their `dataChunk`
+
+    Example usage:
+        ```python
+        reranker = LexicalReranker(method="bm25", weight=1.0)
+        results = client.similarity_search(..., top_k=100, rerank=reranker)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        method: str = "bm25",
+        k1: float = 1.2,
+        b: float = 0.75,
+        rrf_k: int = 60,
+        weight: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            method (str): Lexical scoring, "bm25" or "tfidf".
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 document length normalization, 0 to 1.
+            rrf_k (int): RRF constant damping the weight of the first ranks.
+            weight (float): Weight of the lexical rank relative to the DI rank.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+        self.method = method
+        self.k1 = k1
+        self.b = b
+        self.rrf_k = rrf_k
+        self.weight = weight
+
+    def scores(self, query: str, texts: Sequence[str]) -> List[float]:
+        """
+        Compute the lexical score of every text for the query.
+
+        Args:
+            query (str): The search query.
+            texts (Sequence[str]): The texts to score, e.g. the chunks of the results.
+
+        Returns:
+            List[float]: The score of every text, in the order of `texts`.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not texts or not terms:
+            return [0.0] * len(texts)
+
+        # tokenize every text once, keeping the counts of the query terms only
+        query_terms = set(terms)
+        counts: List[List[int]] = []
+        lengths: List[int] = []
+        for text in texts:
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            frequencies = Counter([token for token in tokens if token in query_terms])
+            counts.append([frequencies[term] for term in terms])
+
+        n = len(lengths)
+        df = [sum(1 for row in counts if row[j]) for j in range(len(terms))]
+        if self.method == "bm25":
+            idf = [math.log1p((n - d + 0.5) / (d + 0.5)) for d in df]
+            average = sum(lengths) / n or 1.0
+            scores = []
+            for row, length in zip(counts, lengths):
+                norm = self.k1 * (1.0 - self.b + self.b * length / average)
+                scores.append(
+                    sum(
+                        w * tf * (self.k1 + 1.0) / (tf + norm)
+                        for w, tf in zip(idf, row)
+                        if tf
+                    )
+                )
+            return scores
+        idf = [math.log((1.0 + n) / (1.0 + d)) + 1.0 for d in df]
+        return [
+            sum(w * tf for w, tf in zip(idf, row) if tf) / max(length, 1)
+            for row, length in zip(counts, lengths)
+        ]
+
+    def rerank(
+        self, query: str, results: Sequence[Union[SearchHit, Dict[str, Any]]]
+    ) -> List[Union[SearchHit, Dict[str, Any]]]:
+        """
+        Rerank similarity search results for the query.
+
+        Args:
+            query (str): The search query.
+            results (Sequence[Union[SearchHit, Dict[str, Any]]]): The results, as
+                dictionaries or `SearchHit` objects.
+
+        Returns:
+            List[Union[SearchHit, Dict[str, Any]]]: The same results, best fused rank first.
+            Ties keep the DI order.
+        """
+        with tracing.start_span(
+            "pydi.rerank", {tracing.ATTR_RESULT_COUNT: len(results)}
+        ):
+            texts = []
+            dense = []
+            for result in results:
+                if isinstance(result, SearchHit):
+                    texts.append(result.dataChunk)
+                    dense.append(result.score)
+                else:
+                    texts.append(result["dataChunk"])
+                    dense.append(float(result["score"]))
+            lexical = self.scores(query, texts)
+
+            dense_order = sorted(range(len(results)), key=lambda i: -dense[i])
+            dense_rank = [0] * len(results)
+            for rank, index in enumerate(dense_order, start=1):
+                dense_rank[index] = rank
+            # ties of lexical scores are ranked in the DI order
+            lexical_order = sorted(dense_order, key=lambda i: -lexical[i])
+
+            fused = [1.0 / (self.rrf_k + rank) for rank in dense_rank]
+            for rank, index in enumerate(lexical_order, start=1):
+                fused[index] += self.weight / (self.rrf_k + rank)
+            order = sorted(dense_order, key=lambda i: -fused[i])
+        logger.debug("Reranked %d results with %s", len(results), self.method)
+        return [results[index] for index in order]
@@ -11,6 +11,7 @@ from pydi_client.data.schema import (
 )
 
 from pydi_client.api.utils import execute_with_retry, build_response
+from pydi_client import tracing
 from pydi_client.logger import get_logger  # Importing the logger utility
 
 # Initialize logger for this module
@@ -53,6 +54,7 @@ class SchemaAPI:
         self._session = session
         logger.info("SchemaAPI initialized with session: %s", type(session).__name__)
 
+    @tracing.traced(attributes={tracing.ATTR_SCHEMA_NAME: "name"})
     def get_schema(self, *, name: str) -> V1SchemasResponse:
         logger.info("Retrieving schema with name: %s", name)
         kwargs: Dict[str, Any] = MethodFactory().get_schema(name)
@@ -64,9 +66,12 @@ class SchemaAPI:
         )
         logger.info("Received response for get_schema: %s", response.text)
         return build_response(
-            response=response, response_cls=DataModelFactory.get_schema()
+            response=response,
+            response_cls=DataModelFactory.get_schema(),
+            validation=self._session.validation,
         )
 
+    @tracing.traced()
     def get_schemas(self) -> V1ListSchemasResponse:
         logger.info("Retrieving all schemas")
         kwargs: Dict[str, Any] = MethodFactory().get_schemas()
@@ -78,5 +83,7 @@ class SchemaAPI:
         )
         logger.info("Received response for get_models: %s", response.text)
         return build_response(
-            response=response, response_cls=DataModelFactory.get_schemas()
+            response=response,
+            response_cls=DataModelFactory.get_schemas(),
+            validation=self._session.validation,
         )
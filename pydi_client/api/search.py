@@ -1,18 +1,47 @@
 # Copyright Hewlett Packard Enterprise Development LP
 
+import heapq
+import itertools
+import math
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from http import HTTPStatus
-from typing import Any, Dict, Union, List
+from typing import Any, Dict, Iterable, Sequence, Union, List, Optional, cast
+
+import httpx
+from pydantic_core import from_json
 
 from pydi_client.sessions.authenticated_session import AuthenticatedSession
 from pydi_client.sessions.session import Session
-from pydi_client.errors import SimilaritySearchFailureException
-from pydi_client.api.utils import execute_with_retry, build_response
-from pydi_client.data.pipeline import V1SimilaritySearchResponse
+from pydi_client.sessions.scheduler import request_priority
+from pydi_client.errors import (
+    SimilaritySearchFailureException,
+    UnexpectedResponse,
+    content_preview,
+)
+from pydi_client.api.context import assemble_context
+from pydi_client.api.hedging import HedgingPolicy
+from pydi_client.api.rerank import LexicalReranker
+from pydi_client.api.utils import (
+    _type_adapter,
+    build_response,
+    execute_with_retry,
+    submit_in_context,
+)
+from pydi_client import tracing
+from pydi_client.data.pipeline import (
+    ContextPassage,
+    SearchHit,
+    V1SimilaritySearchResponse,
+)
 from pydi_client.logger import get_logger  # Importing the logger utility
 
 # Initialize logger for this module
 logger = get_logger()
 
+# results of a similarity search, depending on `result_type` and `assemble`
+SearchResults = Union[List[Dict[str, Any]], List[SearchHit], List[ContextPassage]]
+
 
 class SimilaritySearchAPI:
     """
@@ -25,6 +54,13 @@ class SimilaritySearchAPI:
             "SimilaritySearchAPI initialized with session: %s", type(session).__name__
         )
 
+    @tracing.traced(
+        attributes={
+            tracing.ATTR_COLLECTION_NAME: "collection_name",
+            tracing.ATTR_TOP_K: "top_k",
+            tracing.ATTR_MIN_SCORE: "min_score",
+        }
+    )
     def search(
         self,
         *,
@@ -33,8 +69,17 @@ class SimilaritySearchAPI:
         collection_name: str,
         query: str,
         top_k: int,
-        search_parameters: Union[Dict[str, Any]] = None,
-    ) -> V1SimilaritySearchResponse:
+        search_parameters: Optional[Dict[str, Any]] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        priority: Optional[str] = None,
+        result_type: str = "dict",
+        assemble: bool = False,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        min_score: Optional[float] = None,
+        max_results: Optional[int] = None,
+        rerank: Optional[LexicalReranker] = None,
+    ) -> SearchResults:
         """
         Perform a similarity search in the specified collection.
 
@@ -45,9 +90,34 @@ class SimilaritySearchAPI:
             access_key (str): The access key for S3 credentials.
             secret_key (str): The secret key for S3 credentials.
             search_parameters (Dict[str, Any]): Additional search parameters.
+            hedging (Optional[HedgingPolicy]): Send a duplicate request when the first one is
+                slower than usual, see `HedgingPolicy`.
+            priority (Optional[str]): Priority class of the request (e.g. "interactive" or
+                "batch") when the session has a `RequestScheduler`.
+            result_type (str): "dict" to return every result as a dictionary, or "hit" to
+                return compact `SearchHit` objects decoded without the intermediate pydantic
+                models.
+            assemble (bool): Return the results assembled into `ContextPassage` objects by
+                `assemble_context`: repeated chunks removed, overlapping chunks of the same
+                object merged, highest score first.
+            max_chars (Optional[int]): Character budget of the passages when assembling.
+            max_tokens (Optional[int]): Token budget of the passages when assembling,
+                estimated at 4 characters per token.
+            min_score (Optional[float]): Drop the results scored below `min_score`. The
+                results are score-ordered, so the results after the first one below the
+                threshold are neither validated nor converted.
+            max_results (Optional[int]): Maximum number of results to return. The server is
+                asked for at most `max_results` results.
+            rerank (Optional[LexicalReranker]): Rerank the results by fusing their score
+                with a lexical score of their chunk for the query. With `assemble`, the
+                passages are then ranked in the reranked order.
 
         Returns:
-            V1SimilaritySearchResponse: The search results.
+            SearchResults: The results, as dictionaries, as `SearchHit` objects with
+            `result_type="hit"`, or as `ContextPassage` objects with `assemble`. With the
+            "trusted" validation of the session, the dictionaries are returned as decoded
+            from the JSON response: the fields missing from the response are missing from the
+            dictionaries too, instead of being set to their default, e.g. None.
 
             Sample response: List of similar data chunks
                 {
@@ -69,6 +139,10 @@ class SimilaritySearchAPI:
                 ]
                 }
         """
+        if result_type not in RESULT_TYPES:
+            raise ValueError(
+                f"Unknown result_type {result_type!r}, expected one of {RESULT_TYPES}"
+            )
         logger.info(
             "Performing similarity search in collection: %s with query: %s and top_k: %d",
             collection_name,
@@ -81,7 +155,7 @@ class SimilaritySearchAPI:
         body = {
             "collectionName": collection_name,
             "query": query,
-            "topK": top_k,
+            "topK": top_k if max_results is None else min(top_k, max_results),
             "credentials": {"accessKey": access_key, "secretKey": secret_key},
             "searchParams": search_parameters,
         }
@@ -90,11 +164,15 @@ class SimilaritySearchAPI:
 
         logger.debug("Request payload for similarity search: %s", kwargs)
 
-        response = execute_with_retry(
-            session=self._session,
-            request_func=self._session.get_httpx_client().request,
-            **kwargs,
-        )
+        def send():
+            return execute_with_retry(
+                session=self._session,
+                request_func=self._session.get_httpx_client().request,
+                **kwargs,
+            )
+
+        with request_priority(priority):
+            response = hedging.execute(send) if hedging is not None else send()
 
         logger.debug("Similarity search response status code: %s", response.status_code)
 
@@ -103,19 +181,380 @@ class SimilaritySearchAPI:
                 "Similarity search completed successfully for collection: %s",
                 collection_name,
             )
-            # validate response
-            resp = build_response(
-                response=response, response_cls=V1SimilaritySearchResponse
-            )
-            return resp.model_dump().get("results", [])
+            results: List[Any]
+            if result_type == "hit":
+                results = _build_hits(response, min_score, max_results)
+            elif self._session.validation == "trusted":
+                # the results are returned as decoded, without models to dump again
+                results = _decode_results(response, min_score, max_results)
+            elif min_score is not None or max_results is not None:
+                results = _validate_results(
+                    response,
+                    validation=self._session.validation,
+                    min_score=min_score,
+                    max_results=max_results,
+                )
+            else:
+                # validate response
+                resp = build_response(
+                    response=response,
+                    response_cls=V1SimilaritySearchResponse,
+                    validation=self._session.validation,
+                )
+                results = resp.model_dump().get("results", [])
+            tracing.set_current_attributes({tracing.ATTR_RESULT_COUNT: len(results)})
+            if rerank is not None:
+                results = rerank.rerank(query, results)
+            if assemble:
+                return assemble_context(
+                    results,
+                    max_chars=max_chars,
+                    max_tokens=max_tokens,
+                    ranked=rerank is not None,
+                )
+            return results
 
         else:
+            content = content_preview(response.content)
             logger.error(
                 "Similarity search failed for collection: %s with status code: %s and response: %s",
                 collection_name,
                 response.status_code,
-                response.text,
+                content,
             )
             raise SimilaritySearchFailureException(
-                f"Similarity search failed with status code {response.status_code}: {response.text}"
+                f"Similarity search failed with status code {response.status_code}: {content}"
+            )
+
+    @tracing.traced(attributes={tracing.ATTR_TOP_K: "top_k"})
+    def search_federated(
+        self,
+        *,
+        access_key: str,
+        secret_key: str,
+        collection_names: List[str],
+        query: str,
+        top_k: int,
+        search_parameters: Optional[Dict[str, Any]] = None,
+        overfetch: float = 1.5,
+        max_workers: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform a similarity search across several collections and merge the results into
+        one global top-k ranking by score.
+
+        Every collection is first queried concurrently for
+        `ceil(top_k * overfetch / len(collection_names))` results (at most `top_k`). The
+        score-ordered per-collection results are merged with a heap-based k-way merge that
+        stops after `top_k` results. A collection is queried again for the full `top_k`
+        only if its lowest returned score could still beat the current k-th result, so the
+        merged ranking is the same as when fetching `top_k` from every collection.
+
+        Args:
+            collection_names (List[str]): The names of the collections to search in.
+            query (str): The query string to search for.
+            top_k (int): The number of top results to return.
+            access_key (str): The access key for S3 credentials.
+            secret_key (str): The secret key for S3 credentials.
+            search_parameters (Dict[str, Any]): Additional search parameters.
+            overfetch (float): Factor applied to the fair share `top_k / len(collection_names)`
+                of results requested from every collection in the first round.
+            max_workers (Optional[int]): Maximum number of concurrent requests. Defaults to one
+                per collection, at most 16.
+
+        Returns:
+            List[Dict[str, Any]]: The merged results, highest score first. Every result has an
+            additional `collectionName` key holding the collection it came from.
+        """
+        collection_names = list(dict.fromkeys(collection_names))
+        if not collection_names or top_k <= 0:
+            return []
+
+        logger.info(
+            "Performing federated similarity search in collections: %s with top_k: %d",
+            collection_names,
+            top_k,
+        )
+        first_k = min(
+            top_k, max(1, math.ceil(top_k * overfetch / len(collection_names)))
+        )
+
+        def fetch(collection_name: str, k: int) -> List[Dict[str, Any]]:
+            # plain dictionaries, without result_type or assemble
+            results = cast(
+                List[Dict[str, Any]],
+                self.search(
+                    access_key=access_key,
+                    secret_key=secret_key,
+                    collection_name=collection_name,
+                    query=query,
+                    top_k=k,
+                    search_parameters=search_parameters,
+                ),
             )
+            for result in results:
+                result["collectionName"] = collection_name
+            results.sort(key=lambda result: result["score"], reverse=True)
+            return results
+
+        workers = max_workers or min(len(collection_names), 16)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+
+            def fan_out(names: List[str], k: int) -> Dict[str, List[Dict[str, Any]]]:
+                futures = {
+                    name: submit_in_context(executor, fetch, name, k) for name in names
+                }
+                return {name: future.result() for name, future in futures.items()}
+
+            shards = fan_out(collection_names, first_k)
+            merged = _merge_top_k(shards.values(), top_k)
+
+            if first_k < top_k:
+                kth_score = merged[-1]["score"] if len(merged) == top_k else None
+                # a shard may hold better results than the k-th one only if it returned a
+                # full page and its lowest returned score is above the k-th score
+                deeper = [
+                    name
+                    for name, results in shards.items()
+                    if len(results) == first_k
+                    and (kth_score is None or results[-1]["score"] > kth_score)
+                ]
+                if deeper:
+                    logger.debug(
+                        "Fetching up to %d results again from collections: %s",
+                        top_k,
+                        deeper,
+                    )
+                    shards.update(fan_out(deeper, top_k))
+                    merged = _merge_top_k(shards.values(), top_k)
+
+        tracing.set_current_attributes({tracing.ATTR_RESULT_COUNT: len(merged)})
+        return merged
+
+    @tracing.traced(
+        attributes={
+            tracing.ATTR_COLLECTION_NAME: "collection_name",
+            tracing.ATTR_TOP_K: "top_k",
+        }
+    )
+    def search_many(
+        self,
+        *,
+        access_key: str,
+        secret_key: str,
+        collection_name: str,
+        queries: Sequence[str],
+        top_k: int,
+        search_parameters: Optional[Dict[str, Any]] = None,
+        executor: Union[str, Executor] = "thread",
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        result_type: str = "dict",
+    ) -> List[SearchResults]:
+        """
+        Perform a similarity search for every query concurrently.
+
+        With `executor="process"`, the searches run in a pool of worker processes, each with
+        its own copy of the session, so the decoding and validation of large responses is
+        spread across CPU cores instead of being serialized by the GIL. The session is sent
+        to the workers pickled, without its connections, so it must not hold objects which
+        cannot be pickled, such as a transport passed in `httpx_args`.
+
+        A pool is started and shut down on every call, unless an executor is passed: pass a
+        pool created by `process_pool()`, or a `ThreadPoolExecutor`, to reuse its workers
+        across calls.
+
+        Args:
+            collection_name (str): The name of the collection to search in.
+            queries (Sequence[str]): The query strings to search for.
+            top_k (int): The number of top results to return per query.
+            access_key (str): The access key for S3 credentials.
+            secret_key (str): The secret key for S3 credentials.
+            search_parameters (Dict[str, Any]): Additional search parameters.
+            executor (Union[str, Executor]): "thread", "process", or an executor which is
+                left running.
+            max_workers (Optional[int]): Number of threads or processes of the pool started
+                for the call. Defaults to the executor's default.
+            chunksize (int): Number of queries sent to a worker process at once.
+            result_type (str): "dict" or "hit", see `search`.
+
+        Returns:
+            List[SearchResults]: The results of every query, in the order of `queries`.
+
+        Raises:
+            ValueError: If the executor is unknown, or is "process" and the session cannot be
+                pickled.
+        """
+        if isinstance(executor, str) and executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor {executor!r}, expected one of {EXECUTORS}"
+            )
+        logger.info(
+            "Performing %d similarity searches in collection: %s using %s executor",
+            len(queries),
+            collection_name,
+            executor if isinstance(executor, str) else type(executor).__name__,
+        )
+        searches = [
+            {
+                "access_key": access_key,
+                "secret_key": secret_key,
+                "collection_name": collection_name,
+                "query": query,
+                "top_k": top_k,
+                "search_parameters": search_parameters,
+                "result_type": result_type,
+            }
+            for query in queries
+        ]
+
+        pool: Executor
+        if executor == "process":
+            pool = self.process_pool(max_workers=max_workers)
+        elif executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            pool = cast(Executor, executor)
+        try:
+            if isinstance(pool, ProcessPoolExecutor):
+                return list(pool.map(_search_in_worker, searches, chunksize=chunksize))
+            futures = [
+                submit_in_context(pool, self.search, **kwargs) for kwargs in searches
+            ]
+            return [future.result() for future in futures]
+        finally:
+            if pool is not executor:
+                pool.shutdown()
+
+    def process_pool(self, *, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """
+        Start a pool of worker processes for `search_many`, each with a copy of the session.
+        The pool can be reused across calls and must be shut down by the caller.
+
+        Args:
+            max_workers (Optional[int]): Number of worker processes. Defaults to the number
+                of CPUs.
+
+        Returns:
+            ProcessPoolExecutor: The pool, to pass as the `executor` of `search_many`.
+
+        Raises:
+            ValueError: If the session cannot be pickled.
+        """
+        # fail here rather than in every worker process
+        try:
+            pickle.dumps(self._session)
+        except Exception as e:
+            raise ValueError(
+                "The process executor needs a session which can be sent to the worker "
+                "processes, but it cannot be pickled (e.g. it uses a transport passed "
+                'in httpx_args): use executor="thread" instead'
+            ) from e
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self._session,),
+        )
+
+
+EXECUTORS = ("thread", "process")
+RESULT_TYPES = ("dict", "hit")
+
+# Session of a worker process of `SimilaritySearchAPI.search_many`
+_worker_session: Optional[Union[AuthenticatedSession, Session]] = None
+
+
+def _init_worker(session: Union[AuthenticatedSession, Session]) -> None:
+    global _worker_session
+    _worker_session = session
+
+
+def _search_in_worker(kwargs: Dict[str, Any]) -> SearchResults:
+    return SimilaritySearchAPI(_worker_session).search(**kwargs)  # type: ignore
+
+
+def _cut(
+    results: List[Any], min_score: Optional[float], max_results: Optional[int]
+) -> List[Any]:
+    """
+    Get the leading results of a score-ordered list scored at least `min_score`, at most
+    `max_results` of them.
+    Raises:
+        KeyError, TypeError, ValueError: If a score is missing or not a number.
+    """
+    if max_results is not None:
+        results = results[:max_results]
+    if min_score is None:
+        return results
+    for index, result in enumerate(results):
+        if float(result["score"]) < min_score:
+            return results[:index]
+    return results
+
+
+def _decode_results(
+    response: httpx.Response,
+    min_score: Optional[float] = None,
+    max_results: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Decode the results of a search response without validating them."""
+    try:
+        with tracing.start_span("pydi.decode"):
+            results = from_json(response.content).get("results") or []
+            return _cut(results, min_score, max_results)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise UnexpectedResponse(response.status_code, response.content) from e
+
+
+def _validate_results(
+    response: httpx.Response,
+    *,
+    validation: str,
+    min_score: Optional[float],
+    max_results: Optional[int],
+) -> List[Dict[str, Any]]:
+    """
+    Validate the leading results of a search response selected by `min_score` and
+    `max_results`, skipping the validation of the other results.
+    """
+    try:
+        with tracing.start_span("pydi.decode"):
+            payload = from_json(response.content)
+            results = payload.get("results") or []
+            payload["results"] = _cut(results, min_score, max_results)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise UnexpectedResponse(response.status_code, response.content) from e
+    with tracing.start_span(
+        "pydi.validate",
+        {tracing.ATTR_RESPONSE_MODEL: V1SimilaritySearchResponse.__name__},
+    ):
+        resp = _type_adapter(V1SimilaritySearchResponse).validate_python(
+            payload, strict=validation == "strict"
+        )
+    return resp.model_dump().get("results", [])
+
+
+def _build_hits(
+    response: httpx.Response,
+    min_score: Optional[float] = None,
+    max_results: Optional[int] = None,
+) -> List[SearchHit]:
+    """Decode the results of a search response straight into `SearchHit` objects."""
+    try:
+        with tracing.start_span("pydi.decode"):
+            payload = from_json(response.content)
+            results = _cut(payload.get("results") or [], min_score, max_results)
+        with tracing.start_span(
+            "pydi.validate", {tracing.ATTR_RESPONSE_MODEL: SearchHit.__name__}
+        ):
+            return [SearchHit.from_result(result) for result in results]
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise UnexpectedResponse(response.status_code, response.content) from e
+
+
+def _merge_top_k(
+    shards: Iterable[List[Dict[str, Any]]], top_k: int
+) -> List[Dict[str, Any]]:
+    """Merge score-ordered result lists into the global top-k using a k-way heap merge."""
+    merged = heapq.merge(*shards, key=lambda result: result["score"], reverse=True)
+    return list(itertools.islice(merged, top_k))
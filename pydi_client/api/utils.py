@@ -1,9 +1,13 @@
 # Copyright Hewlett Packard Enterprise Development LP
 
+import contextvars
+import functools
 import httpx
-import json
+import logging
+from concurrent.futures import Executor, Future
 from httpx import Response
-from typing import Any, Dict, Callable
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Dict, Callable, TypeVar
 
 from pydi_client.sessions.authenticated_session import AuthenticatedSession
 from pydi_client.api.auth import AuthAPI
@@ -11,14 +15,17 @@ from pydi_client.errors import (
     HTTPUnauthorizedException,
     UnexpectedResponse,
     UnexpectedStatus,
+    content_preview,
 )
-from pydi_client.data.collection_manager import ListCollection, ListPipelines
+from pydi_client import tracing
 
 from pydi_client.logger import get_logger  # Importing the logger utility
 
 # Initialize logger for this module
 logger = get_logger()
 
+T = TypeVar("T")
+
 
 def execute_with_retry(
     session, request_func: Callable, **kwargs: Dict[str, Any]
@@ -36,51 +43,116 @@ def execute_with_retry(
     Raises:
         HTTPUnauthorizedException: If the request fails even after retrying.
     """
-    resp = request_func(**kwargs)
-    if resp is not None:
-        logger.debug(
-            "Response Status Code: %s, Response Text: %s",
-            resp.status_code,
-            resp.text,
-        )
+    if tracing.is_enabled():
+        kwargs["headers"] = tracing.inject_trace_context(kwargs.get("headers"))
+
+    # counted in flight so that closing the session waits for the request
+    with session.track_request():
+        # token the request is sent with, so a concurrent refresh is not repeated
+        token = session.token if isinstance(session, AuthenticatedSession) else None
+        resp = _traced_request(request_func, attempt=1, **kwargs)
+        if resp is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Response Status Code: %s, Response Text: %s",
+                    resp.status_code,
+                    content_preview(resp.content),
+                )
+
+            if resp.status_code == 401 or resp.status_code == 403:
+                logger.warning(
+                    "Unauthorized access detected. Attempting to refresh session."
+                )
 
-        if resp.status_code == 401 or resp.status_code == 403:
-            logger.warning(
-                "Unauthorized access detected. Attempting to refresh session."
+                if isinstance(session, AuthenticatedSession):
+                    logger.info("Refreshing session for authenticated user.")
+                    AuthAPI.refresh(
+                        session=session, stale_token=token
+                    )  # Refresh the session
+                    request_func = (
+                        session.get_httpx_client().request
+                    )  # refresh the function
+                    return _traced_request(request_func, attempt=2, **kwargs)
+                else:
+                    raise HTTPUnauthorizedException(
+                        "Unauthorized access. Session is not authenticated."
+                    )
+
+        return resp
+
+
+def submit_in_context(
+    executor: Executor, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> "Future[T]":
+    """
+    Submit a call to an executor, running it in a copy of the caller's context so that
+    e.g. the active trace span is kept in the worker.
+    """
+    context = contextvars.copy_context()
+
+    def call() -> T:
+        return context.run(func, *args, **kwargs)
+
+    return executor.submit(call)
+
+
+def _traced_request(request_func: Callable, attempt: int, **kwargs: Any) -> Response:
+    with tracing.start_span(
+        "pydi.http.request",
+        {
+            tracing.ATTR_HTTP_METHOD: str(kwargs.get("method", "")).upper(),
+            tracing.ATTR_URL_PATH: kwargs.get("url"),
+            tracing.ATTR_ATTEMPT: attempt,
+        },
+    ) as span:
+        resp = request_func(**kwargs)
+        if resp is not None:
+            tracing.set_attributes(
+                span, {tracing.ATTR_HTTP_STATUS_CODE: resp.status_code}
             )
+        return resp
 
-            if isinstance(session, AuthenticatedSession):
-                logger.info("Refreshing session for authenticated user.")
-                AuthAPI.refresh(session=session)  # Refresh the session
-                request_func = (
-                    session.get_httpx_client().request
-                )  # refresh the function
-                return request_func(**kwargs)
-            else:
-                raise HTTPUnauthorizedException(
-                    "Unauthorized access. Session is not authenticated."
-                )
 
-    return resp
+def build_response(
+    *, response: httpx.Response, response_cls: Any, validation: str = "lenient"
+) -> Any:
+    """
+    Build the response model of a successful response.
 
+    The body is validated straight from the JSON bytes with a `TypeAdapter` cached per
+    response model. `validation` is the validation mode of the session:
+    "lenient" uses the default pydantic validation, "strict" rejects values of the wrong
+    type instead of coercing them. "trusted" validates like "lenient": building the nested
+    models without validation (`model_construct` on every level) is slower than pydantic's
+    validation from bytes, so trusted mode only skips the models of similarity search results,
+    see `SimilaritySearchAPI.search`.
 
-def build_response(*, response: httpx.Response, response_cls: Any) -> Any:
+    Raises:
+        UnexpectedResponse: If the body is not JSON or not of the expected shape.
+        UnexpectedStatus: If the status code is not a success.
+    """
     if httpx.codes.OK <= response.status_code <= httpx.codes.CREATED:
 
         response_200 = None
 
-        if not response.content or response.content.strip() == b"":
+        # isspace() checks large bodies without copying them like strip() would
+        if not response.content or response.content.isspace():
             return response_200
 
+        model_name = getattr(response_cls, "__name__", None)
         try:
-            _response_200 = response.json()
-            if response_cls in (ListCollection, ListPipelines):
-                response_200 = response_cls(root=_response_200)
-            else:
-                response_200 = response_cls(**_response_200)
-        except TypeError as e:
-            raise UnexpectedResponse(response.status_code, response.content) from e
-        except json.JSONDecodeError as e:
+            with tracing.start_span(
+                "pydi.validate", {tracing.ATTR_RESPONSE_MODEL: model_name}
+            ):
+                response_200 = _type_adapter(response_cls).validate_json(
+                    response.content, strict=validation == "strict"
+                )
+        except ValidationError as e:
+            # invalid JSON or a body of the wrong type, rather than an invalid field
+            if all(not error["loc"] for error in e.errors()):
+                raise UnexpectedResponse(response.status_code, response.content) from e
+            raise
+        except (TypeError, ValueError) as e:
             raise UnexpectedResponse(response.status_code, response.content) from e
         return response_200
 
@@ -89,4 +161,17 @@ def build_response(*, response: httpx.Response, response_cls: Any) -> Any:
             "Unauthorized access. Please check your credentials or refresh session"
         )
     else:
-        raise UnexpectedStatus(response.status_code, response.content)
+        raise UnexpectedStatus(response.status_code, response.content, response.headers)
+
+
+@functools.lru_cache(maxsize=None)
+def _type_adapter(response_cls: Any) -> TypeAdapter:
+    return TypeAdapter(response_cls)
+
+
+def error_message(error: Exception) -> str:
+    """Short description of an error, for results reporting failures without raising."""
+    if isinstance(error, UnexpectedStatus):
+        content = error.content.decode(errors="ignore")
+        return f"Unexpected status code {error.status_code}: {content}"
+    return f"{type(error).__name__}: {error}"
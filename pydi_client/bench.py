@@ -0,0 +1,359 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Client-side load generation against the DI similarity search API.
+
+Two load models are supported:
+
+- closed-loop: a fixed number of workers each send the next request as soon as the previous
+  one completed, which measures the throughput achievable at that concurrency;
+- open-loop: requests are started at a fixed rate regardless of how long earlier requests
+  take, which measures latency at a given offered load. Latency is measured from the
+  scheduled start time so that delays in the client are not hidden. At most `concurrency`
+  requests are in flight: an arrival finding every slot busy is dropped and counted in the
+  report instead of being queued, as a queue would grow without bound when the server falls
+  behind.
+
+The "thread" engine schedules the requests from the calling thread, the "async" engine from
+an asyncio event loop. The client calls are blocking, so both engines run them on a pool of
+`concurrency` threads: "async" does not allow more requests in flight than "thread".
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydi_client.data.bench import BenchReport, HistogramBucket, LatencySummary
+
+# Upper bounds of the latency histogram buckets in milliseconds
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+MODES = ("open", "closed")
+ENGINES = ("thread", "async")
+
+
+class _Recorder:
+    """Thread-safe collector of request outcomes."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            if error is not None:
+                key = error_key(error)
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+
+def error_key(error: BaseException) -> str:
+    """Name used to group an error in the report, including the status code if known."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    name = type(error).__name__
+    return f"{name}({status_code})" if status_code is not None else name
+
+
+def _timed(call: Callable[[str], Any], query: str, recorder: _Recorder, start: float):
+    error = None
+    try:
+        call(query)
+    except Exception as e:
+        error = e
+    recorder.record(time.perf_counter() - start, error)
+
+
+def run(
+    call: Callable[[str], Any],
+    queries: Sequence[str],
+    *,
+    mode: str = "closed",
+    engine: str = "thread",
+    concurrency: int = 1,
+    qps: Optional[float] = None,
+    duration: Optional[float] = None,
+    requests: Optional[int] = None,
+) -> BenchReport:
+    """
+    Run a load test.
+
+    Args:
+        call (Callable[[str], Any]): Function issuing one request for a query, e.g. a wrapper
+            around `DIClient.similarity_search`. Exceptions are recorded as errors.
+        queries (Sequence[str]): Queries to send, cycled through in order.
+        mode (str): "closed" (fixed concurrency) or "open" (fixed rate, requires `qps`).
+        engine (str): "thread" or "async" to schedule the requests from an asyncio event
+            loop. The calls run on a pool of `concurrency` threads with both engines.
+        concurrency (int): Number of workers for closed-loop runs, maximum number of
+            in-flight requests for open-loop runs. Open-loop arrivals exceeding it are
+            dropped and counted in `BenchReport.dropped`.
+        qps (Optional[float]): Target arrival rate for open-loop runs.
+        duration (Optional[float]): Run time in seconds.
+        requests (Optional[int]): Number of requests to send. At least one of `duration`
+            and `requests` is required; the run stops at whichever is reached first.
+
+    Returns:
+        BenchReport: The latency histogram, error breakdown and achieved throughput.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if not queries:
+        raise ValueError("at least one query is required")
+    if duration is None and requests is None:
+        raise ValueError("either duration or requests is required")
+    if mode == "open" and not qps:
+        raise ValueError("open-loop mode requires qps")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    if mode == "open":
+        # never schedule more requests than fit in the duration at the target rate
+        planned = int(qps * duration) if duration is not None else None  # type: ignore
+        if requests is None or (planned is not None and planned < requests):
+            requests = planned
+
+    recorder = _Recorder()
+    start = time.perf_counter()
+    if engine == "thread":
+        runner = _open_loop_threads if mode == "open" else _closed_loop_threads
+    else:
+        runner = _open_loop_async if mode == "open" else _closed_loop_async
+    runner(call, queries, recorder, concurrency, qps, duration, requests)
+    elapsed = time.perf_counter() - start
+
+    return build_report(
+        recorder.latencies,
+        recorder.errors,
+        elapsed,
+        mode=mode,
+        engine=engine,
+        concurrency=concurrency,
+        qps=qps,
+        dropped=recorder.dropped,
+    )
+
+
+def _closed_loop_threads(call, queries, recorder, concurrency, qps, duration, requests):
+    deadline = time.perf_counter() + duration if duration is not None else None
+    counter = itertools.count()
+
+    def worker():
+        while True:
+            index = next(counter)
+            if requests is not None and index >= requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            _timed(call, queries[index % len(queries)], recorder, time.perf_counter())
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _start_bounded(
+    slots: threading.BoundedSemaphore,
+    recorder: _Recorder,
+    submit: Callable[..., Any],
+    call: Callable[[str], Any],
+    query: str,
+    scheduled: float,
+) -> None:
+    """Submit a request if a slot is free, otherwise count it as dropped."""
+    if not slots.acquire(blocking=False):
+        recorder.dropped += 1
+        return
+
+    def task() -> None:
+        try:
+            _timed(call, query, recorder, scheduled)
+        finally:
+            slots.release()
+
+    submit(task)
+
+
+def _open_loop_threads(call, queries, recorder, concurrency, qps, duration, requests):
+    interval = 1.0 / qps
+    slots = threading.BoundedSemaphore(concurrency)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index in range(requests):
+            scheduled = start + index * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            _start_bounded(
+                slots,
+                recorder,
+                executor.submit,
+                call,
+                queries[index % len(queries)],
+                scheduled,
+            )
+
+
+def _closed_loop_async(call, queries, recorder, concurrency, qps, duration, requests):
+    async def main():
+        loop = asyncio.get_running_loop()
+        deadline = time.perf_counter() + duration if duration is not None else None
+        counter = itertools.count()
+
+        async def worker(executor):
+            while True:
+                index = next(counter)
+                if requests is not None and index >= requests:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                await loop.run_in_executor(
+                    executor,
+                    _timed,
+                    call,
+                    queries[index % len(queries)],
+                    recorder,
+                    time.perf_counter(),
+                )
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            await asyncio.gather(*(worker(executor) for _ in range(concurrency)))
+
+    asyncio.run(main())
+
+
+def _open_loop_async(call, queries, recorder, concurrency, qps, duration, requests):
+    async def main():
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / qps
+        slots = threading.BoundedSemaphore(concurrency)
+        start = time.perf_counter()
+        tasks = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+            def submit(task):
+                tasks.append(loop.run_in_executor(executor, task))
+
+            for index in range(requests):
+                scheduled = start + index * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                _start_bounded(
+                    slots,
+                    recorder,
+                    submit,
+                    call,
+                    queries[index % len(queries)],
+                    scheduled,
+                )
+            await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def build_report(
+    latencies: List[float],
+    errors: Dict[str, int],
+    elapsed: float,
+    *,
+    mode: str,
+    engine: str,
+    concurrency: int,
+    qps: Optional[float] = None,
+    dropped: int = 0,
+) -> BenchReport:
+    """Build a `BenchReport` from raw latencies in seconds."""
+    ordered = sorted(latency * 1000 for latency in latencies)
+
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    bound_index = 0
+    for latency in ordered:
+        while (
+            bound_index < len(HISTOGRAM_BOUNDS_MS)
+            and latency > HISTOGRAM_BOUNDS_MS[bound_index]
+        ):
+            bound_index += 1
+        counts[bound_index] += 1
+    histogram = [
+        HistogramBucket(le_ms=bound, count=count)
+        for bound, count in zip(list(HISTOGRAM_BOUNDS_MS) + [None], counts)
+    ]
+
+    summary = LatencySummary()
+    if ordered:
+        summary = LatencySummary(
+            min=ordered[0],
+            mean=sum(ordered) / len(ordered),
+            p50=_percentile(ordered, 0.50),
+            p90=_percentile(ordered, 0.90),
+            p99=_percentile(ordered, 0.99),
+            max=ordered[-1],
+        )
+
+    failed = sum(errors.values())
+    return BenchReport(
+        mode=mode,
+        engine=engine,
+        target_qps=qps,
+        concurrency=concurrency,
+        requests=len(ordered),
+        successes=len(ordered) - failed,
+        errors=dict(errors),
+        dropped=dropped,
+        duration_s=elapsed,
+        throughput_rps=len(ordered) / elapsed if elapsed > 0 else 0.0,
+        latency_ms=summary,
+        histogram=histogram,
+    )
+
+
+def format_report(report: BenchReport) -> str:
+    """Render a `BenchReport` as human readable text."""
+    lines = [
+        f"mode: {report.mode} ({report.engine})"
+        + (f", target {report.target_qps:g} qps" if report.target_qps else "")
+        + f", concurrency {report.concurrency}",
+        f"requests: {report.requests} in {report.duration_s:.2f}s "
+        f"({report.throughput_rps:.1f} req/s), {report.successes} ok, "
+        f"{report.requests - report.successes} failed"
+        + (f", {report.dropped} dropped" if report.dropped else ""),
+        "latency (ms): "
+        + ", ".join(
+            f"{name} {value:.2f}"
+            for name, value in report.latency_ms.model_dump().items()
+        ),
+        "",
+        "histogram:",
+    ]
+
+    peak = max((bucket.count for bucket in report.histogram), default=0)
+    for bucket in report.histogram:
+        if not bucket.count:
+            continue
+        label = f"<= {bucket.le_ms:g} ms" if bucket.le_ms is not None else "> max"
+        bar = "#" * max(1, round(40 * bucket.count / peak))
+        lines.append(f"  {label:>12} {bucket.count:>8} {bar}")
+
+    if report.errors:
+        lines += ["", "errors:"]
+        for name, count in sorted(report.errors.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name}: {count}")
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Command line interface of the DI client.
+
+    pydi bench search --uri https://di.example.com --collection docs \
+        --queries queries.txt --qps 50 --duration 60
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+from pydi_client import bench
+from pydi_client.di_client import DIClient
+
+
+def read_queries(path: str) -> List[str]:
+    """Read one query per line, skipping empty lines. Use "-" to read from stdin."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def bench_search(args: argparse.Namespace) -> int:
+    queries = read_queries(args.queries)
+    if not queries:
+        print(f"No queries found in {args.queries}", file=sys.stderr)
+        return 2
+    if not args.access_key or not args.secret_key:
+        print(
+            "S3 credentials are required: use --access-key/--secret-key or "
+            "PYDI_ACCESS_KEY/PYDI_SECRET_KEY",
+            file=sys.stderr,
+        )
+        return 2
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+
+    search_parameters = (
+        json.loads(args.search_parameters) if args.search_parameters else None
+    )
+
+    with DIClient(uri=args.uri, timeout=args.timeout) as client:
+
+        def call(query: str):
+            return client.similarity_search(
+                collection_name=args.collection,
+                query=query,
+                top_k=args.top_k,
+                access_key=args.access_key,
+                secret_key=args.secret_key,
+                search_parameters=search_parameters,
+            )
+
+        mode = "open" if args.qps else "closed"
+        report = bench.run(
+            call,
+            queries,
+            mode=mode,
+            engine=args.engine,
+            concurrency=args.concurrency,
+            qps=args.qps,
+            duration=args.duration,
+            requests=args.requests,
+        )
+
+    if args.format == "json":
+        output = report.model_dump_json(indent=2)
+    else:
+        output = bench.format_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pydi", description="Command line tools for the DI client"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench_parser = commands.add_parser("bench", help="load generation")
+    bench_commands = bench_parser.add_subparsers(dest="bench_command", required=True)
+
+    search = bench_commands.add_parser(
+        "search",
+        help="drive /api/v1/similaritySearch at a fixed rate or concurrency",
+        description=(
+            "Send similarity searches using DIClient.similarity_search. Without --qps the "
+            "run is closed-loop with --concurrency workers; with --qps it is open-loop at "
+            "the given arrival rate with at most --concurrency requests in flight, "
+            "arrivals beyond it are dropped and counted in the report."
+        ),
+    )
+    search.add_argument("--uri", required=True, help="base URI of the DI server")
+    search.add_argument("--collection", required=True, help="collection to search")
+    search.add_argument(
+        "--queries", required=True, help='file with one query per line, "-" for stdin'
+    )
+    search.add_argument("--top-k", type=int, default=10)
+    search.add_argument(
+        "--access-key", default=os.environ.get("PYDI_ACCESS_KEY"), help="S3 access key"
+    )
+    search.add_argument(
+        "--secret-key", default=os.environ.get("PYDI_SECRET_KEY"), help="S3 secret key"
+    )
+    search.add_argument(
+        "--search-parameters", help="additional search parameters as a JSON object"
+    )
+    search.add_argument(
+        "--qps", type=float, help="open-loop arrival rate in requests per second"
+    )
+    search.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="closed-loop workers, or in-flight limit for open-loop (default: 1)",
+    )
+    search.add_argument(
+        "--duration", type=float, help="run time in seconds (default: 10)"
+    )
+    search.add_argument("--requests", type=int, help="number of requests to send")
+    search.add_argument(
+        "--engine",
+        choices=bench.ENGINES,
+        default="thread",
+        help="schedule from threads or an asyncio loop, calls run on threads either way",
+    )
+    search.add_argument("--format", choices=("text", "json"), default="text")
+    search.add_argument("--output", help="write the report to this file")
+    search.add_argument(
+        "--timeout", type=float, default=300, help="request timeout in seconds"
+    )
+    search.set_defaults(func=bench_search)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class HistogramBucket(BaseModel):
+    """
+    Represents a bucket of the latency histogram.
+    Attributes:
+        le_ms (Optional[float]): Upper bound of the bucket in milliseconds, None for the overflow bucket.
+        count (int): Number of requests whose latency fell into this bucket.
+    """
+
+    le_ms: Optional[float] = Field(..., description="upper bound of the bucket in ms")
+    count: int = Field(..., description="number of requests in the bucket")
+
+
+class LatencySummary(BaseModel):
+    """
+    Represents summary statistics of request latencies in milliseconds.
+    Attributes:
+        min (float): Fastest request.
+        mean (float): Mean latency.
+        p50 (float): Median latency.
+        p90 (float): 90th percentile latency.
+        p99 (float): 99th percentile latency.
+        max (float): Slowest request.
+    """
+
+    min: float = 0.0
+    mean: float = 0.0
+    p50: float = 0.0
+    p90: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+
+class BenchReport(BaseModel):
+    """
+    Report of a load generation run.
+    Attributes:
+        mode (str): "open" (fixed arrival rate) or "closed" (fixed concurrency).
+        engine (str): "thread" or "async".
+        target_qps (Optional[float]): Requested arrival rate for open-loop runs.
+        concurrency (int): Number of concurrent workers (closed-loop) or in-flight limit (open-loop).
+        requests (int): Number of completed requests.
+        successes (int): Number of successful requests.
+        errors (Dict[str, int]): Number of failed requests per error type.
+        dropped (int): Number of open-loop arrivals not sent as `concurrency` requests were
+            already in flight.
+        duration_s (float): Wall time of the run in seconds.
+        throughput_rps (float): Achieved completed requests per second.
+        latency_ms (LatencySummary): Latency statistics of all requests.
+        histogram (List[HistogramBucket]): Latency histogram of all requests.
+    """
+
+    mode: str
+    engine: str
+    target_qps: Optional[float] = None
+    concurrency: int
+    requests: int
+    successes: int
+    errors: Dict[str, int] = Field(default_factory=dict)
+    dropped: int = 0
+    duration_s: float
+    throughput_rps: float
+    latency_ms: LatencySummary
+    histogram: List[HistogramBucket] = Field(default_factory=list)
@@ -1,7 +1,9 @@
 # Copyright Hewlett Packard Enterprise Development LP
 
+import sys
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 class V1DeletePipelineResponse(BaseModel):
@@ -93,6 +95,24 @@ class BucketUpdateResponse(BaseModel):
     message: str
 
 
+class BulkBucketUpdateResponse(BaseModel):
+    """
+    Response model for updating buckets in a collection in several requests.
+    This model aggregates the responses of the requests, each updating a chunk of the buckets.
+
+    Attributes:
+        success (bool): Indicates if every bucket was updated.
+        succeeded (List[str]): Buckets updated successfully.
+        failed (Dict[str, str]): Buckets which could not be updated, with the error message.
+        responses (List[BucketUpdateResponse]): Responses of the successful requests.
+    """
+
+    success: bool
+    succeeded: List[str]
+    failed: Dict[str, str]
+    responses: List[BucketUpdateResponse]
+
+
 class NodeWithScore(BaseModel):
     """
     Represents a node with its associated score and metadata.
@@ -106,6 +126,135 @@ class NodeWithScore(BaseModel):
     chunkMetadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
 
+# chunkMetadata keys stored as typed fields of SearchHit
+HIT_METADATA_FIELDS = (
+    "objectKey",
+    "bucketName",
+    "startCharIndex",
+    "endCharIndex",
+    "pageLabel",
+    "versionId",
+)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """
+    Compact, immutable similarity search result returned with `result_type="hit"`.
+    The chunk metadata is stored in typed fields instead of a nested dictionary, and the
+    bucket names, object keys and version IDs are interned, so hits of the same objects
+    share their strings.
+    Attributes:
+        score (float): Score associated with the chunk.
+        dataChunk (str): Data chunk associated with the hit.
+        objectKey (Optional[str]): Key of the object the chunk comes from.
+        bucketName (Optional[str]): Bucket of the object.
+        startCharIndex (Optional[int]): Offset of the first character of the chunk.
+        endCharIndex (Optional[int]): Offset after the last character of the chunk.
+        pageLabel (Optional[str]): Label of the page of the chunk.
+        versionId (Optional[str]): Version of the object.
+        extraMetadata (Optional[Dict[str, Any]]): Other chunk metadata, None when there is
+            none.
+    """
+
+    score: float
+    dataChunk: str
+    objectKey: Optional[str] = None
+    bucketName: Optional[str] = None
+    startCharIndex: Optional[int] = None
+    endCharIndex: Optional[int] = None
+    pageLabel: Optional[str] = None
+    versionId: Optional[str] = None
+    extraMetadata: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "SearchHit":
+        """
+        Build a hit from a result of the similarity search response.
+        Raises:
+            TypeError, KeyError, ValueError: If the result is malformed.
+        """
+        data_chunk = result["dataChunk"]
+        if type(data_chunk) is not str:
+            raise TypeError(
+                f"dataChunk must be a string, not {type(data_chunk).__name__}"
+            )
+        metadata = result.get("chunkMetadata") or {}
+        extra = {
+            key: value
+            for key, value in metadata.items()
+            if key not in HIT_METADATA_FIELDS
+        }
+        return cls(
+            float(result["score"]),
+            data_chunk,
+            _intern(metadata.get("objectKey")),
+            _intern(metadata.get("bucketName")),
+            _int(metadata.get("startCharIndex")),
+            _int(metadata.get("endCharIndex")),
+            metadata.get("pageLabel"),
+            _intern(metadata.get("versionId")),
+            extra or None,
+        )
+
+    @property
+    def chunkMetadata(self) -> Dict[str, Any]:
+        """The chunk metadata as a dictionary, as in the default result representation."""
+        metadata = {
+            key: getattr(self, key)
+            for key in HIT_METADATA_FIELDS
+            if getattr(self, key) is not None
+        }
+        if self.extraMetadata:
+            metadata.update(self.extraMetadata)
+        return metadata
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the hit to the default dictionary representation of a result."""
+        return {
+            "score": self.score,
+            "dataChunk": self.dataChunk,
+            "chunkMetadata": self.chunkMetadata,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ContextPassage:
+    """
+    Passage of context assembled from similarity search results by `assemble_context`.
+    Results of the same object whose character ranges overlap or touch are merged into one
+    passage; other results are passages of their own.
+    Attributes:
+        text (str): Text of the passage.
+        score (float): Highest score of the merged results.
+        objectKey (Optional[str]): Key of the object the passage comes from.
+        bucketName (Optional[str]): Bucket of the object.
+        versionId (Optional[str]): Version of the object.
+        startCharIndex (Optional[int]): Offset of the first character of the passage.
+        endCharIndex (Optional[int]): Offset after the last character of the passage.
+        pageLabels (Tuple[str, ...]): Labels of the pages of the merged results, in order.
+        chunks (int): Number of results merged into the passage.
+    """
+
+    text: str
+    score: float
+    objectKey: Optional[str] = None
+    bucketName: Optional[str] = None
+    versionId: Optional[str] = None
+    startCharIndex: Optional[int] = None
+    endCharIndex: Optional[int] = None
+    pageLabels: Tuple[str, ...] = ()
+    chunks: int = 1
+
+
 class V1SimilaritySearchResponse(BaseModel):
     """
     Response model for similarity search in a collection.
@@ -0,0 +1,138 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List, Dict, Optional
+
+
+class PipelineSpec(BaseModel):
+    """
+    Desired configuration of a pipeline, with the arguments of `create_pipeline`.
+    Optional fields left to None are not compared with the existing pipeline.
+    Attributes:
+        name (str): Name of the pipeline.
+        pipeline_type (str): Type of the pipeline (e.g., "rag", "metadata").
+        event_filter_object_suffix (List[str]): File suffixes to filter events.
+        event_filter_max_object_size (Optional[int]): Maximum object size for event filtering.
+        schema_name (Optional[str]): Schema of the pipeline, also accepted as `schema`.
+        model (Optional[str]): Model associated with the pipeline.
+        custom_func (Optional[str]): Custom function used in the pipeline.
+    """
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    name: str
+    pipeline_type: str
+    event_filter_object_suffix: List[str]
+    event_filter_max_object_size: Optional[int] = None
+    schema_name: Optional[str] = Field(default=None, alias="schema")
+    model: Optional[str] = None
+    custom_func: Optional[str] = None
+
+
+class CollectionSpec(BaseModel):
+    """
+    Desired configuration of a collection.
+    Attributes:
+        name (str): Name of the collection.
+        pipeline (str): Pipeline associated with the collection.
+        buckets (Optional[List[str]]): Buckets assigned to the collection. The buckets are not
+            managed when None.
+    """
+
+    name: str
+    pipeline: str
+    buckets: Optional[List[str]] = None
+
+
+class DesiredState(BaseModel):
+    """
+    Desired state of the pipelines and collections, reconciled by `plan`/`apply`.
+    Attributes:
+        pipelines (List[PipelineSpec]): Desired pipelines.
+        collections (List[CollectionSpec]): Desired collections.
+    """
+
+    pipelines: List[PipelineSpec] = Field(default_factory=list)
+    collections: List[CollectionSpec] = Field(default_factory=list)
+
+
+class Plan(BaseModel):
+    """
+    Changes turning the current state into the desired state, applied in this order:
+    collections and pipelines are deleted, pipelines and collections are created, and
+    buckets are unassigned and assigned.
+    A pipeline whose configuration changed is replaced (deleted and created again), as are
+    the collections using it.
+    Attributes:
+        delete_collections (List[str]): Collections to delete.
+        delete_pipelines (List[str]): Pipelines to delete.
+        create_pipelines (List[PipelineSpec]): Pipelines to create.
+        create_collections (List[CollectionSpec]): Collections to create, without buckets.
+        unassign_buckets (Dict[str, List[str]]): Buckets to unassign, per collection.
+        assign_buckets (Dict[str, List[str]]): Buckets to assign, per collection.
+    """
+
+    delete_collections: List[str] = Field(default_factory=list)
+    delete_pipelines: List[str] = Field(default_factory=list)
+    create_pipelines: List[PipelineSpec] = Field(default_factory=list)
+    create_collections: List[CollectionSpec] = Field(default_factory=list)
+    unassign_buckets: Dict[str, List[str]] = Field(default_factory=dict)
+    assign_buckets: Dict[str, List[str]] = Field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        """Whether the current state already matches the desired state."""
+        return not (
+            self.delete_collections
+            or self.delete_pipelines
+            or self.create_pipelines
+            or self.create_collections
+            or self.unassign_buckets
+            or self.assign_buckets
+        )
+
+
+class ApplyResult(BaseModel):
+    """
+    Result of applying a plan. The changes of a step run only when every change of the
+    previous steps succeeded.
+    Attributes:
+        success (bool): Indicates if every change was applied.
+        applied (List[str]): Changes applied, e.g. "create pipeline rag-pipeline".
+        failed (Dict[str, str]): Changes which failed, with the error message.
+    """
+
+    success: bool
+    applied: List[str]
+    failed: Dict[str, str]
+
+
+class BulkItemResult(BaseModel):
+    """
+    Outcome of the creation or deletion of one pipeline or collection by `create_many` or
+    `delete_many`.
+    Attributes:
+        success (bool): Indicates if the operation succeeded.
+        response (Optional[Any]): Response of the operation, e.g. V1DeleteCollectionResponse.
+        error (Optional[str]): Error message if the operation failed.
+        skipped (bool): Indicates if the operation was not run after an earlier failure.
+    """
+
+    success: bool
+    response: Optional[Any] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+
+class BulkResponse(BaseModel):
+    """
+    Response model for creating or deleting several pipelines and collections.
+    Attributes:
+        success (bool): Indicates if every operation succeeded.
+        pipelines (Dict[str, BulkItemResult]): Outcome of every pipeline, by name.
+        collections (Dict[str, BulkItemResult]): Outcome of every collection, by name.
+    """
+
+    success: bool
+    pipelines: Dict[str, BulkItemResult] = Field(default_factory=dict)
+    collections: Dict[str, BulkItemResult] = Field(default_factory=dict)
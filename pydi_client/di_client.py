@@ -2,12 +2,17 @@
 
 from pydi_client.sessions.session import Session
 from pydi_client.sessions.authenticated_session import AuthenticatedSession
+from pydi_client.sessions.token_cache import TokenCache
 from pydi_client.api.collection import CollectionAPI
 from pydi_client.api.pipeline import PipelineAPI
 from pydi_client.api.model import ModelAPI
 from pydi_client.api.schema import SchemaAPI
-from pydi_client.api.search import SimilaritySearchAPI
+from pydi_client.api.search import SearchResults, SimilaritySearchAPI
 from pydi_client.api.auth import AuthAPI
+from pydi_client.api.plan import PlanAPI
+from pydi_client.api.bulk import BulkAPI
+from pydi_client.api.hedging import HedgingPolicy
+from pydi_client.api.rerank import LexicalReranker
 from pydi_client.data.model import ModelTags
 from pydi_client.errors import UnexpectedResponse, UnexpectedStatus
 from pydi_client.utils.utils import deprecated
@@ -21,10 +26,20 @@ from pydi_client.data.collection_manager import (
 )
 from pydi_client.data.pipeline import (
     BucketUpdateResponse,
+    BulkBucketUpdateResponse,
     V1CreatePipelineResponse,
     V1DeletePipelineResponse,
 )
 
+from pydi_client.data.plan import (
+    ApplyResult,
+    BulkResponse,
+    CollectionSpec,
+    DesiredState,
+    PipelineSpec,
+    Plan,
+)
+
 from pydi_client.data.model import (
     V1ModelsResponse,
     V1ListModelsResponse,
@@ -35,7 +50,10 @@ from pydi_client.data.schema import (
     V1ListSchemasResponse,
 )
 
-from typing import Union, Any, List, Dict, Optional
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Union, Any, Callable, List, Dict, Optional, Sequence, Tuple
 
 
 class DIClient:
@@ -67,8 +85,22 @@ class DIClient:
     - Avoid using this class for administrative tasks. For such operations, use the `DIAdminClient` class.
     """
 
-    def __init__(self, *, uri=None) -> None:
-        self._session = Session(uri=uri)  # type: ignore
+    def __init__(self, *, uri=None, **session_args: Any) -> None:
+        """
+        Args:
+            uri (Union[str, List[str]]): Base URI of the DI platform, or a list of base URIs of
+                equivalent DI endpoints to spread the requests over.
+            **session_args: Optional keyword arguments passed on to the underlying `Session`,
+                e.g. `headers`, `timeout`, `httpx_args` (such as a custom `transport`), the
+                `balancer` used with several endpoints or the `validation` mode of the
+                responses ("strict", "lenient" or "trusted").
+        """
+        self._session = Session(uri=uri, **session_args)  # type: ignore
+        # worker processes of `similarity_search_many`, with the pid and size they were
+        # started for
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_key: Optional[Tuple[int, Optional[int]]] = None
+        self._process_pool_lock = threading.Lock()
 
     @property
     def session(self) -> Session:
@@ -195,7 +227,16 @@ class DIClient:
         query: str,
         top_k: int,
         search_parameters: Union[Any, Dict[str, Any]] = None,
-    ) -> Union[Any, List[Dict[str, Any]]]:
+        hedging: Optional[HedgingPolicy] = None,
+        priority: Optional[str] = None,
+        result_type: str = "dict",
+        assemble: bool = False,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        min_score: Optional[float] = None,
+        max_results: Optional[int] = None,
+        rerank: Optional[LexicalReranker] = None,
+    ) -> SearchResults:
         """
         Perform a similarity search on a specified collection using the provided query.
         This method interacts with the SimilaritySearchAPI to retrieve the most relevant
@@ -210,9 +251,37 @@ class DIClient:
             secret_key (str): The secret key for authentication with the API.
             search_parameters (Optional[Union[Any, Dict[str, Any]]]): Additional search parameters
                 that can be passed to the API for fine-tuning the search behavior.
+            hedging (Optional[HedgingPolicy]): Send a duplicate request when the first one is
+                slower than the configured percentile of observed latencies. Reuse the same
+                policy across searches.
+            priority (Optional[str]): Priority class of the request, e.g. "interactive" or
+                "batch", used when the client was created with a `RequestScheduler`.
+            result_type (str): "dict" (default) to return dictionaries, or "hit" to return
+                compact, immutable `SearchHit` objects with typed metadata fields, which use
+                several times less memory for large `top_k`.
+            assemble (bool): Return the results as `ContextPassage` objects ready to be sent to a
+                LLM: chunks with the same text are returned once, and the chunks of an object whose
+                character ranges overlap or touch are merged into one passage. See
+                `pydi_client.api.context.assemble_context`.
+            max_chars (Optional[int]): With `assemble`, maximum total number of characters of the
+                passages; the best passages by score which fit are returned.
+            max_tokens (Optional[int]): With `assemble`, maximum total number of tokens of the
+                passages, estimated at 4 characters per token. Call `assemble_context` with the
+                tokenizer of your LLM for exact counts.
+            min_score (Optional[float]): Return only the results scored at least `min_score`.
+                The results come ordered by score, so the parsing stops at the first result below
+                the threshold instead of validating and converting every result of a large `top_k`.
+            max_results (Optional[int]): Return at most `max_results` results; the server is asked
+                for `min(top_k, max_results)` results.
+            rerank (Optional[LexicalReranker]): Rerank the results with a lexical score (BM25 or
+                TF-IDF) of their chunk for the query, fused with the DI score by reciprocal rank
+                fusion. With `assemble`, the passages follow the reranked order.
 
         Returns:
-            Union[Any, List[Dict[str, Any]]]: A list of dictionaries containing the top `k` similar results, or another data type depending on the API's response.
+            SearchResults: A list of dictionaries containing the top `k` similar results, of `SearchHit`
+            objects with `result_type="hit"`, or of `ContextPassage` objects with `assemble`. With
+            `validation="trusted"`, the dictionaries are returned as decoded: fields missing from the
+            response are not set to their default.
 
         Example usage:
             ```python
@@ -249,8 +318,166 @@ class DIClient:
             access_key=access_key,
             secret_key=secret_key,
             search_parameters=search_parameters,
+            hedging=hedging,
+            priority=priority,
+            result_type=result_type,
+            assemble=assemble,
+            max_chars=max_chars,
+            max_tokens=max_tokens,
+            min_score=min_score,
+            max_results=max_results,
+            rerank=rerank,
         )
     
+    def similarity_search_federated(
+        self,
+        *,
+        access_key: str,
+        secret_key: str,
+        collection_names: List[str],
+        query: str,
+        top_k: int,
+        search_parameters: Union[Any, Dict[str, Any]] = None,
+        overfetch: float = 1.5,
+        max_workers: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Perform a similarity search across several collections (e.g. shards per tenant or per year)
+        and return one ranking of the top `k` results by score.
+        The collections are searched concurrently and the results are merged with a heap-based
+        k-way merge. Every collection is first asked for its share of the results (scaled by
+        `overfetch`), and only collections that could still contribute to the top `k` are
+        queried again, so the result is the same as searching every collection for `top_k`.
+
+        Args:
+            query (str): The search query string used to find similar items.
+            collection_names (List[str]): The names of the collections to search within.
+            top_k (int): The number of top similar results to retrieve across all collections.
+            access_key (str): The access key for authentication with the API.
+            secret_key (str): The secret key for authentication with the API.
+            search_parameters (Optional[Union[Any, Dict[str, Any]]]): Additional search parameters
+                passed to every collection search.
+            overfetch (float): Factor applied to the share of results requested from every collection
+                in the first round. Higher values make a second round less likely. Defaults to 1.5.
+            max_workers (Optional[int]): Maximum number of concurrent searches. Defaults to one per
+                collection, at most 16.
+
+        Returns:
+            List[Dict[str, Any]]: The top `k` results, highest score first, each with an additional
+            `collectionName` key.
+
+        Example usage:
+            ```python
+            client = DIClient(uri="https://example.com")
+            results = client.similarity_search_federated(
+                query="machine learning",
+                collection_names=["papers-2023", "papers-2024", "papers-2025"],
+                top_k=10,
+                access_key="your_access_key",
+                secret_key="your_secret_key",
+            )
+            print(results[0]["collectionName"], results[0]["score"])
+            # Output: papers-2024 0.93
+            ```
+        """
+        return SimilaritySearchAPI(self.session).search_federated(
+            query=query,
+            collection_names=collection_names,
+            top_k=top_k,
+            access_key=access_key,
+            secret_key=secret_key,
+            search_parameters=search_parameters,
+            overfetch=overfetch,
+            max_workers=max_workers,
+        )
+
+    def similarity_search_many(
+        self,
+        *,
+        access_key: str,
+        secret_key: str,
+        collection_name: str,
+        queries: List[str],
+        top_k: int,
+        search_parameters: Union[Any, Dict[str, Any]] = None,
+        executor: Union[str, Executor] = "thread",
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        result_type: str = "dict",
+    ) -> List[SearchResults]:
+        """
+        Perform a similarity search for every query of a list concurrently.
+        With `executor="process"`, the searches run in worker processes so the parsing of large
+        responses uses several CPU cores. The session is pickled to the workers, so it cannot
+        use a transport passed in `httpx_args`. The worker processes are started on the first
+        call and reused by the following ones with the same `max_workers`, until the client is
+        closed.
+
+        Args:
+            queries (List[str]): The search query strings.
+            collection_name (str): The name of the collection to search within.
+            top_k (int): The number of top similar results to retrieve per query.
+            access_key (str): The access key for authentication with the API.
+            secret_key (str): The secret key for authentication with the API.
+            search_parameters (Optional[Union[Any, Dict[str, Any]]]): Additional search parameters.
+            executor (Union[str, Executor]): "thread" (default), "process", or an executor to run
+                the searches in, such as a `ThreadPoolExecutor`, which is left running.
+            max_workers (Optional[int]): Number of worker threads or processes.
+            chunksize (int): Number of queries handed to a worker process at once.
+            result_type (str): "dict" (default) or "hit", see `similarity_search`.
+
+        Returns:
+            List[SearchResults]: The results of every query, in the order of `queries`, as
+            dictionaries or, with `result_type="hit"`, `SearchHit` objects.
+
+        Example usage:
+            ```python
+            client = DIClient(uri="https://example.com")
+            results = client.similarity_search_many(
+                queries=["machine learning", "vector databases"],
+                collection_name="research_papers",
+                top_k=100,
+                access_key="your_access_key",
+                secret_key="your_secret_key",
+                executor="process",
+                max_workers=4,
+            )
+            print(len(results[1]))
+            # Output: 100
+            ```
+        """
+        api = SimilaritySearchAPI(self.session)
+        if executor == "process":
+            executor = self._get_process_pool(api, max_workers)
+        return api.search_many(
+            queries=queries,
+            collection_name=collection_name,
+            top_k=top_k,
+            access_key=access_key,
+            secret_key=secret_key,
+            search_parameters=search_parameters,
+            executor=executor,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            result_type=result_type,
+        )
+
+    def _get_process_pool(
+        self, api: SimilaritySearchAPI, max_workers: Optional[int]
+    ) -> ProcessPoolExecutor:
+        pid = os.getpid()
+        with self._process_pool_lock:
+            if self._process_pool is not None:
+                started_pid, workers = self._process_pool_key  # type: ignore
+                if (started_pid, workers) == (pid, max_workers):
+                    return self._process_pool
+                if started_pid == pid:
+                    # started for another size; a pool inherited by fork is left alone
+                    self._process_pool.shutdown(wait=False)
+            self._process_pool = api.process_pool(max_workers=max_workers)
+            self._process_pool_key = (pid, max_workers)
+            return self._process_pool
+
     def get_model(self, *, name: str) -> V1ModelsResponse:
         """
         Retrieve a model by its name.
@@ -307,6 +534,47 @@ class DIClient:
         """
         return ModelAPI(self.session).get_models()
 
+    def close(self, *, timeout: Optional[float] = 30.0) -> None:
+        """
+        Close the connections of the client, once the requests in flight completed, and shut
+        down the worker processes of `similarity_search_many`.
+
+        Args:
+            timeout (Optional[float]): Seconds given to the requests in flight to complete
+                before their connections are closed. None waits for as long as they take.
+
+        Example usage:
+            ```python
+                with DIClient(uri="https://example.com") as client:
+                    collections = client.get_all_collections()
+                # the connections are closed here
+            ```
+        """
+        with self._process_pool_lock:
+            pool, self._process_pool = self._process_pool, None
+            key, self._process_pool_key = self._process_pool_key, None
+        if pool is not None and key[0] == os.getpid():  # type: ignore
+            pool.shutdown()
+        self.session.close(timeout=timeout)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # a copy sent to another process starts its own worker processes
+        state = self.__dict__.copy()
+        for name in ("_process_pool", "_process_pool_key", "_process_pool_lock"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._process_pool = None
+        self._process_pool_key = None
+        self._process_pool_lock = threading.Lock()
+
+    def __enter__(self) -> "DIClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
 
 
 class DIAdminClient(DIClient):
@@ -344,12 +612,41 @@ class DIAdminClient(DIClient):
     --------
     """
 
-    def __init__(self, *, uri: str, username: str, password: str) -> None:
-        super().__init__(uri=uri)
+    def __init__(
+        self,
+        *,
+        uri: Union[str, List[str]],
+        username: str,
+        password: str,
+        per_endpoint_tokens: bool = False,
+        token_cache: Optional[TokenCache] = None,
+        **session_args: Any,
+    ) -> None:
+        """
+        Args:
+            uri (Union[str, List[str]]): Base URI of the DI platform, or a list of base URIs of
+                equivalent DI endpoints to spread the requests over.
+            username (str): Username used to log in.
+            password (str): Password used to log in.
+            per_endpoint_tokens (bool): With several endpoints, log in to every endpoint instead
+                of using the token of the first login everywhere.
+            token_cache (Optional[TokenCache]): On-disk cache of tokens, reusing a still valid
+                token of a previous process instead of logging in.
+            **session_args: Optional keyword arguments passed on to both the `Session` and the
+                `AuthenticatedSession`, e.g. `headers`, `timeout`, `httpx_args` or `balancer`.
+        """
+        super().__init__(uri=uri, **session_args)
+        # both sessions share the endpoint state
+        session_args.setdefault("balancer", self._session.balancer)
 
         # create session with auth
         self._authenticated_session = AuthAPI.login(
-            uri=uri, username=username, password=password
+            uri=uri,
+            username=username,
+            password=password,
+            per_endpoint_tokens=per_endpoint_tokens,
+            token_cache=token_cache,
+            **session_args,
         )
 
     @property
@@ -363,6 +660,18 @@ class DIAdminClient(DIClient):
         """
         return self._authenticated_session
 
+    def close(self, *, timeout: Optional[float] = 30.0) -> None:
+        """
+        Close the connections of both the session and the authenticated session, once the
+        requests in flight completed.
+
+        Args:
+            timeout (Optional[float]): Seconds given to the requests in flight to complete
+                before their connections are closed. None waits for as long as they take.
+        """
+        super().close(timeout=timeout)
+        self.authenticated_session.close(timeout=timeout)
+
     def create_collection(
         self, *, name: str, pipeline: str, buckets: Optional[List[str]] = None
     ) -> V1CollectionResponse:
@@ -514,6 +823,96 @@ class DIAdminClient(DIClient):
             collection_name=collection_name, buckets=buckets
         )
 
+    def assign_buckets_bulk(
+        self,
+        *,
+        collection_name: str,
+        buckets: List[str],
+        chunk_size: int = 100,
+        max_concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BulkBucketUpdateResponse:
+        """
+        Assigns a large number of buckets to a specified collection, in chunks of
+        `chunk_size` buckets sent concurrently.
+
+        A chunk failing with a transport error or a 429/5xx status is retried, and a chunk
+        rejected as too large (413) is split. Failed chunks do not stop the others.
+
+        Args:
+            collection_name (str): The name of the collection to which the buckets
+                will be assigned.
+            buckets (List[str]): The bucket names to be assigned.
+            chunk_size (int): Number of buckets per request.
+            max_concurrency (int): Maximum number of requests sent at once.
+            retries (int): Number of retries of a failed chunk.
+            backoff (float): Seconds waited before the first retry of a chunk, doubled at
+                every retry.
+            progress (Optional[Callable[[int, int], None]]): Called after every chunk with the
+                number of buckets processed so far and the total number of buckets.
+
+        Returns:
+            BulkBucketUpdateResponse: The buckets assigned, and the buckets which could not
+            be assigned with the error message.
+
+        Example Usage:
+            ```python
+            client = DIAdminClient(uri="http://example.com", username="admin", password="password")
+            response = client.assign_buckets_bulk(
+                collection_name="my_collection",
+                buckets=[f"tenant-{index}" for index in range(5000)],
+                chunk_size=200,
+                max_concurrency=8,
+                progress=lambda done, total: print(f"{done}/{total}"),
+            )
+            if not response.success:
+                print(response.failed)
+            # Output:
+            # {"tenant-42": "Unexpected status code 400: ...", ...}
+            ```
+        """
+        return CollectionAPI(session=self.authenticated_session).assign_buckets_bulk(
+            collection_name=collection_name,
+            buckets=buckets,
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            retries=retries,
+            backoff=backoff,
+            progress=progress,
+        )
+
+    def unassign_buckets_bulk(
+        self,
+        *,
+        collection_name: str,
+        buckets: List[str],
+        chunk_size: int = 100,
+        max_concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> BulkBucketUpdateResponse:
+        """
+        Unassigns a large number of buckets from a specified collection, in chunks of
+        `chunk_size` buckets sent concurrently. The arguments are the same as for
+        `assign_buckets_bulk`.
+
+        Returns:
+            BulkBucketUpdateResponse: The buckets unassigned, and the buckets which could not
+            be unassigned with the error message.
+        """
+        return CollectionAPI(session=self.authenticated_session).unassign_buckets_bulk(
+            collection_name=collection_name,
+            buckets=buckets,
+            chunk_size=chunk_size,
+            max_concurrency=max_concurrency,
+            retries=retries,
+            backoff=backoff,
+            progress=progress,
+        )
+
     def create_pipeline(
         self,
         *,
@@ -603,6 +1002,169 @@ class DIAdminClient(DIClient):
             name=name
         )
 
+    def create_many(
+        self,
+        *,
+        pipelines: Sequence[Union[PipelineSpec, Dict[str, Any]]] = (),
+        collections: Sequence[Union[CollectionSpec, Dict[str, Any]]] = (),
+        stop_on_failure: bool = False,
+        max_workers: int = 8,
+    ) -> BulkResponse:
+        """
+        Creates several pipelines and collections concurrently. The pipelines are created
+        first, so the collections can use them.
+
+        Args:
+            pipelines (Sequence[Union[PipelineSpec, Dict[str, Any]]]): The pipelines to create,
+                with the arguments of `create_pipeline`.
+            collections (Sequence[Union[CollectionSpec, Dict[str, Any]]]): The collections to
+                create, with their pipeline and optional buckets.
+            stop_on_failure (bool): Skip the creations not started yet after a failure.
+            max_workers (int): Maximum number of concurrent requests.
+
+        Returns:
+            BulkResponse: The outcome of every creation, with the V1CreatePipelineResponse or
+            V1CollectionResponse of the successful ones.
+
+        Raises:
+            ValueError: If two pipelines or two collections have the same name.
+
+        Example usage:
+            ```python
+            client = DIAdminClient(uri="http://example.com", username="admin", password="password")
+            response = client.create_many(
+                pipelines=[{
+                    "name": "rag-pipeline",
+                    "pipeline_type": "rag",
+                    "model": "example_model",
+                    "event_filter_object_suffix": ["*.pdf"],
+                }],
+                collections=[
+                    {"name": f"test-{index}", "pipeline": "rag-pipeline"} for index in range(20)
+                ],
+            )
+            print(response.success, response.collections["test-0"])
+            # Output: True BulkItemResult(success=True, response=V1CollectionResponse(...), ...)
+            ```
+        """
+        return BulkAPI(self.authenticated_session, max_workers=max_workers).create_many(
+            pipelines=pipelines,
+            collections=collections,
+            stop_on_failure=stop_on_failure,
+        )
+
+    def delete_many(
+        self,
+        *,
+        collections: Sequence[str] = (),
+        pipelines: Sequence[str] = (),
+        stop_on_failure: bool = False,
+        max_workers: int = 8,
+    ) -> BulkResponse:
+        """
+        Deletes several collections and pipelines concurrently. The collections are deleted
+        first, so their pipelines can be deleted next.
+
+        Args:
+            collections (Sequence[str]): Names of the collections to delete.
+            pipelines (Sequence[str]): Names of the pipelines to delete.
+            stop_on_failure (bool): Skip the deletions not started yet after a failure.
+            max_workers (int): Maximum number of concurrent requests.
+
+        Returns:
+            BulkResponse: The outcome of every deletion, with the V1DeleteCollectionResponse
+            or V1DeletePipelineResponse of the successful ones.
+
+        Example usage:
+            ```python
+            client = DIAdminClient(uri="http://example.com", username="admin", password="password")
+            response = client.delete_many(
+                collections=[f"test-{index}" for index in range(20)],
+                pipelines=["rag-pipeline"],
+            )
+            if not response.success:
+                print({name: result.error for name, result in response.collections.items()})
+            ```
+        """
+        return BulkAPI(self.authenticated_session, max_workers=max_workers).delete_many(
+            collections=collections,
+            pipelines=pipelines,
+            stop_on_failure=stop_on_failure,
+        )
+
+    def plan(
+        self,
+        desired_state: Union[DesiredState, Dict[str, Any]],
+        *,
+        prune: bool = False,
+        max_workers: int = 8,
+    ) -> Plan:
+        """
+        Computes the changes turning the current pipelines, collections and bucket
+        assignments into a desired state. The current state is fetched concurrently.
+
+        A pipeline whose configuration differs from the desired one is replaced, as are the
+        collections using it, since pipelines cannot be updated. Review the plan before
+        applying it.
+
+        Args:
+            desired_state (Union[DesiredState, Dict[str, Any]]): The desired pipelines and
+                collections. Collections with `buckets` set to None keep their buckets.
+            prune (bool): Also delete the pipelines and collections missing from the desired
+                state.
+            max_workers (int): Maximum number of concurrent requests.
+
+        Returns:
+            Plan: The pipelines and collections to delete and create, and the buckets to
+            unassign and assign.
+
+        Example usage:
+            ```python
+            client = DIAdminClient(uri="http://example.com", username="admin", password="password")
+            plan = client.plan({
+                "pipelines": [{
+                    "name": "rag-pipeline",
+                    "pipeline_type": "rag",
+                    "model": "example_model",
+                    "event_filter_object_suffix": ["*.pdf"],
+                }],
+                "collections": [
+                    {"name": "docs", "pipeline": "rag-pipeline", "buckets": ["bucket1"]},
+                ],
+            })
+            print(plan)
+            # Output: Plan(
+            #     delete_collections=[], delete_pipelines=[],
+            #     create_pipelines=[PipelineSpec(name="rag-pipeline", ...)],
+            #     create_collections=[CollectionSpec(name="docs", pipeline="rag-pipeline", buckets=[])],
+            #     unassign_buckets={}, assign_buckets={"docs": ["bucket1"]}
+            # )
+            result = client.apply(plan)
+            ```
+        """
+        return PlanAPI(self.authenticated_session, max_workers=max_workers).plan(
+            desired_state=desired_state, prune=prune
+        )
+
+    def apply(self, plan: Plan, *, max_workers: int = 8) -> ApplyResult:
+        """
+        Applies the changes of a plan computed by `plan`, in dependency order: collections
+        and pipelines are deleted, then pipelines and collections are created, then buckets
+        are unassigned and assigned. The changes of a step run concurrently, and the next
+        step only runs when every change of the step succeeded.
+
+        Args:
+            plan (Plan): The changes to apply.
+            max_workers (int): Maximum number of concurrent requests.
+
+        Returns:
+            ApplyResult: The changes applied, and the changes which failed with the error
+            message.
+        """
+        return PlanAPI(self.authenticated_session, max_workers=max_workers).apply(
+            plan=plan
+        )
+
     def get_schema(self, *, name: str) -> V1SchemasResponse:
         """
         Retrieve a schema by its name.
@@ -1,5 +1,21 @@
 # Copyright Hewlett Packard Enterprise Development LP
 
+from typing import Mapping, Optional
+
+# Bytes of the response body kept by the exceptions, and shown in their messages
+ERROR_CONTENT_SIZE = 64 * 1024
+ERROR_PREVIEW_SIZE = 2048
+
+
+def content_preview(content: bytes, limit: int = ERROR_PREVIEW_SIZE) -> str:
+    """Decode at most `limit` bytes of a response body, noting how much was left out."""
+    if len(content) <= limit:
+        return content.decode(errors="ignore")
+    return (
+        f"{content[:limit].decode(errors='ignore')}"
+        f"... [{len(content) - limit} more bytes]"
+    )
+
 
 class NotImplementedException(Exception):
     """Exception raised for methods that are not implemented."""
@@ -28,12 +44,20 @@ class SimilaritySearchFailureException(Exception):
 class UnexpectedStatus(Exception):
     """Raised by api functions when the response status an unexpected status"""
 
-    def __init__(self, status_code: int, content: bytes):
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
         self.status_code = status_code
-        self.content = content
+        # a huge error page is not kept alive by the exception
+        self.content = content[:ERROR_CONTENT_SIZE]
+        # e.g. `Retry-After`, with lowercase names
+        self.headers = {name.lower(): value for name, value in (headers or {}).items()}
 
         super().__init__(
-            f"Unexpected status code: {status_code}\n\nResponse content:\n{content.decode(errors='ignore')}"
+            f"Unexpected status code: {status_code}\n\nResponse content:\n{content_preview(content)}"
         )
 
 
@@ -42,8 +66,29 @@ class UnexpectedResponse(Exception):
 
     def __init__(self, status_code: int, response: bytes):
         self.status_code = status_code
-        self.response = response
+        self.response = response[:ERROR_CONTENT_SIZE]
 
         super().__init__(
-            f"Unexpected response: {status_code}\n\nResponse content:\n{response.decode(errors='ignore')}"
+            f"Unexpected response: {status_code}\n\nResponse content:\n{content_preview(response)}"
         )
+
+
+class ResponseTooLargeException(Exception):
+    """Exception raised when a response body exceeds the size allowed by the session."""
+
+    def __init__(self, size: int, limit: int, url: Optional[str] = None):
+        self.size = size
+        self.limit = limit
+        self.url = url
+
+        super().__init__(
+            f"Response body of {url or 'the request'} exceeds {limit} bytes "
+            f"({size} bytes received or announced)"
+        )
+
+
+class ReplayMissException(Exception):
+    """Exception raised when a replayed request has no matching recorded response."""
+
+    def __init__(self, message="No recorded response matches the request."):
+        super().__init__(message)
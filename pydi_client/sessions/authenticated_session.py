@@ -1,27 +1,31 @@
 # Copyright Hewlett Packard Enterprise Development LP
 
-from typing import Any, Dict, Optional
+from typing import Dict, Optional
 
 import httpx
-from attrs import define, evolve, field
+from attrs import define, field
 
+from pydi_client.sessions.balancer import LoadBalancingTransport
+from pydi_client.sessions.base import BaseSession
+from pydi_client.sessions.token_cache import TokenCache
 
-@define
-class AuthenticatedSession:
+
+# pickling is implemented by BaseSession
+@define(getstate_setstate=False)
+class AuthenticatedSession(BaseSession):
     """
     Class for handling REST API requests.
     This class is responsible for making HTTP requests to a specified URL and
     handling the response.
-    """
 
-    _headers: Dict[str, str] = field(factory=dict, kw_only=True, alias="headers")
-    _timeout: Optional[httpx.Timeout] = field(
-        default=300, kw_only=True, alias="timeout"
-    )
-    _client: Optional[httpx.Client] = field(default=None, init=False)
-    _httpx_args: Dict[str, Any] = field(factory=dict, kw_only=True, alias="httpx_args")
+    With several endpoints and `per_endpoint_tokens` set, a token is obtained from every
+    endpoint the requests are sent to, for deployments where endpoints do not share their
+    token signing keys.
+
+    With a `token_cache`, the session was possibly created from a cached token, and tokens
+    obtained by refreshes are stored in the cache for the next processes.
+    """
 
-    uri: str = field(kw_only=True, alias="uri")
     username: str = field(kw_only=True, alias="username")
     password: str = field(kw_only=True, alias="password")
     # sha256_pinned_cert:str
@@ -32,36 +36,44 @@ class AuthenticatedSession:
         kw_only=True,
         alias="auth_header_name",
     )
+    per_endpoint_tokens: bool = field(
+        default=False, kw_only=True, alias="per_endpoint_tokens"
+    )
+    # where refreshed tokens are stored, see `pydi_client.sessions.token_cache`
+    token_cache: Optional[TokenCache] = field(
+        default=None, kw_only=True, alias="token_cache"
+    )
 
-    def with_headers(self, headers: Dict[str, str]) -> "AuthenticatedSession":
-        """Get a new session matching this one with additional headers"""
-        if self._client is not None:
-            self._client.headers.update(headers)
-        return evolve(self, headers={**self._headers, **headers})
+    def set_token(self, token: str) -> None:
+        """Replace the token used by the session, e.g. after logging in again"""
+        with self._lock:
+            self.token = token
+            if self._client is not None:
+                self._swap_headers({self.auth_header_name: token})
 
-    def with_timeout(self, timeout: httpx.Timeout) -> "AuthenticatedSession":
-        """Get a new session matching this one with a new timeout (in seconds)"""
-        if self._client is not None:
-            self._client.timeout = timeout
-        return evolve(self, timeout=timeout)
+    def _client_headers(self) -> Dict[str, str]:
+        return {**self._headers, self.auth_header_name: self.token}
 
-    def set_httpx_client(self, client: httpx.Client) -> "AuthenticatedSession":
-        """Manually set the underlying httpx.Client
+    def _balancing_transport(
+        self, transport: httpx.BaseTransport
+    ) -> LoadBalancingTransport:
+        if not self.per_endpoint_tokens:
+            return super()._balancing_transport(transport)
+        return LoadBalancingTransport(
+            uris=self.uri,  # type: ignore
+            balancer=self.balancer,  # type: ignore
+            transport=transport,
+            authenticate=self._login,
+            auth_header_name=self.auth_header_name,
+        )
 
-        **NOTE**: This will override any other settings on the client, including headers, and timeout.
-        """
-        self._client = client
-        return self
+    def _login(self, uri: str) -> str:
+        from pydi_client.api.auth import AuthAPI
 
-    def get_httpx_client(self) -> httpx.Client:
-        """Get the underlying httpx.Client, constructing a new one if not previously set"""
-        if self._client is None:
-            self._headers[self.auth_header_name] = self.token
-            self._client = httpx.Client(
-                base_url=self.uri,
-                headers=self._headers,
-                timeout=self._timeout,
-                verify=False,
-                **self._httpx_args,
-            )
-        return self._client
+        return AuthAPI.login(
+            uri=uri,
+            username=self.username,
+            password=self.password,
+            timeout=self._timeout,
+            httpx_args=self._httpx_args,
+        ).token
@@ -0,0 +1,357 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Client-side load balancing across several DI endpoints (e.g. gateway replicas).
+
+A `LoadBalancer` keeps the state of every endpoint (outstanding requests, latency EWMA and
+passive health) and picks an endpoint for every request using a `BalancingStrategy`.
+`LoadBalancingTransport` is the httpx transport used by the sessions when they are created
+with a list of URIs; it rewrites every request to the chosen endpoint and fails idempotent
+requests over to another endpoint when one is unreachable or overloaded.
+"""
+
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import httpx
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.utils.utils import ResetOnPickle
+
+# Initialize logger for this module
+logger = get_logger()
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# POST endpoints which do not modify server state and can be retried on another endpoint.
+# Login is not one of them: it issues a token, and a token issued by an endpoint which then
+# timed out would be lost
+IDEMPOTENT_PATHS = ("/api/v1/similaritySearch",)
+# Statuses treated as an endpoint failure, the request is retried elsewhere if idempotent
+FAILOVER_STATUSES = (502, 503, 504)
+
+
+class Endpoint:
+    """
+    State of a single DI endpoint.
+    Attributes:
+        uri (str): Base URI of the endpoint.
+        outstanding (int): Number of requests currently in flight.
+        latency_ewma (Optional[float]): Exponentially weighted moving average of the latency in
+            seconds, None until the first response.
+        consecutive_failures (int): Number of failures since the last success.
+        ejected_until (float): `time.monotonic()` until which the endpoint is not used.
+    """
+
+    def __init__(self, uri: str) -> None:
+        self.uri = uri.rstrip("/")
+        self.url = httpx.URL(self.uri)
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def __repr__(self) -> str:
+        return (
+            f"Endpoint({self.uri!r}, outstanding={self.outstanding}, "
+            f"latency_ewma={self.latency_ewma}, failures={self.consecutive_failures})"
+        )
+
+
+class BalancingStrategy(ResetOnPickle):
+    """
+    Base class of the endpoint selection strategies.
+    Subclasses implement `choose`, which is called with the lock of the load balancer held.
+    """
+
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+        raise NotImplementedError
+
+
+class RoundRobin(BalancingStrategy):
+    """Use the endpoints in turn."""
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+        return endpoints[next(self._counter) % len(endpoints)]
+
+
+class LeastOutstanding(BalancingStrategy):
+    """Use the endpoint with the fewest requests in flight, in turn among ties."""
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+        offset = next(self._counter)
+        rotated = [
+            endpoints[(offset + index) % len(endpoints)]
+            for index in range(len(endpoints))
+        ]
+        return min(rotated, key=lambda endpoint: endpoint.outstanding)
+
+
+class LatencyEWMA(BalancingStrategy):
+    """
+    Use the endpoint with the lowest expected latency, i.e. its latency EWMA multiplied by the
+    number of requests that would be in flight. Endpoints without a measurement are tried first.
+    """
+
+    def __init__(self) -> None:
+        self._counter = itertools.count()
+
+    def choose(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+        unprobed = [e for e in endpoints if e.latency_ewma is None]
+        if unprobed:
+            return unprobed[next(self._counter) % len(unprobed)]
+        return min(
+            endpoints,
+            key=lambda e: e.latency_ewma * (e.outstanding + 1),  # type: ignore
+        )
+
+
+STRATEGIES: Dict[str, Callable[[], BalancingStrategy]] = {
+    "round_robin": RoundRobin,
+    "least_outstanding": LeastOutstanding,
+    "latency_ewma": LatencyEWMA,
+}
+
+
+class LoadBalancer(ResetOnPickle):
+    """
+    LoadBalancer - endpoint selection and passive health tracking
+    Endpoints failing `max_failures` times in a row (connection errors, timeouts or 502/503/504
+    responses) are ejected for `ejection_time` seconds. When every endpoint is ejected, the one
+    whose ejection ends first is used anyway.
+
+    A load balancer can be shared by several sessions (e.g. the `Session` and the
+    `AuthenticatedSession` of a `DIAdminClient`) so they see the same endpoint state.
+
+    Example usage:
+        ```python
+        balancer = LoadBalancer(strategy="latency_ewma", max_failures=2)
+        client = DIClient(uri=["https://di-1:8443", "https://di-2:8443"], balancer=balancer)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        strategy: Union[str, BalancingStrategy] = "round_robin",
+        max_failures: int = 3,
+        ejection_time: float = 30.0,
+        ewma_alpha: float = 0.3,
+    ) -> None:
+        """
+        Args:
+            strategy (Union[str, BalancingStrategy]): "round_robin", "least_outstanding",
+                "latency_ewma" or a custom `BalancingStrategy`.
+            max_failures (int): Consecutive failures after which an endpoint is ejected.
+            ejection_time (float): Seconds an ejected endpoint is not used.
+            ewma_alpha (float): Weight of the latest latency in the latency EWMA.
+        """
+        if isinstance(strategy, str):
+            if strategy not in STRATEGIES:
+                raise ValueError(
+                    f"Unknown balancing strategy {strategy!r}, "
+                    f"expected one of {sorted(STRATEGIES)}"
+                )
+            strategy = STRATEGIES[strategy]()
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.ewma_alpha = ewma_alpha
+        self._endpoints: Dict[str, Endpoint] = {}
+        self._lock = threading.Lock()
+
+    def endpoints(self, uris: Sequence[str]) -> List[Endpoint]:
+        """Get the state of the given endpoints, creating it on first use."""
+        with self._lock:
+            return [
+                self._endpoints.setdefault(uri.rstrip("/"), Endpoint(uri))
+                for uri in uris
+            ]
+
+    def acquire(
+        self, endpoints: Sequence[Endpoint], exclude: Sequence[Endpoint] = ()
+    ) -> Endpoint:
+        """Choose an endpoint for a request and count it as outstanding."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [e for e in endpoints if e not in exclude] or list(endpoints)
+            healthy = [e for e in candidates if e.is_healthy(now)]
+            if healthy:
+                endpoint = self.strategy.choose(healthy)
+            else:
+                # every endpoint is ejected, use the one that recovers first
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, latency: float, failed: bool) -> None:
+        """Record the outcome of a request sent to `endpoint`."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.max_failures:
+                    endpoint.ejected_until = time.monotonic() + self.ejection_time
+                    logger.warning(
+                        "Ejecting endpoint %s for %.1fs after %d consecutive failures",
+                        endpoint.uri,
+                        self.ejection_time,
+                        endpoint.consecutive_failures,
+                    )
+                return
+
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = 0.0
+            if endpoint.latency_ewma is None:
+                endpoint.latency_ewma = latency
+            else:
+                endpoint.latency_ewma += self.ewma_alpha * (
+                    latency - endpoint.latency_ewma
+                )
+
+
+def is_idempotent(request: httpx.Request) -> bool:
+    """Check whether a request can safely be sent again to another endpoint."""
+    return request.method in IDEMPOTENT_METHODS or request.url.path.endswith(
+        IDEMPOTENT_PATHS
+    )
+
+
+class LoadBalancingTransport(httpx.BaseTransport):
+    """
+    httpx transport sending every request to an endpoint chosen by a `LoadBalancer`.
+
+    The client using this transport has the first endpoint as base URL; the path below that
+    base URL is moved to the chosen endpoint. Idempotent requests failing with a transport
+    error or a 502/503/504 response are retried on another endpoint, at most once per endpoint.
+
+    When `authenticate` is set, an Authorization token is kept per endpoint: it is obtained
+    by calling `authenticate(endpoint_uri)` before the first request to the endpoint, and
+    again once if the endpoint answers 401. Logins to an endpoint are serialized, logins to
+    different endpoints are not.
+    """
+
+    def __init__(
+        self,
+        *,
+        uris: Sequence[str],
+        balancer: LoadBalancer,
+        transport: httpx.BaseTransport,
+        authenticate: Optional[Callable[[str], str]] = None,
+        auth_header_name: str = "Authorization",
+    ) -> None:
+        self.balancer = balancer
+        self.endpoints = balancer.endpoints(uris)
+        self._transport = transport
+        self._authenticate = authenticate
+        self._auth_header_name = auth_header_name
+        self._base_path = self.endpoints[0].url.raw_path.rstrip(b"/")
+        self._tokens: Dict[str, str] = {}
+        # guards `_tokens` and `_login_locks`, never held during a login
+        self._auth_lock = threading.Lock()
+        self._login_locks: Dict[str, threading.Lock] = {}
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        content = request.read()
+        tried: List[Endpoint] = []
+        retryable = is_idempotent(request)
+
+        while True:
+            endpoint = self.balancer.acquire(self.endpoints, exclude=tried)
+            tried.append(endpoint)
+            last_attempt = not retryable or len(tried) >= len(self.endpoints)
+            start = time.perf_counter()
+            # any exception, e.g. a failed login, counts as a failure of the endpoint
+            failed = True
+            try:
+                response = self._send(endpoint, request, content)
+                failed = response.status_code in FAILOVER_STATUSES
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                logger.warning(
+                    "Request to %s failed (%s), failing over", endpoint.uri, e
+                )
+                continue
+            finally:
+                self.balancer.release(endpoint, time.perf_counter() - start, failed)
+
+            if not failed or last_attempt:
+                return response
+            logger.warning(
+                "Endpoint %s answered %d, failing over",
+                endpoint.uri,
+                response.status_code,
+            )
+            response.close()
+
+    def _send(
+        self, endpoint: Endpoint, request: httpx.Request, content: bytes
+    ) -> httpx.Response:
+        rewritten = self._rewrite(endpoint, request, content)
+        response = self._transport.handle_request(rewritten)
+        if response.status_code == 401 and self._authenticate is not None:
+            # the endpoint token expired, log in to that endpoint again and retry once
+            response.close()
+            stale_token = rewritten.headers.get(self._auth_header_name)
+            with self._auth_lock:
+                # unless a concurrent request logged in again meanwhile
+                if self._tokens.get(endpoint.uri) == stale_token:
+                    self._tokens.pop(endpoint.uri, None)
+            response = self._transport.handle_request(
+                self._rewrite(endpoint, request, content)
+            )
+        return response
+
+    def _rewrite(
+        self, endpoint: Endpoint, request: httpx.Request, content: bytes
+    ) -> httpx.Request:
+        raw_path = request.url.raw_path
+        if self._base_path and raw_path.startswith(self._base_path):
+            raw_path = raw_path[len(self._base_path) :]
+        url = endpoint.url.copy_with(
+            raw_path=endpoint.url.raw_path.rstrip(b"/") + raw_path
+        )
+
+        headers = request.headers.copy()
+        headers["Host"] = url.netloc.decode("ascii")
+        if self._authenticate is not None and not url.path.endswith("/login"):
+            headers[self._auth_header_name] = self._token(endpoint)
+        return httpx.Request(
+            request.method,
+            url,
+            headers=headers,
+            content=content,
+            extensions=request.extensions,
+        )
+
+    def _token(self, endpoint: Endpoint) -> str:
+        with self._auth_lock:
+            token = self._tokens.get(endpoint.uri)
+            if token is not None:
+                return token
+            login_lock = self._login_locks.setdefault(endpoint.uri, threading.Lock())
+
+        with login_lock:
+            with self._auth_lock:
+                token = self._tokens.get(endpoint.uri)
+            if token is None:
+                # the first request to the endpoint logs in, the others wait for its token
+                logger.info("Logging in to endpoint %s", endpoint.uri)
+                token = self._authenticate(endpoint.uri)  # type: ignore
+                with self._auth_lock:
+                    self._tokens[endpoint.uri] = token
+            return token
+
+    def close(self) -> None:
+        self._transport.close()
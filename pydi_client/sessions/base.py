@@ -0,0 +1,320 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import contextlib
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import httpx
+from attrs import define, evolve, field, fields, validators
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+from pydi_client.sessions.balancer import LoadBalancer, LoadBalancingTransport
+from pydi_client.sessions.batching import BatchingTransport, SearchBatcher
+from pydi_client.sessions.compression import Compression, CompressionTransport
+from pydi_client.sessions.limits import RateLimits, RateLimitingTransport
+from pydi_client.sessions.scheduler import RequestScheduler, SchedulingTransport
+from pydi_client.sessions.size_limits import (
+    ResponseSizeLimitingTransport,
+    ResponseSizeLimits,
+)
+
+# Initialize logger for this module
+logger = get_logger()
+
+# httpx.Client arguments which configure the default transport. They are passed to the
+# transport instead when the session builds its own transport.
+TRANSPORT_ARGS = ("verify", "cert", "http1", "http2", "limits", "trust_env", "proxy")
+# Validation modes of the responses, see `pydi_client.api.utils.build_response`
+VALIDATION_MODES = ("strict", "lenient", "trusted")
+
+
+@define
+class BaseSession:
+    """
+    Base class of the sessions, holding the configuration of the underlying httpx.Client.
+
+    `uri` is either the base URI of the DI server or a list of base URIs of equivalent DI
+    endpoints. With a list, requests are spread over the endpoints by `balancer`
+    (round-robin by default), see `pydi_client.sessions.balancer`.
+
+    `limits` applies client-side rate and concurrency limits to every request sent through the
+    session, see `pydi_client.sessions.limits`. `scheduler` orders the requests by priority
+    class when more are pending than it lets through, see `pydi_client.sessions.scheduler`.
+    `batcher` sends concurrent similarity searches as multi-query requests, see
+    `pydi_client.sessions.batching`. `size_limits` bounds the size of the response bodies,
+    see `pydi_client.sessions.size_limits`. `compression` negotiates compressed responses,
+    compresses large request bodies and measures the bytes on the wire, see
+    `pydi_client.sessions.compression`.
+
+    `validation` is how the responses are turned into models: "lenient" (the default pydantic
+    validation), "strict" (no type coercion) or "trusted" (similarity search results are
+    returned as decoded, without validation, for callers trusting the server; the other
+    responses are validated as with "lenient").
+
+    Sessions are fork-safe: a session used in a child process (e.g. after a `multiprocessing`
+    or gunicorn fork) builds its own httpx.Client instead of sharing the parent's connections.
+    Sessions pickle as their configuration only, without the httpx.Client.
+
+    Sessions are thread-safe: the shared httpx.Client is built once, and `with_headers`,
+    `with_timeout` and token refreshes replace its headers and timeout with new objects
+    instead of mutating them, so a request being sent sees either the old or the new values.
+
+    `close()` waits for the requests in flight to complete and closes the connections of the
+    httpx.Client; sessions are also context managers closing themselves on exit.
+    """
+
+    uri: Union[str, List[str]] = field(kw_only=True, alias="uri")
+    _headers: Dict[str, str] = field(factory=dict, kw_only=True, alias="headers")
+    _timeout: Optional[httpx.Timeout] = field(
+        default=300, kw_only=True, alias="timeout"
+    )
+    _client: Optional[httpx.Client] = field(default=None, kw_only=True, init=False)
+    # process which built `_client`
+    _pid: Optional[int] = field(default=None, kw_only=True, init=False)
+    # `_client` was built by the session, not set by the caller, and is closed by it
+    _owns_client: bool = field(default=False, kw_only=True, init=False)
+    # guards `_client` and its headers and timeout
+    _lock: threading.RLock = field(factory=threading.RLock, kw_only=True, init=False)
+    # number of requests in flight, notified when it drops to zero
+    _in_flight: int = field(default=0, kw_only=True, init=False)
+    _idle: threading.Condition = field(
+        factory=threading.Condition, kw_only=True, init=False
+    )
+    _httpx_args: Dict[str, Any] = field(factory=dict, kw_only=True, alias="httpx_args")
+    balancer: Optional[LoadBalancer] = field(
+        default=None, kw_only=True, alias="balancer"
+    )
+    limits: Optional[RateLimits] = field(default=None, kw_only=True, alias="limits")
+    scheduler: Optional[RequestScheduler] = field(
+        default=None, kw_only=True, alias="scheduler"
+    )
+    batcher: Optional[SearchBatcher] = field(
+        default=None, kw_only=True, alias="batcher"
+    )
+    size_limits: Optional[ResponseSizeLimits] = field(
+        default=None, kw_only=True, alias="size_limits"
+    )
+    compression: Optional[Compression] = field(
+        default=None, kw_only=True, alias="compression"
+    )
+    validation: str = field(
+        default="lenient",
+        kw_only=True,
+        alias="validation",
+        validator=validators.in_(VALIDATION_MODES),
+    )
+
+    def __attrs_post_init__(self) -> None:
+        if self.balancer is None and not isinstance(self.uri, str):
+            self.balancer = LoadBalancer()
+
+    @property
+    def base_uri(self) -> str:
+        """The base URI of the DI server, or of the first endpoint when several are used"""
+        return self.uri if isinstance(self.uri, str) else self.uri[0]
+
+    def with_headers(self, headers: Dict[str, str]) -> "BaseSession":
+        """Get a new session matching this one with additional headers"""
+        with self._lock:
+            if self._client is not None:
+                self._swap_headers(headers)
+            return evolve(self, headers={**self._headers, **headers})
+
+    def with_timeout(self, timeout: httpx.Timeout) -> "BaseSession":
+        """Get a new session matching this one with a new timeout (in seconds)"""
+        with self._lock:
+            if self._client is not None:
+                self._client.timeout = timeout
+            return evolve(self, timeout=timeout, headers=dict(self._headers))
+
+    def _swap_headers(self, headers: Dict[str, str]) -> None:
+        # copy-on-write: requests being sent keep merging the headers object they read
+        merged = httpx.Headers(self._client.headers)  # type: ignore
+        merged.update(headers)
+        self._client.headers = merged  # type: ignore
+
+    def set_httpx_client(self, client: httpx.Client) -> "BaseSession":
+        """Manually set the underlying httpx.Client
+
+        **NOTE**: This will override any other settings on the client, including headers, and timeout.
+        The client belongs to the caller: the session never closes it. A client previously
+        built by the session is closed.
+        """
+        with self._lock:
+            if self._client is not None and self._client is not client:
+                self._close_client(self._client, self._owns_client)
+            self._client = client
+            self._pid = os.getpid()
+            self._owns_client = False
+        return self
+
+    def get_httpx_client(self) -> httpx.Client:
+        """Get the underlying httpx.Client, constructing a new one if not previously set"""
+        pid = os.getpid()
+        client = self._client
+        if client is not None and self._pid in (None, pid):
+            return client
+
+        with self._lock:
+            if self._client is not None and self._pid not in (None, pid):
+                # inherited through a fork, the connections belong to the parent process
+                # and are left alone
+                logger.info(
+                    "Process forked, building a new HTTP client in process %d", pid
+                )
+                self._client = None
+            if self._client is None:
+                self._client = self._build_client()
+                self._pid = pid
+                self._owns_client = True
+            return self._client
+
+    @contextlib.contextmanager
+    def track_request(self) -> Iterator[None]:
+        """Count a request as in flight for the duration of the block, see `close()`"""
+        with self._idle:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                if self._in_flight == 0:
+                    self._idle.notify_all()
+
+    def close(self, *, timeout: Optional[float] = 30.0) -> None:
+        """Close the underlying httpx.Client and its connections
+
+        The requests in flight are given up to `timeout` seconds (None waits for as long as
+        they take) to complete before the connections are closed. A client set with
+        `set_httpx_client`, or a transport passed in `httpx_args`, belongs to the caller and is
+        not closed. The session stays usable: a new httpx.Client is built by the next request.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(
+                        "Closing the HTTP client with %d requests in flight",
+                        self._in_flight,
+                    )
+                    break
+                self._idle.wait(remaining)
+
+        with self._lock:
+            client, self._client = self._client, None
+            pid, self._pid = self._pid, None
+            owned, self._owns_client = self._owns_client, False
+        # a client inherited through a fork shares its connections with the parent process
+        if client is not None and pid in (None, os.getpid()):
+            self._close_client(client, owned)
+
+    def __enter__(self) -> "BaseSession":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _close_client(self, client: httpx.Client, owned: bool) -> None:
+        # closing a client closes its transport, which is the caller's when passed in
+        # `httpx_args`
+        if owned and "transport" not in self._httpx_args:
+            client.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            attribute.name: getattr(self, attribute.name)
+            for attribute in fields(type(self))
+            if attribute.name
+            not in ("_client", "_pid", "_owns_client", "_lock", "_in_flight", "_idle")
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self._client = None
+        self._pid = None
+        self._owns_client = False
+        self._lock = threading.RLock()
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    def _build_client(self) -> httpx.Client:
+        if not self._wraps_transport():
+            return httpx.Client(
+                base_url=self.base_uri,
+                headers=self._client_headers(),
+                timeout=self._timeout,
+                verify=False,
+                **self._httpx_args,
+            )
+
+        httpx_args = dict(self._httpx_args)
+        transport_args = {
+            name: httpx_args.pop(name) for name in TRANSPORT_ARGS if name in httpx_args
+        }
+        transport_args.setdefault("verify", False)
+        transport = httpx_args.pop("transport", None) or httpx.HTTPTransport(
+            **transport_args
+        )
+        return httpx.Client(
+            base_url=self.base_uri,
+            headers=self._client_headers(),
+            timeout=self._timeout,
+            transport=self._wrap_transport(transport),
+            **httpx_args,
+        )
+
+    def _client_headers(self) -> Dict[str, str]:
+        return self._headers
+
+    def _wraps_transport(self) -> bool:
+        return not isinstance(self.uri, str) or any(
+            feature is not None
+            for feature in (
+                self.limits,
+                self.scheduler,
+                self.batcher,
+                self.size_limits,
+                self.compression,
+            )
+        )
+
+    def _wrap_transport(self, transport: httpx.BaseTransport) -> httpx.BaseTransport:
+        """Compose the transports implementing the features configured on the session"""
+        if not isinstance(self.uri, str):
+            transport = self._balancing_transport(transport)
+        if self.compression is not None:
+            # closest to the wire, the other transports see plain bodies
+            transport = CompressionTransport(
+                compression=self.compression, transport=transport
+            )
+        if self.limits is not None:
+            # limits apply to the deployment as a whole, whichever endpoint is used
+            transport = RateLimitingTransport(limits=self.limits, transport=transport)
+        if self.scheduler is not None:
+            transport = SchedulingTransport(
+                scheduler=self.scheduler, transport=transport
+            )
+        if self.batcher is not None:
+            # a batch is scheduled and limited as a single request
+            transport = BatchingTransport(batcher=self.batcher, transport=transport)
+        if self.size_limits is not None:
+            # bounds the responses handed to the caller, including those split from a batch
+            transport = ResponseSizeLimitingTransport(
+                limits=self.size_limits, transport=transport
+            )
+        return transport
+
+    def _balancing_transport(
+        self, transport: httpx.BaseTransport
+    ) -> LoadBalancingTransport:
+        return LoadBalancingTransport(
+            uris=self.uri,  # type: ignore
+            balancer=self.balancer,  # type: ignore
+            transport=transport,
+        )
@@ -0,0 +1,310 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Micro-batching of concurrent similarity searches into multi-query requests.
+
+Searches sent concurrently through a session with a `SearchBatcher` and targeting the same
+server and collection with the same headers (e.g. the session token), credentials and search
+parameters are collected for up to `window`
+seconds (or until `max_batch_size` searches are waiting) and sent as one request to the
+multi-query endpoint:
+
+    POST /api/v1/similaritySearch/batch
+    {"collectionName": ..., "credentials": ..., "searchParams": ...,
+     "queries": [{"query": ..., "topK": ...}, ...]}
+
+which answers with one similarity search response per query, in order:
+
+    {"responses": [{"success": true, "message": ..., "results": [...]}, ...]}
+
+A search is sent on its own right away, without waiting for others, when no other search
+is in flight through the batcher.
+
+When the server answers the first batch with 404 or 405, the first search of the batch is
+sent on its own: if it succeeds, the server does not support batching, the batcher stops
+batching and every search is sent on its own, concurrently from the calling threads. If it
+fails too, e.g. because the collection does not exist, batching is tried again later.
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.utils.utils import ResetOnPickle
+
+# Initialize logger for this module
+logger = get_logger()
+
+SEARCH_PATH = "/api/v1/similaritySearch"
+BATCH_SEARCH_PATH = "/api/v1/similaritySearch/batch"
+# Statuses meaning that the server has no multi-query endpoint
+UNSUPPORTED_STATUSES = (404, 405)
+# Headers set per request, which do not keep searches out of a batch
+PER_REQUEST_HEADERS = ("content-length", "traceparent", "tracestate", "baggage")
+
+
+class _Item:
+    __slots__ = ("request", "query", "done", "response", "error", "fallback")
+
+    def __init__(self, request: httpx.Request, query: Dict[str, Any]) -> None:
+        self.request = request
+        self.query = query
+        self.done = threading.Event()
+        self.response: Optional[httpx.Response] = None
+        self.error: Optional[BaseException] = None
+        self.fallback = False
+
+
+class _Batch:
+    __slots__ = ("body", "items", "full")
+
+    def __init__(self, body: Dict[str, Any]) -> None:
+        self.body = body
+        self.items: List[_Item] = []
+        self.full = threading.Event()
+
+
+class SearchBatcher(ResetOnPickle):
+    """
+    SearchBatcher - collects concurrent similarity searches into multi-query requests
+    Batching trades up to `window` seconds of added latency for fewer requests, which pays
+    off for high-QPS callers issuing many concurrent searches. A batcher can be shared by
+    several sessions: only searches sent to the same URL with the same headers, and thus
+    the same server and token, are batched together.
+
+    Example usage:
+        ```python
+        client = DIClient(uri="https://di.example.com", batcher=SearchBatcher(window=0.002))
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        window: float = 0.002,
+        max_batch_size: int = 16,
+        path: str = BATCH_SEARCH_PATH,
+    ) -> None:
+        """
+        Args:
+            window (float): Seconds the first search of a batch waits for others.
+            max_batch_size (int): Number of searches sending a batch right away.
+            path (str): Path of the multi-query search endpoint.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.path = path
+        # None until the server answered a batch request
+        self.supported: Optional[bool] = None
+        self.batches = 0
+        self.batched_searches = 0
+        self._open: Dict[str, _Batch] = {}
+        # number of searches being sent through the batcher
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def send(
+        self, request: httpx.Request, transport: httpx.BaseTransport
+    ) -> httpx.Response:
+        """Send a similarity search request, batched with concurrent ones when possible."""
+        if self.supported is False:
+            return transport.handle_request(request)
+        try:
+            body = json.loads(request.read())
+        except ValueError:
+            return transport.handle_request(request)
+
+        query = {"query": body.pop("query", None), "topK": body.pop("topK", None)}
+        key = _batch_key(request, body)
+        item = _Item(request, query)
+        with self._lock:
+            self._in_flight += 1
+            batch = self._open.get(key)
+            leader = batch is None
+            if batch is None:
+                batch = self._open[key] = _Batch(body)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_batch_size or self._in_flight == 1:
+                # full, or alone: no other search is coming soon to join the batch
+                del self._open[key]
+                batch.full.set()
+
+        try:
+            if leader:
+                self._lead(key, batch, transport)
+            elif not item.done.wait(_batch_timeout(request, self.window)):
+                raise httpx.ReadTimeout(
+                    "No response to the batched similarity search", request=request
+                )
+
+            if item.fallback:
+                return transport.handle_request(request)
+            if item.error is not None:
+                raise item.error
+            return item.response  # type: ignore
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _lead(self, key: str, batch: _Batch, transport: httpx.BaseTransport) -> None:
+        try:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._dispatch(batch, transport)
+        finally:
+            # the other searches are never left waiting, even if the dispatch failed
+            self._finish(
+                [item for item in batch.items if not item.done.is_set()], fallback=True
+            )
+
+    def _dispatch(self, batch: _Batch, transport: httpx.BaseTransport) -> None:
+        items = batch.items
+        if len(items) == 1 or self.supported is False:
+            self._finish(items, fallback=True)
+            return
+
+        first = items[0].request
+        request = httpx.Request(
+            "POST",
+            first.url.copy_with(path=first.url.path[: -len(SEARCH_PATH)] + self.path),
+            headers={
+                name: value
+                for name, value in first.headers.items()
+                if name.lower() != "content-length"
+            },
+            json={**batch.body, "queries": [item.query for item in items]},
+            extensions=first.extensions,
+        )
+        try:
+            response = transport.handle_request(request)
+            try:
+                content = response.read()
+            finally:
+                response.close()
+        except Exception as e:
+            # raised in every thread waiting for the batch
+            self._finish(items, error=e)
+            return
+
+        if response.status_code in UNSUPPORTED_STATUSES:
+            # searches are sent alone, so a missing collection is reported as usual; once a
+            # batch succeeded, a 404 is not taken as missing batch support
+            if self.supported is None:
+                self._check_support(items[0], transport)
+            self._finish(items[1:], fallback=True)
+            return
+        self.supported = True
+
+        if response.status_code != httpx.codes.OK:
+            # every search gets the error, handled as if it had been sent alone
+            for item in items:
+                item.response = httpx.Response(
+                    response.status_code,
+                    headers={
+                        name: value
+                        for name, value in response.headers.items()
+                        if name.lower() not in ("content-encoding", "content-length")
+                    },
+                    content=content,
+                    request=item.request,
+                )
+            self._finish(items)
+            return
+
+        try:
+            responses = json.loads(content)["responses"]
+            if len(responses) != len(items):
+                raise ValueError(
+                    f"{len(responses)} responses for a batch of {len(items)} searches"
+                )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error("Invalid batched similarity search response: %s", e)
+            self._finish(items, fallback=True)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.batched_searches += len(items)
+        for item, payload in zip(items, responses):
+            item.response = httpx.Response(200, json=payload, request=item.request)
+        self._finish(items)
+
+    def _check_support(self, item: _Item, transport: httpx.BaseTransport) -> None:
+        """
+        Send a search of a batch answered with 404/405 on its own. Only if it succeeds, the
+        multi-query endpoint is missing, rather than e.g. the collection.
+        """
+        try:
+            item.response = transport.handle_request(item.request)
+        except Exception as e:
+            item.error = e
+        else:
+            if item.response.is_success and self.supported is None:
+                logger.info(
+                    "Server does not support batched similarity searches, "
+                    "sending searches one by one"
+                )
+                self.supported = False
+        item.done.set()
+
+    @staticmethod
+    def _finish(
+        items: List[_Item],
+        *,
+        fallback: bool = False,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        for item in items:
+            item.fallback = fallback
+            item.error = error
+            item.done.set()
+
+
+def _batch_key(request: httpx.Request, body: Dict[str, Any]) -> str:
+    """
+    Key of the batch a search can join. The batch is sent to the URL and with the headers
+    of its first search, so they must match as well as the search parameters.
+    """
+    headers = sorted(
+        (name.lower(), value)
+        for name, value in request.headers.items()
+        if name.lower() not in PER_REQUEST_HEADERS
+    )
+    return json.dumps([str(request.url), headers, body], sort_keys=True)
+
+
+def _batch_timeout(request: httpx.Request, window: float) -> Optional[float]:
+    """
+    Time a search waits for the response to its batch: the window, and the timeouts of
+    the request for sending the batch and reading its response. None to wait for ever.
+    """
+    timeouts = request.extensions.get("timeout", {})
+    parts = [timeouts.get(name) for name in ("pool", "connect", "write", "read")]
+    if any(part is None for part in parts):
+        return None
+    return window + sum(parts)
+
+
+class BatchingTransport(httpx.BaseTransport):
+    """httpx transport sending similarity searches through a `SearchBatcher`."""
+
+    def __init__(
+        self, *, batcher: SearchBatcher, transport: httpx.BaseTransport
+    ) -> None:
+        self.batcher = batcher
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST" and request.url.path.endswith(SEARCH_PATH):
+            return self.batcher.send(request, self._transport)
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        self._transport.close()
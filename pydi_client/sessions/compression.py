@@ -0,0 +1,355 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Compression of the response and request bodies, and measurement of the bytes on the wire.
+
+Similarity search responses carry the text of every chunk and compress well. The sessions
+route every request through a `CompressionTransport` when created with `compression=`, which:
+
+- asks for compressed responses with `Accept-Encoding`, listing the encodings whose decoder is
+  installed: zstd (`zstandard` package), br (`brotli` or `brotlicffi` package) and gzip;
+- decodes the responses itself, in pieces of bounded size, so the limits of `size_limits` apply
+  to the decoded bodies and stop a decompression bomb early;
+- gzip-compresses the request bodies larger than `request_threshold` bytes, e.g. long bucket
+  lists, for servers accepting compressed requests;
+- records the bytes sent and received on the wire, and the size of the bodies before
+  compression, as attributes of the `pydi.http.request` span and in `Compression.stats`.
+"""
+
+import gzip
+import threading
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+from pydi_client import tracing
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.utils.utils import ResetOnPickle
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None  # type: ignore
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        import brotlicffi as brotli  # type: ignore
+    except ImportError:
+        brotli = None  # type: ignore
+
+# Initialize logger for this module
+logger = get_logger()
+
+# Encodings in order of preference
+ENCODINGS = ("zstd", "br", "gzip")
+
+# Encodings decoded by `decoder`, when their decoder is installed
+DECODED_ENCODINGS = ENCODINGS + ("deflate",)
+# Maximum size of the pieces decoded by the gzip and deflate decoders
+DECODED_CHUNK_SIZE = 64 * 1024
+# Bytes given at once to the decoders without an output bound (br, zstd)
+_UNBOUNDED_INPUT_SIZE = 256
+
+# (decompress, flush) functions of a decoder; decompress yields the decoded pieces
+Decoder = Tuple[Callable[[bytes], Iterator[bytes]], Callable[[], bytes]]
+
+
+def available_encodings() -> List[str]:
+    """Get the response encodings whose decoder is installed, in order of preference."""
+    installed = {"zstd": zstandard is not None, "br": brotli is not None, "gzip": True}
+    return [encoding for encoding in ENCODINGS if installed[encoding]]
+
+
+def can_decode(encoding: str) -> bool:
+    """Check whether `decoder` can decode a response `Content-Encoding`."""
+    return encoding == "deflate" or encoding in available_encodings()
+
+
+def decoder(encoding: str) -> Decoder:
+    """
+    Get a decoder of one response body. The gzip and deflate decoders yield pieces of at most
+    `DECODED_CHUNK_SIZE` bytes; the br and zstd ones are given the body a few bytes at a
+    time, so their pieces are bounded by the compression ratio of a few bytes.
+    """
+    if encoding == "gzip":
+        return _zlib_decoder(zlib.MAX_WBITS | 16)
+    if encoding == "deflate":
+        return _zlib_decoder(zlib.MAX_WBITS)
+    if encoding == "br":
+        brotli_decoder = brotli.Decompressor()
+        # brotli names the method process, brotlicffi decompress
+        process = getattr(brotli_decoder, "process", None) or brotli_decoder.decompress
+        return _sliced(process), lambda: b""
+    return _zstd_decoder()
+
+
+def _zlib_decoder(wbits: int) -> Decoder:
+    zlib_decoder = zlib.decompressobj(wbits)
+
+    def decompress(data: bytes) -> Iterator[bytes]:
+        while True:
+            output = zlib_decoder.decompress(data, DECODED_CHUNK_SIZE)
+            data = zlib_decoder.unconsumed_tail
+            if output:
+                yield output
+            if not data and len(output) < DECODED_CHUNK_SIZE:
+                return
+
+    return decompress, zlib_decoder.flush
+
+
+def _sliced(decompress: Callable[[bytes], bytes]) -> Callable[[bytes], Iterator[bytes]]:
+    def sliced(data: bytes) -> Iterator[bytes]:
+        for start in range(0, len(data), _UNBOUNDED_INPUT_SIZE):
+            output = decompress(data[start : start + _UNBOUNDED_INPUT_SIZE])
+            if output:
+                yield output
+
+    return sliced
+
+
+def _zstd_decoder() -> Decoder:
+    zstd_decoder = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(data: bytes) -> bytes:
+        nonlocal zstd_decoder
+        output = [zstd_decoder.decompress(data)]
+        # a body may hold several frames
+        while zstd_decoder.eof and zstd_decoder.unused_data:
+            unused = zstd_decoder.unused_data
+            zstd_decoder = zstandard.ZstdDecompressor().decompressobj()
+            output.append(zstd_decoder.decompress(unused))
+        return b"".join(output)
+
+    return _sliced(decompress), lambda: zstd_decoder.flush()
+
+
+class TransferStats(ResetOnPickle):
+    """
+    Totals of the bytes transferred through a `CompressionTransport`, e.g. to measure the
+    bandwidth saved: `response_body_bytes / bytes_received` is the compression ratio of the
+    responses.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals = {
+            "requests": 0,
+            "bytes_sent": 0,
+            "request_body_bytes": 0,
+            "bytes_received": 0,
+            "response_body_bytes": 0,
+        }
+
+    def record_request(self, *, sent: int, body: int) -> None:
+        with self._lock:
+            self._totals["requests"] += 1
+            self._totals["bytes_sent"] += sent
+            self._totals["request_body_bytes"] += body
+
+    def record_response(self, *, received: int, body: int) -> None:
+        with self._lock:
+            self._totals["bytes_received"] += received
+            self._totals["response_body_bytes"] += body
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Get the totals: number of requests, body bytes sent on the wire and before
+        compression, body bytes received on the wire and after decoding.
+        """
+        with self._lock:
+            return dict(self._totals)
+
+
+class Compression(ResetOnPickle):
+    """
+    Compression - compression settings of a session
+    A compression object can be shared by several sessions, which then share its `stats`.
+
+    Example usage:
+        ```python
+        compression = Compression(request_threshold=64 * 1024)
+        client = DIAdminClient(uri=..., username=..., password=..., compression=compression)
+        ...
+        print(compression.stats.snapshot())
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        encodings: Optional[Sequence[str]] = None,
+        request_threshold: Optional[int] = None,
+        request_level: int = 6,
+    ) -> None:
+        """
+        Args:
+            encodings (Optional[Sequence[str]]): Response encodings to ask for, in order of
+                preference. Defaults to every encoding whose decoder is installed.
+            request_threshold (Optional[int]): Size in bytes above which request bodies are
+                gzip-compressed. Request bodies are not compressed when None.
+            request_level (int): gzip compression level of the request bodies, 1 to 9.
+        """
+        available = available_encodings()
+        if encodings is None:
+            encodings = available
+        missing = [encoding for encoding in encodings if encoding not in available]
+        if missing:
+            raise ValueError(f"No decoder installed for the encodings {missing}")
+        self.encodings = list(encodings)
+        self.request_threshold = request_threshold
+        self.request_level = request_level
+        self.stats = TransferStats()
+
+
+class _DecodingStream(httpx.SyncByteStream):
+    """
+    Body stream decoding the wire bytes, if encoded, and reporting their size on close.
+    The decoded pieces are yielded as they are produced, so a size limit applied to the
+    stream stops the decoding as soon as the decoded body exceeds it.
+    """
+
+    def __init__(
+        self,
+        stream: httpx.SyncByteStream,
+        decoder: Optional[Decoder],
+        report: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        self._stream = stream
+        self._decoder = decoder
+        self._report = report
+        self._received = 0
+        self._decoded = 0
+        self._reported = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._received += len(chunk)
+            if self._decoder is None:
+                self._decoded += len(chunk)
+                yield chunk
+                continue
+            for piece in self._decoder[0](chunk):
+                self._decoded += len(piece)
+                yield piece
+        if self._decoder is not None:
+            tail = self._decoder[1]()
+            self._decoded += len(tail)
+            if tail:
+                yield tail
+
+    def close(self) -> None:
+        self._stream.close()
+        if not self._reported and self._report is not None:
+            self._reported = True
+            self._report(self._received, self._decoded)
+
+
+def content_encoding(response: httpx.Response) -> str:
+    return response.headers.get("content-encoding", "").strip().lower()
+
+
+def decoded_headers(response: httpx.Response) -> httpx.Headers:
+    """Headers of a response once its body is decoded."""
+    return httpx.Headers(
+        [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length")
+        ]
+    )
+
+
+class CompressionTransport(httpx.BaseTransport):
+    """httpx transport negotiating compressed responses and compressing request bodies."""
+
+    def __init__(
+        self, *, compression: Compression, transport: httpx.BaseTransport
+    ) -> None:
+        self.compression = compression
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request = self._compress(request)
+        if self.compression.encodings:
+            request.headers["Accept-Encoding"] = ", ".join(self.compression.encodings)
+        response = self._transport.handle_request(request)
+
+        encoding = content_encoding(response)
+        body_decoder = None
+        headers = response.headers
+        if encoding in self.compression.encodings:
+            body_decoder = decoder(encoding)
+            headers = decoded_headers(response)
+
+        def report(received: int, decoded: int) -> None:
+            self.compression.stats.record_response(received=received, body=decoded)
+            tracing.set_current_attributes(
+                {
+                    tracing.ATTR_RESPONSE_BODY_SIZE: received,
+                    tracing.ATTR_RESPONSE_DECODED_SIZE: decoded,
+                    tracing.ATTR_RESPONSE_CONTENT_ENCODING: encoding or None,
+                }
+            )
+
+        # the wire bytes are read from the stream even when the response was already read
+        # (and decoded) by the wrapped transport
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            stream=_DecodingStream(response.stream, body_decoder, report),  # type: ignore
+            request=request,
+            extensions=response.extensions,
+        )
+
+    def _compress(self, request: httpx.Request) -> httpx.Request:
+        try:
+            body = request.content
+        except httpx.RequestNotRead:
+            # streamed bodies are sent as they are
+            body = None
+
+        sent = size = len(body) if body is not None else 0
+        threshold = self.compression.request_threshold
+        if (
+            body is not None
+            and threshold is not None
+            and size > threshold
+            and "content-encoding" not in request.headers
+        ):
+            compressed = gzip.compress(
+                body, compresslevel=self.compression.request_level, mtime=0
+            )
+            if len(compressed) < size:
+                logger.debug(
+                    "Request body of %s compressed from %d to %d bytes",
+                    request.url.path,
+                    size,
+                    len(compressed),
+                )
+                headers = request.headers.copy()
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Length"] = str(len(compressed))
+                request = httpx.Request(
+                    request.method,
+                    request.url,
+                    headers=headers,
+                    content=compressed,
+                    extensions=request.extensions,
+                )
+                sent = len(compressed)
+
+        self.compression.stats.record_request(sent=sent, body=size)
+        tracing.set_current_attributes(
+            {
+                tracing.ATTR_REQUEST_BODY_SIZE: sent,
+                tracing.ATTR_REQUEST_UNCOMPRESSED_SIZE: size,
+            }
+        )
+        return request
+
+    def close(self) -> None:
+        self._transport.close()
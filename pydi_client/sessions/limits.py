@@ -0,0 +1,382 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Client-side rate limiting and adaptive concurrency control.
+
+`RateLimits` holds one `OperationLimiter` per operation class: similarity searches, metadata
+reads (GET requests) and admin operations (any other request). Each limiter combines an
+optional `TokenBucket` capping the request rate and an optional `AIMDLimiter` adapting the
+number of requests in flight to the latency and errors observed. The sessions route every
+request through a `RateLimitingTransport` when created with `limits=`, so all API objects
+created from one session share the same limits.
+
+A request holds its concurrency slot until its response is closed, i.e. until its body was
+read, and waits for a slot for at most the pool timeout of the request before failing with
+`httpx.PoolTimeout`, like a request waiting for a connection of the pool.
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+import httpx
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.utils.utils import ResetOnPickle
+
+# Initialize logger for this module
+logger = get_logger()
+
+SEARCH = "search"
+METADATA = "metadata"
+ADMIN = "admin"
+OPERATION_CLASSES = (SEARCH, METADATA, ADMIN)
+# Responses signalling that the DI server is overloaded
+OVERLOAD_STATUSES = (429, 503)
+
+
+def operation_class(request: httpx.Request) -> str:
+    """Get the operation class of a request: "search", "metadata" or "admin"."""
+    if request.url.path.endswith("/similaritySearch"):
+        return SEARCH
+    if request.method in ("GET", "HEAD"):
+        return METADATA
+    return ADMIN
+
+
+class TokenBucket(ResetOnPickle):
+    """
+    Token bucket allowing `rate` requests per second on average and bursts of `burst` requests.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Take a token, waiting for one to be available. Returns the time waited in seconds.
+
+        Raises:
+            TimeoutError: If no token is available within `timeout` seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"No request token available within {timeout}s")
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no token for `seconds`, e.g. as asked by a `Retry-After` header."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AIMDLimiter(ResetOnPickle):
+    """
+    Adaptive concurrency limit using additive increase / multiplicative decrease.
+
+    The limit grows by `increase` per limit's worth of successful requests and is multiplied
+    by `decrease` when a request fails with an overload status (429/503) or a transport
+    error, or when its latency exceeds `latency_tolerance` times the lowest latency recently
+    observed. The limit is decreased at most once per observed latency, so a burst of slow
+    responses caused by one overload shrinks it only once.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        window: int = 100,
+    ) -> None:
+        """
+        Args:
+            initial_limit (int): Requests allowed in flight to start with.
+            min_limit (int): Lowest limit.
+            max_limit (int): Highest limit.
+            increase (float): Increase of the limit per limit's worth of successful requests.
+            decrease (float): Factor applied to the limit on overload.
+            latency_tolerance (float): Latency growth, relative to the lowest recent latency,
+                treated as overload.
+            window (int): Number of requests after which the lowest latency is measured again.
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("expected 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._next_min_latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a free slot.
+
+        Raises:
+            TimeoutError: If no slot is free within `timeout` seconds.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._in_flight < int(self._limit), timeout
+            ):
+                raise TimeoutError(f"No request slot free within {timeout}s")
+            self._in_flight += 1
+
+    def release(self, latency: float, overloaded: bool) -> None:
+        """Free a slot and adapt the limit to the outcome of the request."""
+        with self._condition:
+            self._in_flight -= 1
+            if not overloaded:
+                overloaded = self._is_slow(latency)
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= latency:
+                    self._last_decrease = now
+                    self._limit = max(self.min_limit, self._limit * self.decrease)
+                    logger.debug("Concurrency limit decreased to %d", self.limit)
+            else:
+                self._limit = min(
+                    self.max_limit, self._limit + self.increase / self._limit
+                )
+            self._condition.notify_all()
+
+    def _is_slow(self, latency: float) -> bool:
+        self._samples += 1
+        if self._next_min_latency is None or latency < self._next_min_latency:
+            self._next_min_latency = latency
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        if self._samples >= self.window:
+            # forget old measurements so the baseline follows the server over time
+            self._min_latency, self._next_min_latency = self._next_min_latency, None
+            self._samples = 0
+        return latency > self._min_latency * self.latency_tolerance
+
+
+class OperationLimiter(ResetOnPickle):
+    """
+    Limits applied to one operation class: an optional request rate and an optional
+    concurrency limit, either fixed or adaptive (AIMD).
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        adaptive: bool = False,
+        **aimd_args,
+    ) -> None:
+        """
+        Args:
+            rate (Optional[float]): Maximum requests per second.
+            burst (Optional[float]): Maximum requests sent at once when below the rate.
+                Defaults to one second worth of requests.
+            max_concurrency (Optional[int]): Maximum number of requests in flight. With
+                `adaptive`, the upper bound of the adaptive limit.
+            adaptive (bool): Adapt the concurrency limit to the latency and errors observed.
+            **aimd_args: Additional `AIMDLimiter` arguments, e.g. `initial_limit`.
+        """
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.concurrency: Optional[AIMDLimiter] = None
+        if adaptive:
+            if max_concurrency is not None:
+                aimd_args["max_limit"] = max_concurrency
+                aimd_args.setdefault("initial_limit", min(max_concurrency, 8))
+            self.concurrency = AIMDLimiter(**aimd_args)
+        elif max_concurrency is not None:
+            # a fixed limit is an AIMD limiter which never changes
+            self.concurrency = AIMDLimiter(
+                initial_limit=max_concurrency,
+                min_limit=max_concurrency,
+                max_limit=max_concurrency,
+            )
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a token and a free slot.
+
+        Raises:
+            TimeoutError: If they are not available within `timeout` seconds.
+        """
+        waited = 0.0
+        if self.bucket is not None:
+            waited = self.bucket.acquire(timeout)
+        if self.concurrency is not None:
+            self.concurrency.acquire(
+                None if timeout is None else max(0.0, timeout - waited)
+            )
+
+    def release(
+        self, latency: float, overloaded: bool, retry_after: Optional[float] = None
+    ) -> None:
+        if retry_after and self.bucket is not None:
+            self.bucket.pause(retry_after)
+        if self.concurrency is not None:
+            self.concurrency.release(latency, overloaded)
+
+
+class RateLimits(ResetOnPickle):
+    """
+    RateLimits - client-side limits per operation class
+    Operation classes without a limiter are not limited.
+
+    Example usage:
+        ```python
+        limits = RateLimits(
+            search=OperationLimiter(rate=50, max_concurrency=16, adaptive=True),
+            admin=OperationLimiter(rate=2),
+        )
+        client = DIAdminClient(uri=..., username=..., password=..., limits=limits)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        search: Optional[OperationLimiter] = None,
+        metadata: Optional[OperationLimiter] = None,
+        admin: Optional[OperationLimiter] = None,
+    ) -> None:
+        self.limiters: Dict[str, Optional[OperationLimiter]] = {
+            SEARCH: search,
+            METADATA: metadata,
+            ADMIN: admin,
+        }
+
+    def limiter_for(self, request: httpx.Request) -> Optional[OperationLimiter]:
+        return self.limiters[operation_class(request)]
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait as asked by the `Retry-After` header of a response, if any."""
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date values are not worth parsing here, back off for a second
+        return 1.0
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body stream calling `release` once, when the response is closed."""
+
+    def __init__(
+        self, stream: httpx.SyncByteStream, release: Callable[[], None]
+    ) -> None:
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._stream)
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+def release_on_close(response: httpx.Response, release: Callable[[], None]) -> None:
+    """
+    Call `release` once the response is closed, right away if it already is (its body was
+    built in memory).
+    """
+    if response.is_closed:
+        release()
+    else:
+        response.stream = _ReleasingStream(response.stream, release)  # type: ignore
+
+
+def pool_timeout(request: httpx.Request) -> Optional[float]:
+    """Get the time a request may wait for a connection of the pool, None to wait forever."""
+    return request.extensions.get("timeout", {}).get("pool")
+
+
+class RateLimitingTransport(httpx.BaseTransport):
+    """httpx transport applying `RateLimits` before sending requests to the wrapped transport."""
+
+    def __init__(self, *, limits: RateLimits, transport: httpx.BaseTransport) -> None:
+        self.limits = limits
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = self.limits.limiter_for(request)
+        if limiter is None:
+            return self._transport.handle_request(request)
+
+        timeout = pool_timeout(request)
+        try:
+            limiter.acquire(timeout)
+        except TimeoutError as e:
+            raise httpx.PoolTimeout(
+                f"No request slot free within {timeout}s", request=request
+            ) from e
+        start = time.perf_counter()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException as e:
+            limiter.release(
+                time.perf_counter() - start, isinstance(e, httpx.TransportError)
+            )
+            raise
+        # the latency is measured until the headers, the slot is held until the body was read
+        latency = time.perf_counter() - start
+        overloaded = response.status_code in OVERLOAD_STATUSES
+        pause = retry_after(response.headers) if overloaded else None
+        release_on_close(
+            response,
+            functools.partial(limiter.release, latency, overloaded, pause),
+        )
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
@@ -0,0 +1,198 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Priority-aware scheduling of requests over a fixed number of request slots.
+
+Every request belongs to a priority class, taken from the `request_priority` context (or the
+`priority` argument of the search methods). When all slots are busy, waiting requests are
+dispatched by self-clocked weighted fair queuing: each request gets a finish tag of
+`max(virtual time, previous finish tag of its class) + 1 / weight`, and the request with the
+smallest tag goes next. A class with weight 16 thus gets 16 slots for every slot given to a
+class with weight 1 while both are waiting, and interactive requests overtake queued batch
+requests without starving them.
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.sessions.limits import pool_timeout, release_on_close
+from pydi_client.utils.utils import ResetOnPickle
+
+# Initialize logger for this module
+logger = get_logger()
+
+INTERACTIVE = "interactive"
+DEFAULT = "default"
+BATCH = "batch"
+DEFAULT_WEIGHTS = {INTERACTIVE: 16.0, DEFAULT: 4.0, BATCH: 1.0}
+
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "pydi_request_priority", default=None
+)
+
+
+@contextlib.contextmanager
+def request_priority(priority: Optional[str]) -> Iterator[None]:
+    """
+    Send the requests made in the block with the given priority class. None keeps the
+    current priority.
+
+    Example usage:
+        ```python
+        with request_priority("batch"):
+            for query in queries:
+                client.similarity_search(...)
+        ```
+    """
+    if priority is None:
+        yield
+        return
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Optional[str]:
+    """Get the priority class set by `request_priority`, if any."""
+    return _priority.get()
+
+
+class RequestScheduler(ResetOnPickle):
+    """
+    RequestScheduler - weighted fair queuing of requests
+    At most `max_in_flight` requests are sent at once; set it at or below the connection pool
+    size (`httpx.Limits.max_connections`) so requests queue in the scheduler, where priorities
+    apply, rather than in the pool. A scheduler can be shared by several sessions.
+
+    Example usage:
+        ```python
+        scheduler = RequestScheduler(max_in_flight=8)
+        client = DIClient(uri="https://di.example.com", scheduler=scheduler)
+        client.similarity_search(..., priority="interactive")
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        default_priority: str = DEFAULT,
+    ) -> None:
+        """
+        Args:
+            max_in_flight (int): Maximum number of requests sent at once.
+            weights (Optional[Dict[str, float]]): Weight of every priority class. Defaults to
+                16 for "interactive", 4 for "default" and 1 for "batch".
+            default_priority (str): Class of the requests sent without a priority.
+        """
+        self.weights = dict(weights if weights is not None else DEFAULT_WEIGHTS)
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if default_priority not in self.weights:
+            raise ValueError(f"Unknown default priority {default_priority!r}")
+        if any(weight <= 0 for weight in self.weights.values()):
+            raise ValueError("weights must be positive")
+        self.max_in_flight = max_in_flight
+        self.default_priority = default_priority
+        self.dispatched: Dict[str, int] = {name: 0 for name in self.weights}
+
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {name: 0.0 for name in self.weights}
+        self._queue: List[Tuple[float, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def acquire(
+        self, priority: Optional[str] = None, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Wait until a request of the given priority class may be sent.
+
+        Raises:
+            TimeoutError: If the request may not be sent within `timeout` seconds.
+        """
+        priority = priority or self.default_priority
+        if priority not in self.weights:
+            raise ValueError(
+                f"Unknown priority {priority!r}, expected one of {sorted(self.weights)}"
+            )
+        with self._condition:
+            finish = (
+                max(self._virtual_time, self._last_finish[priority])
+                + 1.0 / self.weights[priority]
+            )
+            self._last_finish[priority] = finish
+            ticket = (finish, next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._in_flight >= self.max_in_flight or self._queue[0] != ticket:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    # the next queued request may be at the head now
+                    self._condition.notify_all()
+                    raise TimeoutError(f"No request slot free within {timeout}s")
+                self._condition.wait(remaining)
+            heapq.heappop(self._queue)
+            self._in_flight += 1
+            self._virtual_time = finish
+            self.dispatched[priority] += 1
+            # the next queued request may also fit
+            self._condition.notify_all()
+
+    def release(self) -> None:
+        """Free the slot of a completed request."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+
+class SchedulingTransport(httpx.BaseTransport):
+    """httpx transport sending requests to the wrapped transport in `RequestScheduler` order."""
+
+    def __init__(
+        self, *, scheduler: RequestScheduler, transport: httpx.BaseTransport
+    ) -> None:
+        self.scheduler = scheduler
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = pool_timeout(request)
+        try:
+            self.scheduler.acquire(current_priority(), timeout)
+        except TimeoutError as e:
+            raise httpx.PoolTimeout(
+                f"No request slot free within {timeout}s", request=request
+            ) from e
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        # the slot is held until the body was read
+        release_on_close(response, self.scheduler.release)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
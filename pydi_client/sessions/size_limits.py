@@ -0,0 +1,182 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Bounds on the size of the response bodies.
+
+A misbehaving server or gateway may answer with a body far larger than any DI response, e.g. a
+multi-hundred-MB error page. `ResponseSizeLimits` caps the body size per operation class
+(similarity searches, metadata reads and admin operations, see
+`pydi_client.sessions.limits.operation_class`). The sessions route every request through a
+`ResponseSizeLimitingTransport` when created with `size_limits=`, which reads the bodies as a
+stream and stops as soon as the cap is exceeded, so memory stays bounded whatever the server
+returns:
+
+- a successful response larger than its cap raises `ResponseTooLargeException`, without reading
+  the body at all when its `Content-Length` header announces the size;
+- the body of an error response (status 400 or more) is cut after `error` bytes, so the error
+  is raised as usual, with the beginning of the body.
+
+The caps apply to the decoded bodies. A body still encoded when it reaches the transport, e.g.
+gzip-compressed as asked by the default `Accept-Encoding` of httpx, is decoded by the transport
+itself, piece by piece, rather than by httpx once the cap was checked: a small compressed body
+decoding to gigabytes (a decompression bomb) is stopped after the cap.
+"""
+
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+from pydi_client.errors import ResponseTooLargeException
+from pydi_client.logger import get_logger  # Importing the logger utility
+from pydi_client.sessions.compression import (
+    _DecodingStream,
+    can_decode,
+    content_encoding,
+    decoded_headers,
+    decoder,
+)
+from pydi_client.sessions.limits import ADMIN, METADATA, SEARCH, operation_class
+
+# Initialize logger for this module
+logger = get_logger()
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_ERROR_SIZE = 64 * 1024
+
+
+class ResponseSizeLimits:
+    """
+    ResponseSizeLimits - maximum response body sizes, in bytes, per operation class
+    Operation classes without their own cap use `default`.
+
+    Example usage:
+        ```python
+        size_limits = ResponseSizeLimits(search=256 * 1024 * 1024, metadata=1024 * 1024)
+        client = DIClient(uri="https://di.example.com", size_limits=size_limits)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        search: Optional[int] = None,
+        metadata: Optional[int] = None,
+        admin: Optional[int] = None,
+        default: int = DEFAULT_MAX_SIZE,
+        error: int = DEFAULT_MAX_ERROR_SIZE,
+    ) -> None:
+        """
+        Args:
+            search (Optional[int]): Maximum body size of similarity search responses.
+            metadata (Optional[int]): Maximum body size of metadata reads (GET requests).
+            admin (Optional[int]): Maximum body size of admin operations.
+            default (int): Maximum body size of the operation classes without their own cap.
+            error (int): Bytes kept of the body of error responses.
+        """
+        self.limits: Dict[str, int] = {
+            SEARCH: search if search is not None else default,
+            METADATA: metadata if metadata is not None else default,
+            ADMIN: admin if admin is not None else default,
+        }
+        self.error = error
+        if min(*self.limits.values(), error) < 0:
+            raise ValueError("size limits cannot be negative")
+
+    def limit_for(self, request: httpx.Request) -> int:
+        return self.limits[operation_class(request)]
+
+
+class _LimitedStream(httpx.SyncByteStream):
+    """Body stream raising, or ending when `truncate` is set, after `limit` bytes."""
+
+    def __init__(
+        self,
+        stream: httpx.SyncByteStream,
+        *,
+        limit: int,
+        truncate: bool,
+        url: str,
+    ) -> None:
+        self._stream = stream
+        self._limit = limit
+        self._truncate = truncate
+        self._url = url
+
+    def __iter__(self) -> Iterator[bytes]:
+        received = 0
+        for chunk in self._stream:
+            received += len(chunk)
+            if received > self._limit:
+                if not self._truncate:
+                    raise ResponseTooLargeException(received, self._limit, self._url)
+                logger.warning(
+                    "Error response of %s truncated to %d bytes", self._url, self._limit
+                )
+                yield chunk[: len(chunk) - (received - self._limit)]
+                # the rest of the body is never read, closing the stream drops the connection
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class ResponseSizeLimitingTransport(httpx.BaseTransport):
+    """httpx transport bounding the size of the response bodies with `ResponseSizeLimits`."""
+
+    def __init__(
+        self, *, limits: ResponseSizeLimits, transport: httpx.BaseTransport
+    ) -> None:
+        self.limits = limits
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        error = response.is_error
+        limit = self.limits.error if error else self.limits.limit_for(request)
+        url = str(request.url)
+
+        try:
+            # bodies already in memory, e.g. built by another transport
+            content = response.content
+        except httpx.ResponseNotRead:
+            pass
+        else:
+            if len(content) <= limit:
+                return response
+            if not error:
+                raise ResponseTooLargeException(len(content), limit, url)
+            return httpx.Response(
+                response.status_code,
+                headers=response.headers,
+                content=content[:limit],
+                request=request,
+                extensions=response.extensions,
+            )
+
+        encoding = content_encoding(response)
+        if encoding and can_decode(encoding):
+            response = httpx.Response(
+                response.status_code,
+                headers=decoded_headers(response),
+                stream=_DecodingStream(
+                    response.stream, decoder(encoding)  # type: ignore
+                ),
+                request=request,
+                extensions=response.extensions,
+            )
+
+        declared = response.headers.get("content-length")
+        if not error and declared and declared.isdigit() and int(declared) > limit:
+            response.close()
+            raise ResponseTooLargeException(int(declared), limit, url)
+        response.stream = _LimitedStream(
+            response.stream,  # type: ignore
+            limit=limit,
+            truncate=error,
+            url=url,
+        )
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
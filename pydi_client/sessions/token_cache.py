@@ -0,0 +1,184 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Persistent cache of login tokens, shared by the processes of a user.
+
+Short-lived processes (cron jobs, CLI tools) creating a `DIAdminClient` log in every time they
+start. With a `TokenCache`, the token obtained by a login is stored on disk, keyed by the URI
+and username, and reused by the next processes until it expires. Tokens are only reused while
+the `exp` claim of the JWT is at least `min_ttl` seconds away; tokens without an `exp` claim
+are not cached.
+
+The cache file is readable by its owner only (mode 0600, in a 0700 directory) and is not used
+when its permissions are wider. Concurrent processes serialize their access with an advisory
+lock (`fcntl.flock`) on a lock file next to the cache; writes replace the file atomically.
+"""
+
+import base64
+import binascii
+import contextlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+
+# Initialize logger for this module
+logger = get_logger()
+
+
+def default_path() -> str:
+    """Default location of the token cache, under the user's cache directory."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "pydi_client", "tokens.json")
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """
+    Get the expiry time (seconds since the epoch) of a JWT from its `exp` claim, without
+    verifying its signature. Returns None when the token is not a JWT or has no `exp` claim.
+    """
+    if token.startswith("Bearer "):
+        token = token[len("Bearer ") :]
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        exp = json.loads(payload).get("exp")
+    except (ValueError, binascii.Error, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class TokenCache:
+    """
+    TokenCache - on-disk cache of login tokens keyed by (uri, username)
+
+    Example usage:
+        ```python
+        admin = DIAdminClient(
+            uri="https://di.example.com",
+            username="admin",
+            password="secret",
+            token_cache=TokenCache(),
+        )
+        ```
+    """
+
+    def __init__(self, path: Optional[str] = None, *, min_ttl: float = 60.0) -> None:
+        """
+        Args:
+            path (Optional[str]): Cache file. Defaults to `~/.cache/pydi_client/tokens.json`.
+            min_ttl (float): Cached tokens expiring within `min_ttl` seconds are not reused.
+        """
+        self.path = path or default_path()
+        self.min_ttl = min_ttl
+
+    def get(self, uri: Union[str, List[str]], username: str) -> Optional[str]:
+        """Get a cached token for the user, if one is valid for at least `min_ttl` seconds."""
+        try:
+            with self._locked(exclusive=False):
+                entry = self._read().get(self._key(uri, username))
+        except OSError as e:
+            logger.warning("Could not read token cache %s: %s", self.path, e)
+            return None
+        if entry is None or entry["exp"] - time.time() < self.min_ttl:
+            return None
+        return entry.get("token")
+
+    def set(self, uri: Union[str, List[str]], username: str, token: str) -> None:
+        """Cache the token of the user, replacing the previous one."""
+        exp = token_expiry(token)
+        if exp is None:
+            logger.debug("Token has no exp claim, not caching it")
+            return
+        self._update(self._key(uri, username), {"token": token, "exp": exp})
+
+    def remove(self, uri: Union[str, List[str]], username: str) -> None:
+        """Remove the cached token of the user, if any."""
+        self._update(self._key(uri, username), None)
+
+    @staticmethod
+    def _key(uri: Union[str, List[str]], username: str) -> str:
+        return json.dumps([uri, username])
+
+    def _update(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+            with self._locked(exclusive=True):
+                now = time.time()
+                entries = {
+                    name: value
+                    for name, value in self._read().items()
+                    if value["exp"] > now
+                }
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+                self._write(entries)
+        except OSError as e:
+            # a cache failure must not fail the login
+            logger.warning("Could not update token cache %s: %s", self.path, e)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if os.name == "posix" and (
+                    stat.st_mode & 0o077 or stat.st_uid != os.getuid()
+                ):
+                    logger.warning(
+                        "Ignoring token cache %s, it is accessible by other users",
+                        self.path,
+                    )
+                    return {}
+                entries = json.loads(file.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable token cache %s: %s", self.path, e)
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        return {
+            key: entry
+            for key, entry in entries.items()
+            if isinstance(entry, dict) and isinstance(entry.get("exp"), (int, float))
+        }
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        # mkstemp creates the file with mode 0600
+        fd, temporary = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or ".", prefix=".tokens-"
+        )
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(entries, file)
+            os.replace(temporary, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temporary)
+            raise
+
+    @contextlib.contextmanager
+    def _locked(self, *, exclusive: bool) -> Iterator[None]:
+        if fcntl is None or not os.path.isdir(os.path.dirname(self.path) or "."):
+            yield
+            return
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
@@ -0,0 +1,4 @@
+from .server import FakeDIServer
+from .recording import RecordingTransport, ReplayTransport
+
+__all__ = ["FakeDIServer", "RecordingTransport", "ReplayTransport"]
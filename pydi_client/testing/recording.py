@@ -0,0 +1,284 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import IO, Any, Deque, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from pydi_client.errors import ReplayMissException
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+# Initialize logger for this module
+logger = get_logger()
+
+REDACTED = "***"
+# Request body fields which are never written to a recording
+SECRET_FIELDS = ("credentials", "password", "accessKey", "secretKey")
+# Response headers which no longer apply once the body is stored decoded
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore
+    return open(path, mode, encoding="utf-8")
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SECRET_FIELDS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _request_body(request: httpx.Request) -> Any:
+    """Decode a request body for matching and recording, with secrets redacted."""
+    content = request.read()
+    if not content:
+        return None
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        # login form, only contains credentials
+        return REDACTED
+    try:
+        return _redact(json.loads(content))
+    except ValueError:
+        return {"sha256": hashlib.sha256(content).hexdigest()}
+
+
+def request_key(method: str, url: str, body: Any) -> str:
+    """Key used to match a replayed request with the recorded ones."""
+    normalized = json.dumps([method.upper(), url, body], sort_keys=True)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def _url(request: httpx.Request) -> str:
+    return request.url.raw_path.decode("ascii")
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    RecordingTransport - an httpx transport that records traffic to a file
+    Every request is forwarded to the wrapped transport and the request/response pair is
+    appended to a JSON lines file (gzip compressed when the path ends with `.gz`), together
+    with its start offset and duration. Credentials in request bodies, login forms and the
+    issued token are redacted.
+
+    Example usage:
+        ```python
+        transport = RecordingTransport("search-traffic.jsonl.gz")
+        client = DIClient(uri="https://di.example.com", httpx_args={"transport": transport})
+        ...
+        client.session.get_httpx_client().close()  # flushes and closes the recording
+        ```
+    """
+
+    def __init__(
+        self, path: str, transport: Optional[httpx.BaseTransport] = None
+    ) -> None:
+        """
+        Args:
+            path (str): File the recording is appended to.
+            transport (Optional[httpx.BaseTransport]): Transport sending the requests. Defaults to
+                an `httpx.HTTPTransport` without certificate verification, like the sessions.
+        """
+        self.path = path
+        self._transport = transport or httpx.HTTPTransport(verify=False)
+        self._file = _open(path, "a")
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            raw = b"".join(response.stream)  # type: ignore
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - started
+
+        decoded = httpx.Response(
+            response.status_code, headers=response.headers, content=raw
+        ).content
+        self._write(request, response, decoded, started - self._start, elapsed)
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=raw,
+            request=request,
+        )
+
+    def _write(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        content: bytes,
+        offset: float,
+        elapsed: float,
+    ) -> None:
+        body = _request_body(request)
+        entry: Dict[str, Any] = {
+            "t": round(offset, 6),
+            "elapsed": round(elapsed, 6),
+            "method": request.method,
+            "url": _url(request),
+            "request": body,
+            "key": request_key(request.method, _url(request), body),
+            "status": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in DROPPED_HEADERS
+            },
+        }
+        try:
+            text = content.decode("utf-8")
+            if _url(request).endswith("/login") and text:
+                text = json.dumps(
+                    {**json.loads(text), "Authorization": "Bearer recorded-token"}
+                )
+            entry["body"] = text
+        except ValueError:
+            entry["body_b64"] = base64.b64encode(content).decode("ascii")
+
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self._transport.close()
+
+
+class _Recorded:
+    __slots__ = ("offset", "elapsed", "status", "headers", "content")
+
+    def __init__(self, entry: Dict[str, Any]) -> None:
+        self.offset: float = entry["t"]
+        self.elapsed: float = entry["elapsed"]
+        self.status: int = entry["status"]
+        self.headers: Dict[str, str] = entry["headers"]
+        if "body_b64" in entry:
+            self.content = base64.b64decode(entry["body_b64"])
+        else:
+            self.content = entry.get("body", "").encode("utf-8")
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    ReplayTransport - an httpx transport serving responses from a recording
+    Requests are matched by method, URL and (redacted) body with the requests of a recording
+    made by `RecordingTransport`. Matching responses are served in recorded order, after
+    sleeping for the recorded server time multiplied by `time_scale`.
+
+    With `pace=True`, the recorded start offsets are honored too: a request is not answered
+    before its recorded offset (times `time_scale`) from the first replayed request, so the
+    gaps between requests, e.g. around hedging delays or batching windows, are reproduced.
+    Requests sent later than recorded are not delayed further.
+
+    Example usage:
+        ```python
+        transport = ReplayTransport("search-traffic.jsonl.gz", time_scale=0.5)
+        client = DIClient(uri="https://di.example.com", httpx_args={"transport": transport})
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        time_scale: float = 1.0,
+        cycle: bool = True,
+        pace: bool = False,
+    ) -> None:
+        """
+        Args:
+            path (str): Recording to replay.
+            time_scale (float): Factor applied to the recorded response times. 1.0 replays the
+                original timing, 0 replays without any delay.
+            cycle (bool): Start over with the first recorded response of a request once all of
+                them were served. When False, `ReplayMissException` is raised instead.
+            pace (bool): Also wait for the recorded start offset of every request, relative
+                to the first replayed request. Responses served again by `cycle` are not
+                paced.
+        """
+        self.path = path
+        self.time_scale = time_scale
+        self.cycle = cycle
+        self.pace = pace
+        # offset of the first recorded request, and time of the first replayed request
+        self._origin = 0.0
+        self._started: Optional[float] = None
+        self._recorded: Dict[str, List[_Recorded]] = defaultdict(list)
+        self._pending: Dict[str, Deque[_Recorded]] = {}
+        # requests whose recorded responses are served again
+        self._cycled: Set[str] = set()
+        self._lock = threading.Lock()
+
+        with _open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._recorded[entry["key"]].append(_Recorded(entry))
+        self._origin = min(
+            (item.offset for items in self._recorded.values() for item in items),
+            default=0.0,
+        )
+        logger.info(
+            "Loaded %d recorded responses from %s",
+            sum(len(items) for items in self._recorded.values()),
+            path,
+        )
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._recorded.values())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        url = _url(request)
+        key = request_key(request.method, url, _request_body(request))
+        recorded, cycled = self._next(key, request.method, url)
+
+        delay = recorded.elapsed * self.time_scale
+        if self.pace and not cycled and self._started is not None:
+            due = self._started + (recorded.offset - self._origin) * self.time_scale
+            delay += max(0.0, due - time.perf_counter())
+        if delay > 0:
+            time.sleep(delay)
+        return httpx.Response(
+            recorded.status,
+            headers=recorded.headers,
+            content=recorded.content,
+            request=request,
+        )
+
+    def _next(self, key: str, method: str, url: str) -> Tuple[_Recorded, bool]:
+        """Next recorded response of a request, and whether the recording is cycled."""
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+            if key not in self._recorded:
+                raise ReplayMissException(f"No recorded response for {method} {url}")
+            pending = self._pending.get(key)
+            if not pending:
+                if pending is not None:
+                    if not self.cycle:
+                        raise ReplayMissException(
+                            f"All recorded responses for {method} {url} were replayed"
+                        )
+                    self._cycled.add(key)
+                pending = self._pending[key] = deque(self._recorded[key])
+            return pending.popleft(), key in self._cycled
@@ -0,0 +1,640 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import asyncio
+import base64
+import contextlib
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote
+
+import httpx
+
+from pydi_client.logger import get_logger  # Importing the logger utility
+
+# Initialize logger for this module
+logger = get_logger()
+
+API_PREFIX = "/api/v1"
+
+Latency = Union[float, Callable[[str, str], float]]
+
+
+class FakeDIServer:
+    """
+    FakeDIServer - an in-process stand-in for the DI server
+    It implements the endpoints used by this client (login, collections, pipelines, models,
+    schemas and similarity search) on top of an in-memory state, with configurable latency,
+    error injection, token expiry and search result sizes.
+
+    The server can be used as:
+
+    - an `httpx.MockTransport` through `transport()` (or `client()`/`admin_client()`),
+    - an ASGI application through `asgi_app`, e.g. with `httpx.ASGITransport` or any ASGI server,
+    - a local HTTP server listening on a real socket through `serve()`.
+
+    Example usage:
+        ```python
+        server = FakeDIServer(latency=0.002, token_ttl=60)
+        server.add_pipeline(name="rag-pipeline")
+        server.add_collection(name="docs", pipeline="rag-pipeline")
+
+        client = server.client()
+        results = client.similarity_search(
+            collection_name="docs", query="hello", top_k=5,
+            access_key="ak", secret_key="sk",
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        uri: str = "http://fake-di.local",
+        username: str = "admin",
+        password: str = "admin",
+        latency: Latency = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        token_ttl: Optional[float] = None,
+        max_search_results: Optional[int] = None,
+        chunk_size: int = 256,
+        seed: Optional[int] = None,
+        batch_search: bool = False,
+        max_request_buckets: Optional[int] = None,
+        compression: bool = False,
+    ) -> None:
+        """
+        Args:
+            uri (str): Base URI used by the clients created with `client()`/`admin_client()`.
+            username (str): Username accepted by `/api/v1/login`.
+            password (str): Password accepted by `/api/v1/login`.
+            latency (Union[float, Callable[[str, str], float]]): Delay in seconds added to every
+                request, or a callable receiving the HTTP method and path and returning the delay.
+            error_rate (float): Probability (0..1) of answering any request with `error_status`.
+            error_status (int): Status code used for randomly injected errors.
+            token_ttl (Optional[float]): Lifetime of issued tokens in seconds. Tokens never expire when None.
+            max_search_results (Optional[int]): Upper bound on the number of search results,
+                regardless of `topK`. Unbounded when None.
+            chunk_size (int): Number of characters in every returned `dataChunk`.
+            seed (Optional[int]): Seed for the random generator used for error injection.
+            batch_search (bool): Serve the multi-query `/api/v1/similaritySearch/batch` endpoint
+                used by `SearchBatcher`. It answers 404 when False, like the DI server.
+            max_request_buckets (Optional[int]): Largest number of buckets accepted by a bucket
+                (un)assignment request, answering 413 above. Unbounded when None.
+            compression (bool): gzip-compress the responses of requests accepting gzip.
+                gzip-compressed request bodies are always accepted.
+        """
+        self.uri = uri
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_ttl = token_ttl
+        self.max_search_results = max_search_results
+        self.chunk_size = chunk_size
+        self.batch_search = batch_search
+        self.max_request_buckets = max_request_buckets
+        self.compression = compression
+
+        self.collections: Dict[str, Dict[str, Any]] = {}
+        self.pipelines: Dict[str, Dict[str, Any]] = {}
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.schemas: Dict[str, Dict[str, Any]] = {}
+        self.request_count: Counter = Counter()
+
+        self._tokens: Dict[str, Optional[float]] = {}
+        self._failures: List[Tuple[int, Optional[str]]] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.add_model(name="embedding-model")
+        self.add_schema(name="default-schema")
+
+    # ------------------------------------------------------------------
+    # State management
+    # ------------------------------------------------------------------
+
+    def add_collection(
+        self, *, name: str, pipeline: str, buckets: Optional[List[str]] = None
+    ) -> None:
+        """Add a collection to the server state."""
+        with self._lock:
+            self.collections[name] = {
+                "name": name,
+                "pipeline": pipeline,
+                "buckets": list(buckets or []),
+            }
+
+    def add_pipeline(
+        self,
+        *,
+        name: str,
+        pipeline_type: str = "rag",
+        model: Optional[str] = "embedding-model",
+        schema: str = "default-schema",
+        custom_func: Optional[str] = None,
+        event_filter: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add a pipeline to the server state."""
+        with self._lock:
+            self.pipelines[name] = {
+                "name": name,
+                "type": pipeline_type,
+                "model": model or "",
+                "customFunction": custom_func or "",
+                "eventFilter": event_filter or {"objectSuffix": ["*"]},
+                "schema": schema,
+            }
+
+    def add_model(self, *, name: str, capabilities: Optional[List[str]] = None) -> None:
+        """Add a model to the server state."""
+        with self._lock:
+            self.models[name] = {
+                "name": name,
+                "modelName": name,
+                "capabilities": capabilities or ["Sentence-Similarity"],
+                "version": "1.0",
+                "communicationType": "Ollama API",
+                "dimension": 768,
+                "contextLength": None,
+                "temperature": None,
+                "topK": None,
+                "topP": None,
+                "maximumTokens": 512,
+                "timeout": 300,
+                "language": None,
+                "sampleRate": None,
+                "automaticPunctuation": None,
+            }
+
+    def add_schema(self, *, name: str, schema_type: str = "metadata") -> None:
+        """Add a schema to the server state."""
+        with self._lock:
+            self.schemas[name] = {
+                "name": name,
+                "type": schema_type,
+                "schema": [{"name": "title", "type": "string"}],
+            }
+
+    def fail_next(
+        self, status: int = 503, *, times: int = 1, path: Optional[str] = None
+    ) -> None:
+        """
+        Answer the next `times` requests (optionally only those whose path starts with `path`)
+        with the given status code.
+        """
+        with self._lock:
+            self._failures.extend([(status, path)] * times)
+
+    def expire_tokens(self) -> None:
+        """Expire every token issued so far, forcing clients to log in again."""
+        with self._lock:
+            for token in self._tokens:
+                self._tokens[token] = 0.0
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def transport(self) -> httpx.MockTransport:
+        """Get an `httpx.MockTransport` serving requests from this server."""
+        return httpx.MockTransport(self.handle_request)
+
+    def client(self, **session_args: Any):
+        """Get a `DIClient` connected to this server through a mock transport."""
+        from pydi_client.di_client import DIClient
+
+        return DIClient(uri=self.uri, **self._with_transport(session_args))
+
+    def admin_client(self, **session_args: Any):
+        """Get a logged in `DIAdminClient` connected to this server through a mock transport."""
+        from pydi_client.di_client import DIAdminClient
+
+        return DIAdminClient(
+            uri=self.uri,
+            username=self.username,
+            password=self.password,
+            **self._with_transport(session_args),
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Handle an `httpx.Request`, sleeping for the configured latency first."""
+        path = request.url.path
+        delay = self._latency_for(request.method, path)
+        if delay > 0:
+            time.sleep(delay)
+        status, payload = self.dispatch(
+            request.method, path, request.headers, request.read()
+        )
+        content, headers = self._encode(payload, request.headers)
+        return httpx.Response(status, headers=headers, content=content)
+
+    async def asgi_app(self, scope, receive, send) -> None:
+        """ASGI application serving requests from this server."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        delay = self._latency_for(scope["method"], scope["path"])
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        status, payload = self.dispatch(scope["method"], scope["path"], headers, body)
+        content, response_headers = self._encode(payload, headers)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode(), value.encode())
+                    for name, value in response_headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    @contextlib.contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """
+        Serve this server over HTTP on a local socket for the duration of the context.
+
+        Yields:
+            str: The base URI of the running server, e.g. `http://127.0.0.1:53211`.
+        """
+        fake = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, keep-alive requests would otherwise
+            # wait for delayed ACKs
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                path = self.path.split("?", 1)[0]
+                delay = fake._latency_for(self.command, path)
+                if delay > 0:
+                    time.sleep(delay)
+                headers = dict(self.headers.items())
+                status, payload = fake.dispatch(self.command, path, headers, body)
+                content, response_headers = fake._encode(payload, headers)
+                self.send_response(status)
+                for name, value in response_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_DELETE = do_PUT = _handle
+
+            def log_message(self, format, *args):
+                logger.debug("FakeDIServer: " + format, *args)
+
+        httpd = ThreadingHTTPServer((host, port), _Handler)
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{httpd.server_address[1]}"
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+    # ------------------------------------------------------------------
+    # Request dispatching
+    # ------------------------------------------------------------------
+
+    def dispatch(
+        self, method: str, path: str, headers: Any, body: bytes
+    ) -> Tuple[int, Any]:
+        """
+        Dispatch a request to the matching endpoint.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path, e.g. `/api/v1/collections`.
+            headers (Mapping[str, str]): Request headers.
+            body (bytes): Raw request body.
+
+        Returns:
+            Tuple[int, Any]: The status code and the JSON payload of the response.
+        """
+        method = method.upper()
+        path = unquote(path)
+        if _header(headers, "content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        with self._lock:
+            self.request_count[(method, self._route_name(path))] += 1
+
+        injected = self._injected_failure(path)
+        if injected is not None:
+            return injected, {"error": f"Injected failure with status {injected}"}
+
+        if not path.startswith(API_PREFIX):
+            return 404, {"error": f"Not found: {path}"}
+        parts = [part for part in path[len(API_PREFIX) :].split("/") if part]
+
+        if parts == ["login"] and method == "POST":
+            return self._login(body)
+        if parts == ["similaritySearch"] and method == "POST":
+            return self._similarity_search(body)
+        if parts == ["similaritySearch", "batch"] and method == "POST":
+            if self.batch_search:
+                return self._similarity_search_batch(body)
+
+        if parts and parts[0] in ("collections", "pipelines", "schemas"):
+            if method != "GET" or parts[0] == "schemas":
+                if not self._is_authorized(headers):
+                    return 401, {"error": "Unauthorized"}
+
+        try:
+            if parts[:1] == ["collections"]:
+                return self._collections(method, parts[1:], body)
+            if parts[:1] == ["pipelines"]:
+                return self._pipelines(method, parts[1:], body)
+            if parts[:1] == ["models"] and method == "GET":
+                return self._get_resource(self.models, parts[1:], "models")
+            if parts[:1] == ["schemas"] and method == "GET":
+                return self._get_resource(self.schemas, parts[1:], "schemas")
+        except (ValueError, KeyError) as e:
+            return 400, {"error": f"Bad request: {e}"}
+
+        return 404, {"error": f"Not found: {method} {path}"}
+
+    def _login(self, body: bytes) -> Tuple[int, Any]:
+        form = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+        if (
+            form.get("username") != self.username
+            or form.get("password") != self.password
+        ):
+            return 401, {"error": "Invalid credentials"}
+
+        token = self._issue_token()
+        with self._lock:
+            self._tokens[token] = (
+                time.monotonic() + self.token_ttl
+                if self.token_ttl is not None
+                else None
+            )
+        return 200, {"Status": "Login successful", "Authorization": f"Bearer {token}"}
+
+    def _issue_token(self) -> str:
+        # shaped like the JWTs of the DI server, with an `exp` claim when tokens expire
+        claims: Dict[str, Any] = {"sub": self.username, "jti": uuid.uuid4().hex}
+        if self.token_ttl is not None:
+            claims["exp"] = int(time.time() + self.token_ttl)
+        return ".".join(
+            base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b"=").decode()
+            for part in ({"alg": "none", "typ": "JWT"}, claims, "fake")
+        )
+
+    def _is_authorized(self, headers: Any) -> bool:
+        value = headers.get("authorization") or headers.get("Authorization") or ""
+        token = value[len("Bearer ") :] if value.startswith("Bearer ") else ""
+        with self._lock:
+            if token not in self._tokens:
+                return False
+            expires_at = self._tokens[token]
+        return expires_at is None or time.monotonic() < expires_at
+
+    def _collections(
+        self, method: str, parts: List[str], body: bytes
+    ) -> Tuple[int, Any]:
+        if method == "GET":
+            return self._get_resource(self.collections, parts, None)
+
+        if method == "POST" and not parts:
+            data = json.loads(body)
+            if data["name"] in self.collections:
+                return 409, {"error": f"Collection {data['name']} already exists"}
+            if data["pipeline"] not in self.pipelines:
+                return 400, {"error": f"Pipeline {data['pipeline']} does not exist"}
+            self.add_collection(
+                name=data["name"],
+                pipeline=data["pipeline"],
+                buckets=data.get("buckets"),
+            )
+            return 201, self.collections[data["name"]]
+
+        if not parts or parts[0] not in self.collections:
+            return 404, {"error": "Collection not found"}
+        name = parts[0]
+
+        if method == "DELETE" and len(parts) == 1:
+            with self._lock:
+                del self.collections[name]
+            return 200, {
+                "success": True,
+                "message": f"Collection '{name}' has been deleted.",
+            }
+
+        if method == "POST" and len(parts) == 2:
+            buckets = json.loads(body)["buckets"]
+            if (
+                self.max_request_buckets is not None
+                and len(buckets) > self.max_request_buckets
+            ):
+                return 413, {"error": "Request entity too large"}
+            with self._lock:
+                current = self.collections[name]["buckets"]
+                if parts[1] == "assignBuckets":
+                    current.extend(b for b in buckets if b not in current)
+                elif parts[1] == "unassignBuckets":
+                    current[:] = [b for b in current if b not in buckets]
+                else:
+                    return 404, {"error": "Not found"}
+            return 200, {
+                "success": True,
+                "message": f"Buckets updated for collection '{name}'.",
+            }
+
+        return 405, {"error": "Method not allowed"}
+
+    def _pipelines(self, method: str, parts: List[str], body: bytes) -> Tuple[int, Any]:
+        if method == "GET":
+            return self._get_resource(self.pipelines, parts, None)
+
+        if method == "POST" and not parts:
+            data = json.loads(body)
+            if data["name"] in self.pipelines:
+                return 409, {"error": f"Pipeline {data['name']} already exists"}
+            self.add_pipeline(
+                name=data["name"],
+                pipeline_type=data["type"],
+                model=data.get("model"),
+                schema=data.get("schema") or "",
+                custom_func=data.get("customFunction"),
+                event_filter=data.get("eventFilter"),
+            )
+            return 201, {
+                "success": True,
+                "message": f"Pipeline '{data['name']}' created successfully.",
+            }
+
+        if method == "DELETE" and len(parts) == 1:
+            name = parts[0]
+            if name not in self.pipelines:
+                return 404, {"error": "Pipeline not found"}
+            if any(c["pipeline"] == name for c in self.collections.values()):
+                return 409, {"error": f"Pipeline '{name}' is in use"}
+            with self._lock:
+                del self.pipelines[name]
+            return 200, {"success": True, "message": "Pipeline successfully deleted"}
+
+        return 405, {"error": "Method not allowed"}
+
+    def _get_resource(
+        self,
+        store: Dict[str, Dict[str, Any]],
+        parts: List[str],
+        list_key: Optional[str],
+    ) -> Tuple[int, Any]:
+        if parts:
+            if parts[0] not in store:
+                return 404, {"error": f"{parts[0]} not found"}
+            return 200, store[parts[0]]
+
+        summary = [
+            {"id": str(index), "name": name}
+            for index, name in enumerate(list(store), start=1)
+        ]
+        return 200, summary if list_key is None else {list_key: summary}
+
+    def _similarity_search(self, body: bytes) -> Tuple[int, Any]:
+        data = json.loads(body)
+        name = data.get("collectionName")
+        if name not in self.collections:
+            return 404, {"error": f"Collection {name} not found"}
+
+        top_k = int(data.get("topK") or 0)
+        if self.max_search_results is not None:
+            top_k = min(top_k, self.max_search_results)
+        return 200, {
+            "success": True,
+            "message": "Similarity search completed successfully.",
+            "results": self.search_results(
+                collection_name=name, query=data.get("query", ""), top_k=top_k
+            ),
+        }
+
+    def _similarity_search_batch(self, body: bytes) -> Tuple[int, Any]:
+        data = json.loads(body)
+        responses = []
+        for query in data.get("queries", []):
+            status, payload = self._similarity_search(
+                json.dumps({**data, **query}).encode()
+            )
+            if status != 200:
+                return status, payload
+            responses.append(payload)
+        return 200, {"responses": responses}
+
+    def search_results(
+        self, *, collection_name: str, query: str, top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the deterministic, score-ordered search results returned for a query.
+        """
+        digest = hashlib.sha256(f"{collection_name}:{query}".encode()).hexdigest()
+        buckets = self.collections.get(collection_name, {}).get("buckets") or ["bucket"]
+        text = (digest * (self.chunk_size // len(digest) + 1))[: self.chunk_size]
+
+        results = []
+        for rank in range(top_k):
+            start = rank * self.chunk_size
+            results.append(
+                {
+                    "score": round(1.0 - rank / (top_k + 1), 6),
+                    "dataChunk": text,
+                    "chunkMetadata": {
+                        "objectKey": f"{collection_name}/object-{rank // 4}.txt",
+                        "startCharIndex": start,
+                        "endCharIndex": start + self.chunk_size,
+                        "bucketName": buckets[rank % len(buckets)],
+                        "pageLabel": str(rank // 4 + 1),
+                        "versionId": "1",
+                    },
+                }
+            )
+        return results
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _encode(self, payload: Any, headers: Any) -> Tuple[bytes, Dict[str, str]]:
+        """Serialize a response payload, gzip-compressed when enabled and accepted."""
+        content = json.dumps(payload).encode()
+        response_headers = {"Content-Type": "application/json"}
+        accepted = _header(headers, "accept-encoding") or ""
+        if self.compression and "gzip" in accepted:
+            content = gzip.compress(content, mtime=0)
+            response_headers["Content-Encoding"] = "gzip"
+        response_headers["Content-Length"] = str(len(content))
+        return content, response_headers
+
+    def _with_transport(self, session_args: Dict[str, Any]) -> Dict[str, Any]:
+        httpx_args = dict(session_args.get("httpx_args") or {})
+        httpx_args.setdefault("transport", self.transport())
+        return {**session_args, "httpx_args": httpx_args}
+
+    def _latency_for(self, method: str, path: str) -> float:
+        if callable(self.latency):
+            return float(self.latency(method.upper(), path))
+        return float(self.latency)
+
+    def _injected_failure(self, path: str) -> Optional[int]:
+        with self._lock:
+            for index, (status, prefix) in enumerate(self._failures):
+                if prefix is None or path.startswith(prefix):
+                    del self._failures[index]
+                    return status
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    @staticmethod
+    def _route_name(path: str) -> str:
+        parts = [part for part in path[len(API_PREFIX) :].split("/") if part]
+        if len(parts) >= 2 and parts[0] in (
+            "collections",
+            "pipelines",
+            "models",
+            "schemas",
+        ):
+            parts[1] = "{name}"
+        return "/" + "/".join(parts)
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    # httpx.Headers are case-insensitive, the dictionaries of the other entry points are not
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
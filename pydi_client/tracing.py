@@ -0,0 +1,164 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Optional OpenTelemetry instrumentation for the DI client.
+
+When the ``opentelemetry-api`` package is installed, every ``*API`` method is
+wrapped in a span and the HTTP request, session refresh, JSON decode and
+pydantic validation steps are recorded as child spans. The active trace
+context is propagated to the DI server using the configured propagator
+(W3C ``traceparent``/``tracestate`` by default).
+
+The login span does not carry the username unless ``record_username`` is set to True,
+as it identifies the end user.
+
+When OpenTelemetry is not installed every helper in this module is a no-op and
+``traced`` returns the decorated function unchanged.
+"""
+
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+try:
+    from opentelemetry import propagate as otel_propagate
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - depends on the environment
+    otel_propagate = None  # type: ignore
+    otel_trace = None  # type: ignore
+
+TRACER_NAME = "pydi_client"
+
+# Record the username (``enduser.id``) on the login span; off by default as it is personal data
+record_username = False
+
+# Span attribute names
+ATTR_COLLECTION_NAME = "db.collection.name"
+ATTR_TOP_K = "pydi.search.top_k"
+ATTR_RESULT_COUNT = "pydi.search.result_count"
+ATTR_MIN_SCORE = "pydi.search.min_score"
+ATTR_PIPELINE_NAME = "pydi.pipeline.name"
+ATTR_MODEL_NAME = "pydi.model.name"
+ATTR_SCHEMA_NAME = "pydi.schema.name"
+ATTR_USERNAME = "enduser.id"
+ATTR_HTTP_METHOD = "http.request.method"
+ATTR_HTTP_STATUS_CODE = "http.response.status_code"
+ATTR_URL_PATH = "url.path"
+ATTR_ATTEMPT = "pydi.request.attempt"
+ATTR_RESPONSE_MODEL = "pydi.response.model"
+ATTR_REQUEST_BODY_SIZE = "http.request.body.size"
+ATTR_REQUEST_UNCOMPRESSED_SIZE = "pydi.request.body.uncompressed_size"
+ATTR_RESPONSE_BODY_SIZE = "http.response.body.size"
+ATTR_RESPONSE_DECODED_SIZE = "pydi.response.body.decoded_size"
+ATTR_RESPONSE_CONTENT_ENCODING = "pydi.response.content_encoding"
+
+
+def is_enabled() -> bool:
+    """
+    Check whether OpenTelemetry is available.
+
+    Returns:
+        bool: True if the OpenTelemetry API could be imported, False otherwise.
+    """
+    return otel_trace is not None
+
+
+def _clean(attributes: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    # OpenTelemetry rejects None values, drop them instead of failing
+    if not attributes:
+        return {}
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+@contextmanager
+def start_span(
+    name: str, attributes: Optional[Mapping[str, Any]] = None
+) -> Iterator[Any]:
+    """
+    Start a span as a child of the current span.
+
+    Args:
+        name (str): Name of the span.
+        attributes (Optional[Mapping[str, Any]]): Attributes to set on the span. None values are skipped.
+
+    Yields:
+        The active span, or None when OpenTelemetry is not installed.
+    """
+    if otel_trace is None:
+        yield None
+        return
+
+    tracer = otel_trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as span:
+        yield span
+
+
+def set_attributes(span: Any, attributes: Mapping[str, Any]) -> None:
+    """
+    Set attributes on the given span, ignoring None values and non-recording spans.
+    """
+    if span is None or not span.is_recording():
+        return
+    span.set_attributes(_clean(attributes))
+
+
+def set_current_attributes(attributes: Mapping[str, Any]) -> None:
+    """
+    Set attributes on the currently active span.
+    """
+    if otel_trace is None:
+        return
+    set_attributes(otel_trace.get_current_span(), attributes)
+
+
+def inject_trace_context(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Inject the current trace context into a dictionary of HTTP headers.
+
+    Args:
+        headers (Optional[Dict[str, str]]): Headers to extend. A new dictionary is created when None.
+
+    Returns:
+        Dict[str, str]: The headers including the propagation headers, if any.
+    """
+    headers = dict(headers or {})
+    if otel_propagate is not None:
+        otel_propagate.inject(headers)
+    return headers
+
+
+def traced(
+    name: Optional[str] = None, attributes: Optional[Mapping[str, str]] = None
+) -> Callable:
+    """
+    Decorator that records a span around every call of the decorated function.
+
+    Args:
+        name (Optional[str]): Span name. Defaults to the qualified name of the function, e.g.
+            ``SimilaritySearchAPI.search``.
+        attributes (Optional[Mapping[str, str]]): Mapping of span attribute name to the name
+            of the keyword argument holding its value.
+
+    Returns:
+        Callable: The decorator. It returns the function unchanged when OpenTelemetry is not installed.
+    """
+    attribute_map = dict(attributes or {})
+
+    def decorator(func: Callable) -> Callable:
+        if otel_trace is None:
+            return func
+
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            span_attributes = {
+                attribute: kwargs.get(argument)
+                for attribute, argument in attribute_map.items()
+            }
+            with start_span(span_name, span_attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
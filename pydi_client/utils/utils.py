@@ -15,3 +15,24 @@ def deprecated(message="This function is deprecated"):
             return func(*args, **kwargs)
         return wrapper
     return decorator
+
+
+class ResetOnPickle:
+    """
+    Mixin for objects holding locks and runtime state (limiters, schedulers, ...).
+    They are pickled as their constructor arguments, so a copy sent to another process
+    starts afresh instead of failing to pickle its locks.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        self._init_args = (args, dict(kwargs))
+        return self
+
+    def __reduce__(self):
+        args, kwargs = self._init_args
+        return (_restore, (type(self), args, kwargs))
+
+
+def _restore(cls, args, kwargs):
+    return cls(*args, **kwargs)
@@ -0,0 +1,43 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+"""
+Fixtures and helpers shared by the tests running against `FakeDIServer`.
+
+The helpers are imported by the test modules, e.g. `from conftest import make_server, search`.
+"""
+
+from typing import Any, List, Optional
+
+import pytest
+
+from pydi_client.testing import FakeDIServer
+
+PIPELINE = "rag-pipeline"
+COLLECTION = "docs"
+CREDENTIALS = {"access_key": "access-key", "secret_key": "secret-key"}
+
+
+def make_server(*, buckets: Optional[List[str]] = None, **kwargs: Any) -> FakeDIServer:
+    """
+    Build a FakeDIServer with the `rag-pipeline` pipeline and the `docs` collection.
+
+    The keyword arguments are passed on to FakeDIServer; the random generator is seeded so
+    the injected errors are deterministic.
+    """
+    kwargs.setdefault("seed", 0)
+    server = FakeDIServer(**kwargs)
+    server.add_pipeline(name=PIPELINE)
+    server.add_collection(name=COLLECTION, pipeline=PIPELINE, buckets=buckets)
+    return server
+
+
+@pytest.fixture
+def server() -> FakeDIServer:
+    return make_server()
+
+
+def search(client: Any, query: str = "q", *, top_k: int = 2, **kwargs: Any) -> Any:
+    """Run a similarity search in the `docs` collection."""
+    return client.similarity_search(
+        collection_name=COLLECTION, query=query, top_k=top_k, **CREDENTIALS, **kwargs
+    )
@@ -0,0 +1,247 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from pydi_client.di_client import DIAdminClient, DIClient
+from pydi_client.sessions.balancer import (
+    Endpoint,
+    LoadBalancer,
+    LoadBalancingTransport,
+    is_idempotent,
+)
+from conftest import make_server, search
+
+
+URIS = ["http://di-1.local", "http://di-2.local", "http://di-3.local"]
+
+
+@pytest.fixture
+def servers():
+    servers = {}
+    for uri in URIS:
+        server = make_server(uri=uri)
+        servers[httpx.URL(uri).host] = server
+    return servers
+
+
+def _transport(servers, down=()):
+    def handle(request):
+        if request.url.host in down:
+            raise httpx.ConnectError("connection refused", request=request)
+        return servers[request.url.host].handle_request(request)
+
+    return httpx.MockTransport(handle)
+
+
+def _count(server, route="/collections"):
+    return server.request_count[("GET", route)]
+
+
+def test_round_robin_spreads_requests(servers):
+    client = DIClient(uri=URIS, httpx_args={"transport": _transport(servers)})
+    for _ in range(6):
+        client.get_all_collections()
+    assert [_count(server) for server in servers.values()] == [2, 2, 2]
+
+
+def test_failover_and_ejection(servers):
+    balancer = LoadBalancer(max_failures=1, ejection_time=60)
+    client = DIClient(
+        uri=URIS,
+        balancer=balancer,
+        httpx_args={"transport": _transport(servers, down=("di-2.local",))},
+    )
+    for _ in range(6):
+        client.get_all_collections()
+
+    assert _count(servers["di-1.local"]) + _count(servers["di-3.local"]) == 6
+    endpoints = balancer.endpoints(URIS)
+    assert endpoints[1].consecutive_failures == 1
+    assert endpoints[1].ejected_until > 0
+
+
+def test_overloaded_endpoint_fails_over(servers):
+    servers["di-1.local"].fail_next(503)
+    client = DIClient(uri=URIS, httpx_args={"transport": _transport(servers)})
+    results = search(client)
+    assert len(results) == 2
+    counts = [
+        server.request_count[("POST", "/similaritySearch")]
+        for server in servers.values()
+    ]
+    assert counts[0] == 1 and sum(counts) == 2
+
+
+def test_non_idempotent_request_is_not_retried(servers):
+    client = DIAdminClient(
+        uri=URIS,
+        username="admin",
+        password="admin",
+        httpx_args={"transport": _transport(servers)},
+    )
+    for server in servers.values():
+        server.fail_next(503)
+    with pytest.raises(Exception):
+        client.create_pipeline(
+            name="p2", pipeline_type="rag", event_filter_object_suffix=["*.txt"]
+        )
+    counts = [
+        server.request_count[("POST", "/pipelines")] for server in servers.values()
+    ]
+    assert sum(counts) == 1
+
+
+def test_admin_client_shares_balancer(servers):
+    client = DIAdminClient(
+        uri=URIS,
+        username="admin",
+        password="admin",
+        httpx_args={"transport": _transport(servers)},
+    )
+    assert client.authenticated_session.balancer is client.session.balancer
+
+
+def test_per_endpoint_tokens(servers):
+    client = DIAdminClient(
+        uri=URIS,
+        username="admin",
+        password="admin",
+        per_endpoint_tokens=True,
+        httpx_args={"transport": _transport(servers)},
+    )
+    for _ in range(3):
+        client.get_all_schemas()
+    assert all(
+        server.request_count[("GET", "/schemas")] == 1 for server in servers.values()
+    )
+
+    logins = [server.request_count[("POST", "/login")] for server in servers.values()]
+
+    # an expired token triggers a new login to that endpoint only
+    servers["di-2.local"].expire_tokens()
+    for _ in range(3):
+        client.get_all_schemas()
+    counts = [server.request_count[("GET", "/schemas")] for server in servers.values()]
+    assert counts == [2, 3, 2]
+    assert [
+        server.request_count[("POST", "/login")] for server in servers.values()
+    ] == [
+        logins[0],
+        logins[1] + 1,
+        logins[2],
+    ]
+
+
+def test_slow_login_does_not_block_other_endpoints():
+    unblock = threading.Event()
+    logins = []
+    tokens = []
+
+    def handle(request):
+        tokens.append(request.headers["Authorization"])
+        return httpx.Response(200, json=[])
+
+    def authenticate(uri):
+        logins.append(uri)
+        if uri == URIS[0]:
+            assert unblock.wait(5)
+        return f"token-{uri}"
+
+    transport = LoadBalancingTransport(
+        uris=URIS,
+        balancer=LoadBalancer(),
+        transport=httpx.MockTransport(handle),
+        authenticate=authenticate,
+    )
+    client = httpx.Client(base_url=URIS[0], transport=transport)
+
+    # the first request goes to the first endpoint and waits for its login
+    slow = threading.Thread(target=client.get, args=("/api/v1/collections",))
+    slow.start()
+    while not logins:
+        time.sleep(0.001)
+    client.get("/api/v1/collections")
+    assert tokens == [f"token-{URIS[1]}"]
+    unblock.set()
+    slow.join()
+
+    assert tokens == [f"token-{URIS[1]}", f"token-{URIS[0]}"]
+    assert logins == URIS[:2]
+
+
+def test_endpoint_is_released_on_errors():
+    def authenticate(uri):
+        raise RuntimeError("login failed")
+
+    balancer = LoadBalancer(max_failures=1)
+    transport = LoadBalancingTransport(
+        uris=URIS,
+        balancer=balancer,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])),
+        authenticate=authenticate,
+    )
+    client = httpx.Client(base_url=URIS[0], transport=transport)
+
+    with pytest.raises(RuntimeError):
+        client.get("/api/v1/collections")
+    assert [e.outstanding for e in transport.endpoints] == [0, 0, 0]
+    assert [e.consecutive_failures for e in transport.endpoints] == [1, 0, 0]
+
+
+def test_login_is_not_failed_over():
+    request = httpx.Request("POST", "http://di-1.local/api/v1/login")
+    assert not is_idempotent(request)
+    assert is_idempotent(
+        httpx.Request("POST", "http://di-1.local/api/v1/similaritySearch")
+    )
+
+
+def test_base_path_is_moved_to_endpoint():
+    seen = []
+
+    def handle(request):
+        seen.append(str(request.url))
+        return httpx.Response(200, json=[])
+
+    client = DIClient(
+        uri=["http://a.local/di", "http://b.local/di/"],
+        httpx_args={"transport": httpx.MockTransport(handle)},
+    )
+    client.get_all_collections()
+    client.get_all_collections()
+    assert seen == [
+        "http://a.local/di/api/v1/collections",
+        "http://b.local/di/api/v1/collections",
+    ]
+
+
+@pytest.mark.parametrize(
+    "strategy, expected",
+    [("least_outstanding", "b"), ("latency_ewma", "c")],
+)
+def test_strategies(strategy, expected):
+    balancer = LoadBalancer(strategy=strategy)
+    endpoints = balancer.endpoints(["a", "b", "c"])
+    endpoints[0].outstanding = 2
+    endpoints[2].outstanding = 1
+    for endpoint, latency in zip(endpoints, (0.01, 0.5, 0.001)):
+        endpoint.latency_ewma = latency
+    assert balancer.acquire(endpoints) is endpoints["abc".index(expected)]
+
+
+def test_all_ejected_uses_first_to_recover():
+    balancer = LoadBalancer(max_failures=1, ejection_time=10)
+    endpoints = balancer.endpoints(["a", "b"])
+    for endpoint in reversed(endpoints):
+        balancer.release(balancer.acquire([endpoint]), 0.0, True)
+    assert balancer.acquire(endpoints) is endpoints[1]
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        LoadBalancer(strategy="random")
+    assert repr(Endpoint("http://x/")).startswith("Endpoint('http://x'")
@@ -0,0 +1,268 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from pydi_client.errors import SimilaritySearchFailureException
+from pydi_client.sessions.batching import SearchBatcher, _Batch, _batch_key
+from conftest import make_server, search
+
+
+BATCH = ("POST", "/similaritySearch/batch")
+SINGLE = ("POST", "/similaritySearch")
+
+
+def _server(**kwargs):
+    server = make_server(**kwargs)
+    server.add_collection(name="other", pipeline="rag-pipeline")
+    return server
+
+
+@contextlib.contextmanager
+def _busy(server, client):
+    """
+    Keep a search held by the server in flight, so that the searches sent meanwhile wait
+    for each other instead of going out alone.
+    """
+    held = threading.Event()
+    release = threading.Event()
+
+    def latency(method, path):
+        if path.endswith("/similaritySearch") and not held.is_set():
+            held.set()
+            assert release.wait(5)
+        return 0.0
+
+    server.latency = latency
+    holder = threading.Thread(
+        target=client.similarity_search,
+        kwargs=dict(
+            collection_name="docs",
+            query="hold",
+            top_k=1,
+            access_key="h",
+            secret_key="h",
+        ),
+    )
+    holder.start()
+    assert held.wait(5)
+    try:
+        yield
+    finally:
+        release.set()
+        holder.join()
+        server.latency = 0.0
+
+
+def _concurrent_searches(server, client, queries, collections=("docs",)):
+    barrier = threading.Barrier(len(queries))
+
+    def run(index):
+        barrier.wait()
+        return client.similarity_search(
+            collection_name=collections[index % len(collections)],
+            query=queries[index],
+            top_k=index % 3 + 1,
+            access_key="a",
+            secret_key="s",
+        )
+
+    with _busy(server, client), ThreadPoolExecutor(
+        max_workers=len(queries)
+    ) as executor:
+        return list(executor.map(run, range(len(queries))))
+
+
+def _expected(server, queries, collections=("docs",)):
+    return [
+        server.search_results(
+            collection_name=collections[index % len(collections)],
+            query=query,
+            top_k=index % 3 + 1,
+        )
+        for index, query in enumerate(queries)
+    ]
+
+
+def test_concurrent_searches_are_batched():
+    server = _server(batch_search=True)
+    batcher = SearchBatcher(window=1.0, max_batch_size=8)
+    client = server.client(batcher=batcher)
+    queries = [f"query {index}" for index in range(8)]
+
+    results = _concurrent_searches(server, client, queries)
+
+    assert results == _expected(server, queries)
+    assert server.request_count[BATCH] == 1
+    # the held search only
+    assert server.request_count[SINGLE] == 1
+    assert (batcher.supported, batcher.batches, batcher.batched_searches) == (
+        True,
+        1,
+        8,
+    )
+
+
+def test_batches_are_per_collection():
+    server = _server(batch_search=True)
+    batcher = SearchBatcher(window=0.1, max_batch_size=3)
+    queries = [f"query {index}" for index in range(6)]
+
+    results = _concurrent_searches(
+        server, server.client(batcher=batcher), queries, ("docs", "other")
+    )
+
+    assert results == _expected(server, queries, ("docs", "other"))
+    assert server.request_count[BATCH] == 2
+
+
+def test_falls_back_without_batch_endpoint():
+    server = _server()
+    batcher = SearchBatcher(window=0.05, max_batch_size=4)
+    client = server.client(batcher=batcher)
+    queries = [f"query {index}" for index in range(4)]
+
+    assert _concurrent_searches(server, client, queries) == _expected(server, queries)
+    assert batcher.supported is False
+    assert server.request_count[BATCH] == 1
+    # the held search, then the first search of the batch checking for batch support
+    # and the others
+    assert server.request_count[SINGLE] == 1 + 4
+
+    # no more batch attempts
+    _concurrent_searches(server, client, queries)
+    assert server.request_count[BATCH] == 1
+    assert server.request_count[SINGLE] == 10
+
+
+def test_shared_batcher_keeps_servers_apart():
+    servers = [
+        _server(
+            batch_search=True, uri=f"http://di-{index}.local", buckets=[f"b{index}"]
+        )
+        for index in range(2)
+    ]
+    batcher = SearchBatcher(window=1.0, max_batch_size=2)
+    clients = [server.client(batcher=batcher) for server in servers]
+    queries = [f"query {index}" for index in range(4)]
+    barrier = threading.Barrier(len(queries))
+
+    def run(index):
+        barrier.wait()
+        return search(clients[index % 2], queries[index], top_k=1)
+
+    with _busy(servers[0], clients[0]), ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(run, range(len(queries))))
+
+    assert results == [
+        servers[index % 2].search_results(collection_name="docs", query=query, top_k=1)
+        for index, query in enumerate(queries)
+    ]
+    assert [server.request_count[BATCH] for server in servers] == [1, 1]
+    assert batcher.batched_searches == 4
+
+
+def test_missing_collection_does_not_disable_batching():
+    server = _server(batch_search=True)
+    batcher = SearchBatcher(window=1.0, max_batch_size=2)
+    client = server.client(batcher=batcher)
+
+    with pytest.raises(SimilaritySearchFailureException):
+        _concurrent_searches(server, client, ["a", "b"], ("missing",))
+    assert batcher.supported is None
+    assert server.request_count[BATCH] == 1
+
+    _concurrent_searches(server, client, ["a", "b"])
+    assert batcher.supported is True
+    assert server.request_count[BATCH] == 2
+
+
+def test_single_search_is_sent_alone():
+    server = _server(batch_search=True)
+    client = server.client(batcher=SearchBatcher(window=0.001))
+    assert len(_concurrent_searches(server, client, ["q"])[0]) == 1
+    assert server.request_count[BATCH] == 0
+    assert server.request_count[SINGLE] == 2
+
+
+def test_lone_search_does_not_wait_for_the_window():
+    server = _server(batch_search=True)
+    client = server.client(batcher=SearchBatcher(window=10.0))
+
+    start = time.perf_counter()
+    for _ in range(3):
+        search(client, top_k=1)
+    assert time.perf_counter() - start < 5.0
+    assert server.request_count[SINGLE] == 3
+
+
+def test_waiting_searches_are_released_when_the_batch_fails(mocker):
+    server = _server(batch_search=True)
+    batcher = SearchBatcher(window=1.0, max_batch_size=2)
+    client = server.client(batcher=batcher)
+    dispatch = batcher._dispatch
+
+    def fail(batch, transport):
+        if len(batch.items) > 1:
+            raise KeyboardInterrupt
+        return dispatch(batch, transport)
+
+    mocker.patch.object(batcher, "_dispatch", side_effect=fail)
+
+    def run(query):
+        try:
+            return client.similarity_search(
+                collection_name="docs",
+                query=query,
+                top_k=1,
+                access_key="a",
+                secret_key="s",
+            )
+        except KeyboardInterrupt:
+            return None
+
+    with _busy(server, client), ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(run, ["a", "b"]))
+
+    # the leader failed, the other search was sent on its own
+    assert results.count(None) == 1
+    assert server.request_count[BATCH] == 0
+
+
+def test_waiting_search_times_out():
+    batcher = SearchBatcher(window=0.01)
+    request = httpx.Request(
+        "POST",
+        "http://di.local/api/v1/similaritySearch",
+        json={"collectionName": "docs", "query": "q", "topK": 1},
+        extensions={
+            "timeout": {"pool": 0.01, "connect": 0.01, "write": 0.01, "read": 0.01}
+        },
+    )
+    # another search leads a batch which is never sent
+    batcher._in_flight = 1
+    body = {"collectionName": "docs"}
+    batcher._open[_batch_key(request, body)] = _Batch(body)
+
+    with pytest.raises(httpx.ReadTimeout):
+        batcher.send(request, httpx.MockTransport(lambda request: None))
+    assert batcher._in_flight == 1
+
+
+def test_batch_error_reaches_every_caller():
+    server = _server(batch_search=True)
+    client = server.client(batcher=SearchBatcher(window=1.0, max_batch_size=2))
+    server.fail_next(503, path="/api/v1/similaritySearch/batch")
+    with pytest.raises(SimilaritySearchFailureException):
+        _concurrent_searches(server, client, ["a", "b"])
+    assert server.request_count[BATCH] == 1
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SearchBatcher(max_batch_size=0)
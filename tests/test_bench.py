@@ -0,0 +1,167 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import json
+import threading
+import time
+
+import pytest
+
+from pydi_client import bench, cli
+from pydi_client.errors import UnexpectedStatus
+from conftest import make_server
+
+
+def test_closed_loop_counts_requests_and_errors():
+    calls = []
+
+    def call(query):
+        calls.append(query)
+        if query == "bad":
+            raise UnexpectedStatus(503, b"unavailable")
+
+    report = bench.run(call, ["good", "bad"], concurrency=4, requests=20)
+
+    assert report.requests == 20
+    assert report.successes == 10
+    assert report.errors == {"UnexpectedStatus(503)": 10}
+    assert sum(bucket.count for bucket in report.histogram) == 20
+    assert sorted(set(calls)) == ["bad", "good"]
+
+
+@pytest.mark.parametrize("engine", bench.ENGINES)
+def test_open_loop_holds_target_rate(engine):
+    report = bench.run(
+        lambda query: time.sleep(0.01),
+        ["q"],
+        mode="open",
+        engine=engine,
+        qps=200,
+        duration=0.25,
+        concurrency=8,
+    )
+
+    assert report.requests == 50
+    assert report.dropped == 0
+    assert report.target_qps == 200
+    assert report.latency_ms.min >= 10
+    # open-loop keeps the arrival rate even though each request takes 10 ms
+    assert report.duration_s < 0.5
+
+
+@pytest.mark.parametrize("engine", bench.ENGINES)
+def test_open_loop_drops_arrivals_beyond_concurrency(engine):
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+
+    def call(query):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+
+    report = bench.run(
+        call,
+        ["q"],
+        mode="open",
+        engine=engine,
+        qps=200,
+        duration=0.1,
+        concurrency=2,
+    )
+
+    assert in_flight[1] <= 2
+    assert report.dropped > 0
+    assert report.requests + report.dropped == 20
+
+
+def test_async_closed_loop():
+    report = bench.run(
+        lambda query: None, ["q"], engine="async", concurrency=3, requests=9
+    )
+    assert report.requests == 9
+    assert report.errors == {}
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        bench.run(lambda query: None, ["q"], mode="open", requests=1)
+    with pytest.raises(ValueError):
+        bench.run(lambda query: None, ["q"])
+    with pytest.raises(ValueError):
+        bench.run(lambda query: None, [], requests=1)
+
+
+def test_build_report_histogram():
+    report = bench.build_report(
+        [0.0005, 0.003, 0.003, 20.0],
+        {},
+        1.0,
+        mode="closed",
+        engine="thread",
+        concurrency=1,
+    )
+    counts = {bucket.le_ms: bucket.count for bucket in report.histogram}
+    assert counts[1] == 1
+    assert counts[5] == 2
+    assert counts[None] == 1
+    assert report.latency_ms.max == 20000.0
+
+
+def test_cli_bench_search(tmp_path, monkeypatch, capsys):
+    server = make_server()
+    monkeypatch.setattr(cli, "DIClient", lambda uri, **kwargs: server.client(**kwargs))
+
+    queries = tmp_path / "queries.txt"
+    queries.write_text("first query\n\nsecond query\n")
+
+    exit_code = cli.main(
+        [
+            "bench",
+            "search",
+            "--uri",
+            server.uri,
+            "--collection",
+            "docs",
+            "--queries",
+            str(queries),
+            "--access-key",
+            "ak",
+            "--secret-key",
+            "sk",
+            "--concurrency",
+            "2",
+            "--requests",
+            "6",
+            "--format",
+            "json",
+        ]
+    )
+
+    assert exit_code == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["requests"] == 6
+    assert report["successes"] == 6
+    assert server.request_count[("POST", "/similaritySearch")] == 6
+
+
+def test_cli_requires_credentials(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("PYDI_ACCESS_KEY", raising=False)
+    queries = tmp_path / "queries.txt"
+    queries.write_text("q\n")
+
+    exit_code = cli.main(
+        [
+            "bench",
+            "search",
+            "--uri",
+            "http://example.com",
+            "--collection",
+            "docs",
+            "--queries",
+            str(queries),
+        ]
+    )
+    assert exit_code == 2
+    assert "credentials" in capsys.readouterr().err
@@ -0,0 +1,182 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import httpx
+import pytest
+
+from pydi_client.api import collection
+from conftest import make_server
+
+
+ASSIGN_PATH = "/api/v1/collections/docs/assignBuckets"
+ASSIGN = ("POST", "/collections/{name}/assignBuckets")
+
+
+def _server(**kwargs):
+    server = make_server(**kwargs)
+    return server
+
+
+def _buckets(count):
+    return [f"bucket-{index}" for index in range(count)]
+
+
+def test_buckets_are_assigned_in_chunks():
+    server = _server()
+    buckets = _buckets(250)
+    progress = []
+
+    response = server.admin_client().assign_buckets_bulk(
+        collection_name="docs",
+        buckets=buckets,
+        chunk_size=100,
+        max_concurrency=3,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert response.success
+    assert response.succeeded == buckets
+    assert response.failed == {}
+    assert len(response.responses) == 3
+    assert server.request_count[ASSIGN] == 3
+    assert sorted(server.collections["docs"]["buckets"]) == sorted(buckets)
+    # chunks complete in any order
+    assert len(progress) == 3
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert progress[-1] == (250, 250)
+
+
+def test_duplicates_are_sent_once():
+    server = _server()
+    response = server.admin_client().assign_buckets_bulk(
+        collection_name="docs", buckets=["a", "b", "a"], chunk_size=1
+    )
+    assert response.succeeded == ["a", "b"]
+    assert server.request_count[ASSIGN] == 2
+
+
+def test_failed_chunks_are_retried():
+    server = _server()
+    server.fail_next(503, times=2, path=ASSIGN_PATH)
+
+    response = server.admin_client().assign_buckets_bulk(
+        collection_name="docs",
+        buckets=_buckets(20),
+        chunk_size=10,
+        max_concurrency=1,
+        backoff=0,
+    )
+
+    assert response.success
+    assert server.request_count[ASSIGN] == 4
+
+
+def test_failed_chunk_does_not_stop_the_others():
+    server = _server()
+    server.fail_next(400, path=ASSIGN_PATH)
+    buckets = _buckets(30)
+
+    response = server.admin_client().assign_buckets_bulk(
+        collection_name="docs", buckets=buckets, chunk_size=10, max_concurrency=1
+    )
+
+    assert not response.success
+    assert list(response.failed) == buckets[:10]
+    assert all("400" in message for message in response.failed.values())
+    assert response.succeeded == buckets[10:]
+    assert server.request_count[ASSIGN] == 3
+
+
+def _failing_first(server, response):
+    """Transport answering the first bucket update with `response`."""
+    sent = []
+
+    def handle(request):
+        if request.url.path == ASSIGN_PATH and not sent:
+            sent.append(request)
+            return response
+        return server.handle_request(request)
+
+    return httpx.MockTransport(handle)
+
+
+def test_retry_after_is_honored(monkeypatch):
+    server = _server()
+    transport = _failing_first(
+        server, httpx.Response(429, headers={"Retry-After": "7"}, content=b"busy")
+    )
+    delays = []
+    monkeypatch.setattr(collection.time, "sleep", delays.append)
+
+    response = server.admin_client(
+        httpx_args={"transport": transport}
+    ).assign_buckets_bulk(collection_name="docs", buckets=_buckets(5), backoff=0.5)
+
+    assert response.success
+    assert delays == [7.0]
+
+
+def test_unexpected_response_fails_its_chunk_only():
+    server = _server()
+    transport = _failing_first(server, httpx.Response(200, content=b"<html>"))
+    buckets = _buckets(30)
+
+    response = server.admin_client(
+        httpx_args={"transport": transport}
+    ).assign_buckets_bulk(
+        collection_name="docs", buckets=buckets, chunk_size=10, max_concurrency=1
+    )
+
+    assert list(response.failed) == buckets[:10]
+    assert all(
+        message.startswith("UnexpectedResponse") for message in response.failed.values()
+    )
+    assert response.succeeded == buckets[10:]
+
+
+def test_retries_are_bounded():
+    server = _server()
+    server.fail_next(503, times=10, path=ASSIGN_PATH)
+
+    response = server.admin_client().assign_buckets_bulk(
+        collection_name="docs", buckets=_buckets(5), retries=2, backoff=0
+    )
+
+    assert not response.success
+    assert len(response.failed) == 5
+    assert server.request_count[ASSIGN] == 3
+
+
+def test_too_large_chunks_are_split():
+    server = _server(max_request_buckets=30)
+    buckets = _buckets(100)
+
+    response = server.admin_client().assign_buckets_bulk(
+        collection_name="docs", buckets=buckets, chunk_size=100
+    )
+
+    assert response.success
+    assert response.succeeded == buckets
+    assert sorted(server.collections["docs"]["buckets"]) == sorted(buckets)
+
+
+def test_buckets_are_unassigned_in_chunks():
+    server = _server()
+    buckets = _buckets(50)
+    server.collections["docs"]["buckets"] = list(buckets)
+
+    response = server.admin_client().unassign_buckets_bulk(
+        collection_name="docs", buckets=buckets[:40], chunk_size=15
+    )
+
+    assert response.success
+    assert server.collections["docs"]["buckets"] == buckets[40:]
+
+
+def test_invalid_arguments():
+    client = _server().admin_client()
+    with pytest.raises(ValueError):
+        client.assign_buckets_bulk(collection_name="docs", buckets=["a"], chunk_size=0)
+    with pytest.raises(ValueError):
+        client.assign_buckets_bulk(
+            collection_name="docs", buckets=["a"], max_concurrency=0
+        )
@@ -0,0 +1,159 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import threading
+
+import httpx
+import pytest
+
+from pydi_client.data.collection_manager import (
+    V1CollectionResponse,
+    V1DeleteCollectionResponse,
+)
+from pydi_client.data.pipeline import V1CreatePipelineResponse
+from pydi_client.testing import FakeDIServer
+
+RAG = {
+    "pipeline_type": "rag",
+    "model": "embedding-model",
+    "event_filter_object_suffix": ["*"],
+}
+
+
+def _admin(server):
+    """Admin client recording the (method, path) of the requests, in order."""
+    requests = []
+    lock = threading.Lock()
+
+    def handle(request):
+        with lock:
+            requests.append((request.method, request.url.path))
+        return server.handle_request(request)
+
+    admin = server.admin_client(httpx_args={"transport": httpx.MockTransport(handle)})
+    return admin, requests
+
+
+@pytest.fixture
+def server():
+    server = FakeDIServer(latency=0.01)
+    for index in range(2):
+        server.add_pipeline(name=f"p{index}")
+    for index in range(6):
+        server.add_collection(name=f"c{index}", pipeline=f"p{index % 2}")
+    return server
+
+
+def test_create_many():
+    server = FakeDIServer()
+    admin, requests = _admin(server)
+
+    response = admin.create_many(
+        pipelines=[{**RAG, "name": "p0"}, {**RAG, "name": "p1"}],
+        collections=[
+            {"name": f"c{index}", "pipeline": f"p{index % 2}", "buckets": [f"b{index}"]}
+            for index in range(4)
+        ],
+        max_workers=4,
+    )
+
+    assert response.success
+    assert isinstance(response.pipelines["p0"].response, V1CreatePipelineResponse)
+    assert isinstance(response.collections["c3"].response, V1CollectionResponse)
+    assert server.collections["c3"]["buckets"] == ["b3"]
+    # every pipeline is created before the collections
+    paths = [
+        path
+        for method, path in requests
+        if method == "POST" and path != "/api/v1/login"
+    ]
+    assert paths == ["/api/v1/pipelines"] * 2 + ["/api/v1/collections"] * 4
+
+
+def test_create_many_rejects_duplicate_names():
+    server = FakeDIServer()
+    with pytest.raises(ValueError, match="p0"):
+        server.admin_client().create_many(
+            pipelines=[{**RAG, "name": "p0"}, {**RAG, "name": "p0"}]
+        )
+    assert server.pipelines == {}
+
+
+def test_delete_many(server):
+    admin, requests = _admin(server)
+
+    response = admin.delete_many(
+        collections=[f"c{index}" for index in range(6)], pipelines=["p0", "p1"]
+    )
+
+    assert response.success
+    assert isinstance(response.collections["c0"].response, V1DeleteCollectionResponse)
+    assert server.collections == {} and server.pipelines == {}
+    deletions = [path for method, path in requests if method == "DELETE"]
+    assert all("/collections/" in path for path in deletions[:6])
+    assert all("/pipelines/" in path for path in deletions[6:])
+
+
+def test_failures_are_reported_per_item(server):
+    admin, _ = _admin(server)
+    server.fail_next(500, path="/api/v1/collections/c1")
+
+    response = admin.delete_many(
+        collections=[f"c{index}" for index in range(6)], pipelines=["p0"]
+    )
+
+    assert not response.success
+    assert not response.collections["c1"].success
+    assert "500" in response.collections["c1"].error
+    assert all(
+        result.success for name, result in response.collections.items() if name != "c1"
+    )
+    # without stop_on_failure, the next tier still runs
+    assert response.pipelines["p0"].success
+
+
+def test_stop_on_failure(server):
+    admin, _ = _admin(server)
+    server.fail_next(500, path="/api/v1/collections/c0")
+
+    response = admin.delete_many(
+        collections=[f"c{index}" for index in range(6)],
+        pipelines=["p0"],
+        stop_on_failure=True,
+        max_workers=1,
+    )
+
+    assert not response.success
+    assert response.collections["c0"].error
+    # the operation already picked by the worker may still run
+    skipped = [name for name, result in response.collections.items() if result.skipped]
+    assert len(skipped) >= 4
+    assert all(name in server.collections for name in skipped)
+    assert response.pipelines["p0"].skipped
+    assert set(server.pipelines) == {"p0", "p1"}
+
+
+def test_runs_concurrently():
+    server = FakeDIServer(latency=0.2)
+    for index in range(8):
+        server.add_pipeline(name=f"p{index}")
+    admin, _ = _admin(server)
+    in_flight = []
+    active = [0]
+    lock = threading.Lock()
+    handle = server.handle_request
+
+    def counting(request):
+        with lock:
+            active[0] += 1
+            in_flight.append(active[0])
+        try:
+            return handle(request)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    server.handle_request = counting
+
+    admin.delete_many(pipelines=[f"p{index}" for index in range(8)], max_workers=4)
+
+    assert max(in_flight) == 4
@@ -0,0 +1,120 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import pickle
+import threading
+
+import httpx
+import pytest
+
+from pydi_client.di_client import DIClient
+from pydi_client.sessions.compression import Compression, available_encodings
+from pydi_client.sessions.size_limits import ResponseSizeLimits
+from pydi_client.errors import ResponseTooLargeException
+from pydi_client.testing import FakeDIServer
+from conftest import make_server
+
+
+SEARCH = dict(collection_name="docs", query="q", access_key="ak", secret_key="sk")
+
+
+@pytest.fixture
+def server():
+    return make_server(compression=True, buckets=["b1"])
+
+
+def _recording(server, **session_args):
+    """Client recording the headers of the requests and responses on the wire."""
+    wire = []
+    lock = threading.Lock()
+
+    def handle(request):
+        response = server.handle_request(request)
+        with lock:
+            wire.append((request.headers, response.headers))
+        return response
+
+    transport = httpx.MockTransport(handle)
+    return wire, {"httpx_args": {"transport": transport}, **session_args}
+
+
+def test_compressed_responses(server):
+    compression = Compression()
+    wire, session_args = _recording(server, compression=compression)
+    client = server.client(**session_args)
+
+    results = client.similarity_search(top_k=100, **SEARCH)
+
+    assert results == server.client().similarity_search(top_k=100, **SEARCH)
+    request_headers, response_headers = wire[0]
+    assert request_headers["accept-encoding"] == ", ".join(available_encodings())
+    assert response_headers["content-encoding"] == "gzip"
+    stats = compression.stats.snapshot()
+    assert stats["requests"] == 1
+    assert stats["bytes_received"] == int(response_headers["content-length"])
+    # the chunks of the fake server repeat, so they compress very well
+    assert stats["response_body_bytes"] > 10 * stats["bytes_received"]
+
+
+def test_compressed_responses_over_http(server):
+    compression = Compression()
+    with server.serve() as uri:
+        with DIClient(uri=uri, compression=compression) as client:
+            results = client.similarity_search(top_k=50, **SEARCH)
+
+    assert len(results) == 50
+    stats = compression.stats.snapshot()
+    assert stats["response_body_bytes"] > 10 * stats["bytes_received"]
+
+
+def test_uncompressed_responses_are_measured():
+    server = FakeDIServer()
+    server.add_pipeline(name="rag-pipeline")
+    compression = Compression()
+    client = server.client(compression=compression)
+
+    assert client.get_pipeline(name="rag-pipeline").name == "rag-pipeline"
+    stats = compression.stats.snapshot()
+    assert stats["bytes_received"] == stats["response_body_bytes"] > 0
+
+
+def test_request_bodies_above_the_threshold_are_compressed(server):
+    compression = Compression(request_threshold=1024)
+    wire, session_args = _recording(server, compression=compression)
+    admin = server.admin_client(**session_args)
+    buckets = [f"bucket-{index:05d}" for index in range(500)]
+
+    admin.assign_buckets_to_collection(collection_name="docs", buckets=buckets[:2])
+    admin.assign_buckets_to_collection(collection_name="docs", buckets=buckets[2:])
+
+    encodings = [headers.get("content-encoding") for headers, _ in wire]
+    # the login and the first, small assignment are sent as they are
+    assert encodings == [None, None, "gzip"]
+    assert server.collections["docs"]["buckets"] == ["b1", *buckets]
+    stats = compression.stats.snapshot()
+    assert stats["bytes_sent"] < stats["request_body_bytes"] / 4
+
+
+def test_size_limits_apply_to_decoded_bodies(server):
+    client = server.client(
+        compression=Compression(), size_limits=ResponseSizeLimits(search=50_000)
+    )
+
+    assert len(client.similarity_search(top_k=10, **SEARCH)) == 10
+    # about 400 bytes per result once decoded, a few bytes on the wire
+    with pytest.raises(ResponseTooLargeException):
+        client.similarity_search(top_k=1000, **SEARCH)
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        Compression(encodings=["gzip", "lzma"])
+
+
+def test_pickling_resets_the_stats():
+    compression = Compression(request_threshold=10)
+    compression.stats.record_request(sent=1, body=2)
+
+    restored = pickle.loads(pickle.dumps(compression))
+
+    assert restored.request_threshold == 10
+    assert restored.stats.snapshot()["requests"] == 0
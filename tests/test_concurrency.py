@@ -0,0 +1,117 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from pydi_client.di_client import DIClient
+from pydi_client.sessions.session import Session
+
+THREADS = 16
+ITERATIONS = 50
+
+
+def _hammer(worker, threads=THREADS):
+    """Run `worker(thread_index)` from many threads at once, re-raising any failure."""
+    barrier = threading.Barrier(threads)
+
+    def run(index):
+        barrier.wait()
+        worker(index)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(run, index) for index in range(threads)]:
+            future.result()
+
+
+def test_one_client_is_built_under_contention():
+    session = Session(uri="http://example.com")
+    clients = []
+    _hammer(lambda index: clients.append(session.get_httpx_client()))
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_headers_are_never_torn(server):
+    torn = []
+
+    def handle(request):
+        # both headers are always set together
+        if request.headers.get("x-first") != request.headers.get("x-second"):
+            torn.append(dict(request.headers))
+        return server.handle_request(request)
+
+    client = DIClient(
+        uri=server.uri, httpx_args={"transport": httpx.MockTransport(handle)}
+    )
+
+    def worker(index):
+        for iteration in range(ITERATIONS):
+            if index % 2:
+                value = f"{index}-{iteration}"
+                client.session.with_headers({"x-first": value, "x-second": value})
+            else:
+                client.get_all_collections()
+
+    _hammer(worker)
+    assert torn == []
+
+
+def test_timeout_changes_under_load(server):
+    client = server.client()
+
+    def worker(index):
+        for iteration in range(ITERATIONS):
+            if index % 4 == 0:
+                client.session.with_timeout(10 + iteration)
+            else:
+                client.get_collection(name="docs")
+
+    _hammer(worker)
+    assert client.session.get_httpx_client().timeout.read >= 10
+
+
+def test_concurrent_refresh_is_single_flight(server):
+    admin = server.admin_client()
+    logins = server.request_count[("POST", "/login")]
+    client = admin.authenticated_session.get_httpx_client()
+
+    for _ in range(3):
+        server.expire_tokens()
+        _hammer(lambda index: admin.get_all_schemas())
+
+    # one login per expiry, whatever the number of threads hitting 401 at once
+    assert server.request_count[("POST", "/login")] - logins == 3
+    # the token was swapped in the same client, its connections are kept
+    assert admin.authenticated_session.get_httpx_client() is client
+
+
+def test_mixed_workload_with_refreshes(server):
+    admin = server.admin_client()
+    logins = server.request_count[("POST", "/login")]
+
+    def worker(index):
+        for iteration in range(ITERATIONS // 5):
+            if index % 3 == 0:
+                admin.get_all_schemas()
+            elif index % 3 == 1:
+                admin.similarity_search(
+                    collection_name="docs",
+                    query=f"q{iteration}",
+                    top_k=2,
+                    access_key="a",
+                    secret_key="s",
+                )
+            else:
+                admin.assign_buckets_to_collection(
+                    collection_name="docs", buckets=[f"b{index}"]
+                )
+
+    for _ in range(5):
+        server.expire_tokens()
+        _hammer(worker)
+
+    assert server.request_count[("POST", "/login")] - logins == 5
+    assert set(server.collections["docs"]["buckets"]) >= {
+        f"b{index}" for index in range(THREADS) if index % 3 == 2
+    }
@@ -0,0 +1,159 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import pytest
+
+from pydi_client.api.context import assemble_context
+from pydi_client.data.pipeline import ContextPassage, SearchHit
+from conftest import make_server
+
+
+TEXT = " ".join(f"word{index}" for index in range(50))
+
+
+def _result(score, start, end, object_key="doc.txt", version="1", page=None, text=None):
+    metadata = {
+        "objectKey": object_key,
+        "bucketName": "b1",
+        "versionId": version,
+        "startCharIndex": start,
+        "endCharIndex": end,
+    }
+    if page is not None:
+        metadata["pageLabel"] = page
+    return {
+        "score": score,
+        "dataChunk": TEXT[start:end] if text is None else text,
+        "chunkMetadata": metadata,
+    }
+
+
+def test_overlapping_and_adjacent_chunks_are_merged():
+    results = [
+        _result(0.9, 40, 80, page="2"),
+        _result(0.8, 0, 50, page="1"),
+        _result(0.7, 80, 100, page="2"),
+        _result(0.6, 120, 150),
+    ]
+
+    passages = assemble_context(results)
+
+    assert passages == [
+        ContextPassage(
+            text=TEXT[0:100],
+            score=0.9,
+            objectKey="doc.txt",
+            bucketName="b1",
+            versionId="1",
+            startCharIndex=0,
+            endCharIndex=100,
+            pageLabels=("1", "2"),
+            chunks=3,
+        ),
+        ContextPassage(
+            text=TEXT[120:150],
+            score=0.6,
+            objectKey="doc.txt",
+            bucketName="b1",
+            versionId="1",
+            startCharIndex=120,
+            endCharIndex=150,
+        ),
+    ]
+
+
+def test_contained_chunks_add_no_text():
+    passages = assemble_context([_result(0.5, 10, 20), _result(0.9, 0, 60)])
+
+    assert [(p.text, p.score, p.chunks) for p in passages] == [(TEXT[0:60], 0.9, 2)]
+
+
+def test_objects_and_versions_are_not_merged():
+    results = [
+        _result(0.9, 0, 50),
+        _result(0.8, 40, 90, version="2"),
+        _result(0.7, 45, 95, object_key="other.txt"),
+    ]
+
+    passages = assemble_context(results)
+
+    assert [(p.objectKey, p.versionId, p.chunks) for p in passages] == [
+        ("doc.txt", "1", 1),
+        ("doc.txt", "2", 1),
+        ("other.txt", "1", 1),
+    ]
+
+
+def test_identical_chunks_are_deduplicated():
+    results = [
+        _result(0.4, 0, 9, object_key="a.txt", text="Copyright"),
+        _result(0.6, 0, 9, object_key="b.txt", text="Copyright"),
+    ]
+
+    passages = assemble_context(results)
+
+    assert [(p.objectKey, p.score) for p in passages] == [("b.txt", 0.6)]
+
+
+def test_chunks_without_consistent_offsets_are_kept_apart():
+    results = [
+        {"score": 0.9, "dataChunk": "no metadata"},
+        _result(0.8, 0, 50),
+        # the text length does not match the offsets
+        _result(0.7, 45, 60, text="something else entirely"),
+    ]
+
+    passages = assemble_context(results)
+
+    assert [p.text for p in passages] == [
+        "no metadata",
+        TEXT[0:50],
+        "something else entirely",
+    ]
+
+
+def test_budget_keeps_the_best_passages_which_fit():
+    results = [
+        _result(0.9, 0, 100),
+        _result(0.8, 150, 160),
+        _result(0.7, 170, 175),
+    ]
+
+    assert [p.score for p in assemble_context(results, max_chars=50)] == [0.8, 0.7]
+    assert [p.score for p in assemble_context(results, max_chars=105)] == [0.9, 0.7]
+    assert [p.score for p in assemble_context(results, max_tokens=4)] == [0.8]
+    assert [
+        p.score
+        for p in assemble_context(results, max_tokens=2, count_tokens=lambda text: 1)
+    ] == [0.9, 0.8]
+
+
+def test_hits_are_assembled_like_dictionaries():
+    results = [_result(0.9, 0, 50), _result(0.8, 50, 70)]
+
+    assert assemble_context(
+        [SearchHit.from_result(result) for result in results]
+    ) == assemble_context(results)
+
+
+@pytest.mark.parametrize("result_type", ["dict", "hit"])
+def test_similarity_search_assemble(result_type):
+    server = make_server()
+    client = server.client()
+
+    passages = client.similarity_search(
+        collection_name="docs",
+        query="q",
+        top_k=20,
+        access_key="ak",
+        secret_key="sk",
+        result_type=result_type,
+        assemble=True,
+        max_chars=10_000,
+    )
+
+    # the fake server returns the same text for every chunk
+    assert len(passages) == 1
+    assert passages[0].score == max(
+        result["score"]
+        for result in server.search_results(collection_name="docs", query="q", top_k=20)
+    )
@@ -0,0 +1,123 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from pydi_client.di_client import DIAdminClient, DIClient
+from pydi_client.errors import SimilaritySearchFailureException, UnexpectedStatus
+from conftest import make_server, search
+
+
+@pytest.fixture
+def server():
+    return make_server(buckets=["b1"])
+
+
+def test_admin_workflow(server):
+    client = server.admin_client()
+
+    created = client.create_pipeline(
+        name="p2", pipeline_type="rag", event_filter_object_suffix=["*.txt"]
+    )
+    assert created.success is True
+    collection = client.create_collection(name="c2", pipeline="p2", buckets=["b1"])
+    assert collection.buckets == ["b1"]
+
+    client.assign_buckets_to_collection(collection_name="c2", buckets=["b2"])
+    assert client.get_collection(name="c2").buckets == ["b1", "b2"]
+    client.unassign_buckets_from_collection(collection_name="c2", buckets=["b1"])
+    assert client.get_collection(name="c2").buckets == ["b2"]
+
+    names = [item.name for item in client.get_all_collections().root]
+    assert names == ["docs", "c2"]
+    assert client.get_all_schemas().schemas[0].name == "default-schema"
+
+    assert client.delete_collection(name="c2").success is True
+    assert client.delete_pipeline(name="p2").success is True
+    assert "p2" not in server.pipelines
+
+
+def test_similarity_search_result_sizes(server):
+    client = server.client()
+    results = search(client, top_k=5)
+    assert len(results) == 5
+    scores = [result["score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+    assert len(results[0]["dataChunk"]) == server.chunk_size
+
+    server.max_search_results = 2
+    assert len(search(client, top_k=5)) == 2
+
+
+def test_token_expiry_triggers_refresh(server):
+    client = server.admin_client()
+    old_token = client.authenticated_session.token
+
+    server.expire_tokens()
+    client.get_all_schemas()
+
+    assert client.authenticated_session.token != old_token
+    assert server.request_count[("POST", "/login")] == 2
+
+
+def test_error_injection(server):
+    client = server.client()
+    server.fail_next(503, path="/api/v1/similaritySearch")
+
+    with pytest.raises(SimilaritySearchFailureException):
+        search(client, top_k=1)
+    # only the next matching request fails
+    assert client.get_collection(name="docs").name == "docs"
+
+    server.error_rate = 1.0
+    with pytest.raises(UnexpectedStatus):
+        client.get_all_pipelines()
+
+
+def test_latency(server, monkeypatch):
+    # record the delays instead of measuring the wall clock
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    server.latency = lambda method, path: 0.05 if path.endswith("Search") else 0.0
+    client = server.client()
+
+    client.get_all_collections()
+    assert delays == []
+
+    search(client, top_k=1)
+    assert delays == [0.05]
+
+
+def test_invalid_login_is_rejected(server):
+    with pytest.raises(httpx.HTTPStatusError):
+        DIAdminClient(
+            uri=server.uri,
+            username=server.username,
+            password="wrong",
+            httpx_args={"transport": server.transport()},
+        )
+
+
+def test_asgi_app(server):
+    async def run():
+        transport = httpx.ASGITransport(app=server.asgi_app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url=server.uri
+        ) as client:
+            return await client.post(
+                "/api/v1/similaritySearch",
+                json={"collectionName": "docs", "query": "q", "topK": 3},
+            )
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 3
+
+
+def test_serve_over_http(server):
+    with server.serve() as uri:
+        client = DIClient(uri=uri)
+        assert client.get_collection(name="docs").pipeline == "rag-pipeline"
@@ -0,0 +1,185 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pydi_client.di_client import DIClient
+from pydi_client.sessions.authenticated_session import AuthenticatedSession
+from pydi_client.sessions.limits import OperationLimiter, RateLimits
+from pydi_client.sessions.session import Session
+from conftest import search
+
+
+def test_session_pickles_without_client():
+    limits = RateLimits(search=OperationLimiter(rate=10, adaptive=True))
+    session = Session(
+        uri="http://example.com", headers={"a": "b"}, timeout=5, limits=limits
+    )
+    session.get_httpx_client()
+
+    restored = pickle.loads(pickle.dumps(session))
+
+    assert restored._client is None
+    assert (restored.uri, restored._headers, restored._timeout) == (
+        "http://example.com",
+        {"a": "b"},
+        5,
+    )
+    assert restored.limits.limiters["search"].bucket.rate == 10
+    assert restored.get_httpx_client() is not session.get_httpx_client()
+
+
+def test_authenticated_session_pickles_without_client():
+    session = AuthenticatedSession(
+        uri=["http://a.local", "http://b.local"],
+        username="admin",
+        password="secret",
+        token="Bearer abc",
+        per_endpoint_tokens=True,
+    )
+    session.get_httpx_client()
+
+    restored = pickle.loads(pickle.dumps(session))
+
+    assert restored._client is None
+    assert restored.token == "Bearer abc"
+    assert restored.per_endpoint_tokens is True
+    assert restored.balancer is not None
+    assert restored.get_httpx_client().headers["Authorization"] == "Bearer abc"
+
+
+def test_client_is_rebuilt_after_pid_change(monkeypatch):
+    session = Session(uri="http://example.com")
+    client = session.get_httpx_client()
+    assert session.get_httpx_client() is client
+
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert session.get_httpx_client() is not client
+
+
+def _search_in_child(client, queue):
+    try:
+        results = search(client)
+        queue.put(len(results))
+    except Exception as e:  # pragma: no cover - reported to the parent
+        queue.put(repr(e))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_forked_child_uses_its_own_connections(server):
+    with server.serve() as uri:
+        client = DIClient(uri=uri)
+        client.get_all_collections()
+        parent_client = client.session.get_httpx_client()
+
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        children = [
+            context.Process(target=_search_in_child, args=(client, queue))
+            for _ in range(3)
+        ]
+        for child in children:
+            child.start()
+        results = [queue.get(timeout=10) for _ in children]
+        for child in children:
+            child.join(timeout=10)
+
+        assert results == [2, 2, 2]
+        # the parent keeps using its connections
+        assert client.session.get_httpx_client() is parent_client
+        assert len(client.get_all_collections().root) == 1
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_similarity_search_many(server, executor):
+    queries = [f"query {index}" for index in range(6)]
+    with server.serve() as uri:
+        client = DIClient(uri=uri)
+        results = client.similarity_search_many(
+            collection_name="docs",
+            queries=queries,
+            top_k=3,
+            access_key="a",
+            secret_key="s",
+            executor=executor,
+            max_workers=2,
+            chunksize=2,
+        )
+    assert results == [
+        server.search_results(collection_name="docs", query=query, top_k=3)
+        for query in queries
+    ]
+
+
+def test_similarity_search_many_reuses_worker_processes(server):
+    def run(client):
+        return client.similarity_search_many(
+            collection_name="docs",
+            queries=["a"],
+            top_k=1,
+            access_key="a",
+            secret_key="s",
+            executor="process",
+            max_workers=1,
+        )
+
+    with server.serve() as uri:
+        client = DIClient(uri=uri)
+        run(client)
+        pool = client._process_pool
+        assert len(run(client)[0]) == 1
+        assert client._process_pool is pool
+        # a copy gets its own worker processes
+        assert pickle.loads(pickle.dumps(client))._process_pool is None
+
+        client.close()
+    assert client._process_pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(len, "a")
+
+
+def test_similarity_search_many_in_caller_executor(server):
+    client = server.client()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for _ in range(2):
+            results = client.similarity_search_many(
+                collection_name="docs",
+                queries=["a", "b"],
+                top_k=1,
+                access_key="a",
+                secret_key="s",
+                executor=executor,
+                result_type="hit",
+            )
+            assert [len(hits) for hits in results] == [1, 1]
+
+
+def test_similarity_search_many_rejects_unpicklable_session(server):
+    # the mock transport of the fake server cannot be sent to worker processes
+    with pytest.raises(ValueError, match='executor="thread"'):
+        server.client().similarity_search_many(
+            collection_name="docs",
+            queries=["a"],
+            top_k=1,
+            access_key="a",
+            secret_key="s",
+            executor="process",
+        )
+
+
+def test_similarity_search_many_invalid_executor(server):
+    with pytest.raises(ValueError):
+        server.client().similarity_search_many(
+            collection_name="docs",
+            queries=["a"],
+            top_k=1,
+            access_key="a",
+            secret_key="s",
+            executor="fiber",
+        )
@@ -0,0 +1,144 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import itertools
+import time
+from concurrent.futures import ALL_COMPLETED
+
+import httpx
+import pytest
+
+from pydi_client.api import hedging as hedging_module
+from pydi_client.api.hedging import HedgingPolicy
+from conftest import search
+
+
+def test_slow_request_is_hedged(server):
+    calls = itertools.count()
+    # only the very first search is slow
+    server.latency = lambda method, path: 1.0 if next(calls) == 0 else 0.0
+    hedging = HedgingPolicy(initial_delay=0.02)
+    client = server.client()
+
+    start = time.perf_counter()
+    assert len(search(client, hedging=hedging)) == 2
+    assert time.perf_counter() - start < 0.5
+    assert (hedging.requests, hedging.hedged, hedging.hedge_wins) == (1, 1, 1)
+    hedging.close()
+
+
+def test_fast_request_is_not_hedged(server):
+    hedging = HedgingPolicy(initial_delay=0.5)
+    search(server.client(), hedging=hedging)
+    assert hedging.hedged == 0
+    assert server.request_count[("POST", "/similaritySearch")] == 1
+
+
+def test_budget_caps_hedges(server):
+    server.latency = 0.02
+    hedging = HedgingPolicy(initial_delay=0.001, budget=0.1, max_burst=1)
+    client = server.client()
+    for _ in range(20):
+        search(client, hedging=hedging)
+    # one hedge to start with, then one per ten requests
+    assert hedging.requests == 20
+    assert hedging.hedged == 2
+
+
+def test_delay_follows_observed_percentile():
+    hedging = HedgingPolicy(percentile=90, initial_delay=1.0, min_samples=10)
+    assert hedging.delay() == 1.0
+    for latency in range(1, 101):
+        hedging.record(latency / 1000)
+    assert hedging.delay() == pytest.approx(0.09)
+
+
+def test_failed_attempt_does_not_win():
+    calls = itertools.count()
+
+    def send():
+        if next(calls) == 0:
+            # the first attempt fails while the hedge is still in flight
+            time.sleep(0.05)
+            raise httpx.ConnectError("connection reset")
+        time.sleep(0.1)
+        return httpx.Response(200)
+
+    hedging = HedgingPolicy(initial_delay=0.01)
+    assert hedging.execute(send).status_code == 200
+    assert hedging.hedge_wins == 1
+
+
+def test_success_wins_when_attempts_complete_together(monkeypatch):
+    wait = hedging_module.wait
+
+    def wait_for_all(attempts, timeout=None, return_when=ALL_COMPLETED):
+        if timeout is None:
+            # both attempts complete before the policy looks at them
+            return wait(attempts, return_when=ALL_COMPLETED)
+        return wait(attempts, timeout=timeout, return_when=return_when)
+
+    monkeypatch.setattr(hedging_module, "wait", wait_for_all)
+    calls = itertools.count()
+
+    def send():
+        if next(calls) == 0:
+            time.sleep(0.05)
+            raise httpx.ConnectError("connection reset")
+        return httpx.Response(200)
+
+    hedging = HedgingPolicy(initial_delay=0.01)
+    assert hedging.execute(send).status_code == 200
+    assert hedging.hedge_wins == 1
+
+
+def test_retryable_status_does_not_win():
+    calls = itertools.count()
+    responses = []
+
+    def send():
+        if next(calls) == 0:
+            time.sleep(0.05)
+            response = httpx.Response(503, stream=httpx.ByteStream(b"busy"))
+        else:
+            time.sleep(0.1)
+            response = httpx.Response(200)
+        responses.append(response)
+        return response
+
+    hedging = HedgingPolicy(initial_delay=0.01)
+    assert hedging.execute(send).status_code == 200
+    assert hedging.hedge_wins == 1
+    # the discarded response is closed
+    assert responses[0].is_closed
+
+
+def test_error_status_is_returned_when_every_attempt_fails():
+    calls = itertools.count()
+
+    def send():
+        if next(calls) == 0:
+            time.sleep(0.02)
+            raise httpx.ConnectError("connection reset")
+        return httpx.Response(503)
+
+    hedging = HedgingPolicy(initial_delay=0.001)
+    assert hedging.execute(send).status_code == 503
+    assert hedging.hedge_wins == 0
+
+
+def test_error_is_raised_when_every_attempt_fails():
+    def send():
+        time.sleep(0.02)
+        raise httpx.ConnectError("connection refused")
+
+    hedging = HedgingPolicy(initial_delay=0.001)
+    with pytest.raises(httpx.ConnectError):
+        hedging.execute(send)
+    assert hedging.hedged == 1
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=100)
+    with pytest.raises(ValueError):
+        HedgingPolicy(budget=-1)
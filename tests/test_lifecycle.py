@@ -0,0 +1,158 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import gc
+import os
+import pickle
+import threading
+import time
+
+import httpx
+import pytest
+
+from pydi_client.di_client import DIAdminClient, DIClient
+from pydi_client.sessions.session import Session
+
+
+class _ClosingTransport(httpx.MockTransport):
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _open_sockets():
+    return sum(
+        os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        for fd in os.listdir("/proc/self/fd")
+        if os.path.exists(f"/proc/self/fd/{fd}")
+    )
+
+
+def test_session_context_manager_closes_client():
+    with Session(uri="http://example.com") as session:
+        client = session.get_httpx_client()
+    assert client.is_closed
+    assert session._client is None
+    # the session stays usable
+    assert not session.get_httpx_client().is_closed
+
+
+def test_caller_transport_is_not_closed(server):
+    transport = _ClosingTransport(server.handle_request)
+    with DIClient(uri=server.uri, httpx_args={"transport": transport}) as client:
+        client.get_all_collections()
+    assert transport.closed is False
+
+
+def test_set_httpx_client_closes_previous_client():
+    session = Session(uri="http://example.com")
+    client = session.get_httpx_client()
+    session.set_httpx_client(httpx.Client())
+    assert client.is_closed
+
+
+def test_caller_client_is_not_closed():
+    session = Session(uri="http://example.com")
+    caller_client = httpx.Client()
+    session.set_httpx_client(caller_client)
+
+    # neither replacing nor closing the session closes the client of the caller
+    session.set_httpx_client(httpx.Client())
+    assert not caller_client.is_closed
+    session.set_httpx_client(caller_client)
+    session.close()
+    assert not caller_client.is_closed
+    # the session builds and owns its next client again
+    built = session.get_httpx_client()
+    session.close()
+    assert built.is_closed
+    caller_client.close()
+
+
+def test_unpickled_session_owns_its_new_client():
+    session = Session(uri="http://example.com").set_httpx_client(httpx.Client())
+
+    copy = pickle.loads(pickle.dumps(session))
+
+    client = copy.get_httpx_client()
+    copy.close()
+    assert client.is_closed
+
+
+def test_admin_client_closes_both_sessions(server):
+    with server.serve() as uri:
+        with DIAdminClient(uri=uri, username="admin", password="admin") as admin:
+            admin.get_all_collections()
+            admin.get_all_schemas()
+            clients = (
+                admin.session.get_httpx_client(),
+                admin.authenticated_session.get_httpx_client(),
+            )
+    assert all(client.is_closed for client in clients)
+
+
+def _blocked_request(server):
+    started, release = threading.Event(), threading.Event()
+
+    def handle(request):
+        started.set()
+        release.wait(5)
+        return server.handle_request(request)
+
+    client = DIClient(
+        uri=server.uri, httpx_args={"transport": httpx.MockTransport(handle)}
+    )
+    thread = threading.Thread(target=client.get_all_collections)
+    thread.start()
+    assert started.wait(5)
+    return client, thread, release
+
+
+def test_close_drains_requests_in_flight(server):
+    client, thread, release = _blocked_request(server)
+    closed = threading.Event()
+    closer = threading.Thread(target=lambda: (client.close(), closed.set()))
+    closer.start()
+
+    assert not closed.wait(0.1)
+    release.set()
+    assert closed.wait(5)
+    thread.join()
+    closer.join()
+
+
+def test_close_gives_up_after_timeout(server):
+    client, thread, release = _blocked_request(server)
+    start = time.monotonic()
+    client.close(timeout=0.05)
+    assert time.monotonic() - start < 1
+    release.set()
+    thread.join()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_no_sockets_leak_over_refresh_cycles(server):
+    with server.serve() as uri:
+        # warm up, so lazily opened resources are not counted
+        with DIAdminClient(uri=uri, username="admin", password="admin") as admin:
+            admin.get_all_schemas()
+        time.sleep(0.1)
+        before = _open_sockets()
+
+        gc.disable()
+        try:
+            for _ in range(10):
+                with DIAdminClient(
+                    uri=uri, username="admin", password="admin"
+                ) as admin:
+                    for _ in range(5):
+                        admin.get_all_schemas()
+                        server.expire_tokens()
+                    admin.get_all_schemas()
+            # server side connections close once the client closed its end
+            deadline = time.monotonic() + 5
+            while _open_sockets() > before and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert _open_sockets() <= before
+        finally:
+            gc.enable()
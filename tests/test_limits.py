@@ -0,0 +1,176 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from pydi_client.sessions.limits import (
+    AIMDLimiter,
+    OperationLimiter,
+    RateLimitingTransport,
+    RateLimits,
+    TokenBucket,
+    operation_class,
+)
+from conftest import search
+
+
+def test_operation_classes():
+    assert (
+        operation_class(httpx.Request("POST", "http://x/api/v1/similaritySearch"))
+        == "search"
+    )
+    assert (
+        operation_class(httpx.Request("GET", "http://x/api/v1/collections"))
+        == "metadata"
+    )
+    assert (
+        operation_class(httpx.Request("DELETE", "http://x/api/v1/collections/c"))
+        == "admin"
+    )
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=100, burst=5)
+    start = time.perf_counter()
+    for _ in range(15):
+        bucket.acquire()
+    # the burst is free, the next 10 tokens take 0.1s
+    assert 0.08 <= time.perf_counter() - start < 0.3
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=1000, burst=1)
+    bucket.pause(0.05)
+    assert bucket.acquire() >= 0.04
+
+
+def test_aimd_decreases_on_overload_and_grows_on_success():
+    limiter = AIMDLimiter(initial_limit=8, max_limit=10, latency_tolerance=100)
+    limiter.acquire()
+    limiter.release(0.01, overloaded=True)
+    assert limiter.limit == 4
+    # a second overload within the same latency does not shrink the limit again
+    limiter.acquire()
+    limiter.release(1.0, overloaded=True)
+    assert limiter.limit == 4
+
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release(0.01, overloaded=False)
+    assert limiter.limit == 10
+
+
+def test_aimd_decreases_on_latency_growth():
+    limiter = AIMDLimiter(initial_limit=16, latency_tolerance=2.0)
+    for latency in (0.01, 0.012, 0.05):
+        limiter.acquire()
+        limiter.release(latency, overloaded=False)
+    assert limiter.limit == 8
+
+
+def test_aimd_blocks_above_limit():
+    limiter = AIMDLimiter(initial_limit=2, min_limit=2, max_limit=2)
+    limiter.acquire()
+    limiter.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(0.01, overloaded=False)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_aimd_acquire_times_out():
+    limiter = AIMDLimiter(initial_limit=1, min_limit=1, max_limit=1)
+    limiter.acquire()
+    with pytest.raises(TimeoutError):
+        limiter.acquire(timeout=0.01)
+    assert limiter.in_flight == 1
+
+
+def test_token_bucket_acquire_times_out():
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.acquire()
+    with pytest.raises(TimeoutError):
+        bucket.acquire(timeout=0.01)
+
+
+def test_slot_is_held_until_the_response_is_closed():
+    limits = RateLimits(search=OperationLimiter(max_concurrency=1))
+    limiter = limits.limiters["search"].concurrency
+    transport = RateLimitingTransport(
+        limits=limits,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, stream=httpx.ByteStream(b"[]"))
+        ),
+    )
+    # a request waits for a slot for at most the pool timeout
+    client = httpx.Client(
+        base_url="http://di.local",
+        transport=transport,
+        timeout=httpx.Timeout(5.0, pool=0.01),
+    )
+
+    with client.stream("POST", "/api/v1/similaritySearch"):
+        assert limiter.in_flight == 1
+        with pytest.raises(httpx.PoolTimeout):
+            client.post("/api/v1/similaritySearch")
+    assert limiter.in_flight == 0
+
+    assert client.post("/api/v1/similaritySearch").json() == []
+    assert limiter.in_flight == 0
+
+
+def test_concurrency_is_limited_per_operation_class(server):
+    in_flight = []
+    lock = threading.Lock()
+    current = [0]
+
+    def latency(method, path):
+        with lock:
+            current[0] += 1
+            in_flight.append(current[0])
+        time.sleep(0.01)
+        with lock:
+            current[0] -= 1
+        return 0
+
+    server.latency = latency
+    limits = RateLimits(search=OperationLimiter(max_concurrency=2))
+    client = server.client(limits=limits)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: search(client, top_k=1), range(16)))
+    assert max(in_flight) == 2
+
+    # metadata requests are not limited
+    in_flight.clear()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: client.get_all_collections(), range(16)))
+    assert max(in_flight) > 2
+
+
+def test_adaptive_limit_shrinks_on_429(server):
+    limits = RateLimits(
+        search=OperationLimiter(rate=1000, adaptive=True, initial_limit=8)
+    )
+    client = server.client(limits=limits)
+    server.fail_next(429, path="/api/v1/similaritySearch")
+    with pytest.raises(Exception):
+        search(client, top_k=1)
+    assert limits.limiters["search"].concurrency.limit == 4
+
+
+def test_limits_are_shared_by_admin_sessions(server):
+    limits = RateLimits(admin=OperationLimiter(rate=1000))
+    client = server.admin_client(limits=limits)
+    assert client.session.limits is limits
+    assert client.authenticated_session.limits is limits
+    client.create_pipeline(
+        name="p2", pipeline_type="rag", event_filter_object_suffix=["*.txt"]
+    )
+    assert "p2" in server.pipelines
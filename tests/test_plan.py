@@ -0,0 +1,176 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import pytest
+
+from pydi_client.data.plan import CollectionSpec, DesiredState, PipelineSpec
+from pydi_client.testing import FakeDIServer
+from conftest import make_server
+
+
+RAG = {
+    "name": "rag-pipeline",
+    "pipeline_type": "rag",
+    "model": "embedding-model",
+    "event_filter_object_suffix": ["*"],
+}
+
+
+@pytest.fixture
+def server():
+    return make_server(buckets=["a", "b"])
+
+
+def test_plan_from_scratch_and_apply():
+    server = FakeDIServer()
+    admin = server.admin_client()
+    desired = DesiredState(
+        pipelines=[PipelineSpec(**RAG)],
+        collections=[
+            CollectionSpec(name="docs", pipeline="rag-pipeline", buckets=["a", "b"]),
+            CollectionSpec(name="empty", pipeline="rag-pipeline"),
+        ],
+    )
+
+    plan = admin.plan(desired)
+    assert [spec.name for spec in plan.create_pipelines] == ["rag-pipeline"]
+    assert [spec.name for spec in plan.create_collections] == ["docs", "empty"]
+    assert plan.assign_buckets == {"docs": ["a", "b"]}
+    assert not plan.delete_collections and not plan.delete_pipelines
+
+    result = admin.apply(plan)
+    assert result.success
+    assert result.applied == [
+        "create pipeline rag-pipeline",
+        "create collection docs",
+        "create collection empty",
+        "update buckets of collection docs",
+    ]
+    assert server.collections["docs"]["buckets"] == ["a", "b"]
+    assert server.pipelines["rag-pipeline"]["model"] == "embedding-model"
+    assert admin.plan(desired).empty
+
+
+def test_bucket_changes(server):
+    admin = server.admin_client()
+    desired = {
+        "pipelines": [RAG],
+        "collections": [
+            {"name": "docs", "pipeline": "rag-pipeline", "buckets": ["b", "c"]}
+        ],
+    }
+
+    plan = admin.plan(desired)
+    assert (plan.assign_buckets, plan.unassign_buckets) == (
+        {"docs": ["c"]},
+        {"docs": ["a"]},
+    )
+    assert not plan.create_pipelines and not plan.create_collections
+
+    assert admin.apply(plan).success
+    assert server.collections["docs"]["buckets"] == ["b", "c"]
+
+
+def test_unmanaged_buckets_are_kept(server):
+    plan = server.admin_client().plan(
+        {"collections": [{"name": "docs", "pipeline": "rag-pipeline"}]}
+    )
+    assert plan.empty
+
+
+def test_changed_pipeline_is_replaced_with_its_collections(server):
+    server.add_collection(name="other", pipeline="rag-pipeline", buckets=["x"])
+    admin = server.admin_client()
+    desired = {
+        "pipelines": [{**RAG, "event_filter_object_suffix": ["*.pdf"]}],
+        "collections": [{"name": "docs", "pipeline": "rag-pipeline", "buckets": ["a"]}],
+    }
+
+    plan = admin.plan(desired)
+    assert plan.delete_pipelines == ["rag-pipeline"]
+    assert sorted(plan.delete_collections) == ["docs", "other"]
+    assert sorted(spec.name for spec in plan.create_collections) == ["docs", "other"]
+    assert plan.assign_buckets == {"docs": ["a"], "other": ["x"]}
+
+    assert admin.apply(plan).success
+    assert server.pipelines["rag-pipeline"]["eventFilter"]["objectSuffix"] == ["*.pdf"]
+    assert server.collections["docs"]["buckets"] == ["a"]
+    assert server.collections["other"]["buckets"] == ["x"]
+    assert admin.plan(desired).empty
+
+
+def test_settings_left_unset_are_not_compared():
+    server = FakeDIServer()
+    server.add_pipeline(
+        name="rag-pipeline",
+        custom_func="chunker",
+        event_filter={"objectSuffix": ["*"], "maxObjectSize": 10**6},
+    )
+    # the server chose the maximum object size, the schema and the custom function
+    plan = server.admin_client().plan({"pipelines": [RAG]})
+    assert plan.empty
+
+    plan = server.admin_client().plan(
+        {"pipelines": [{**RAG, "event_filter_max_object_size": 1000}]}
+    )
+    assert plan.delete_pipelines == ["rag-pipeline"]
+
+
+def test_collection_moved_to_another_pipeline(server):
+    admin = server.admin_client()
+    desired = {
+        "pipelines": [RAG, {**RAG, "name": "new-pipeline"}],
+        "collections": [{"name": "docs", "pipeline": "new-pipeline"}],
+    }
+    plan = admin.plan(desired)
+    assert plan.delete_collections == ["docs"]
+    assert plan.delete_pipelines == []
+    # unmanaged buckets follow the recreated collection
+    assert plan.assign_buckets == {"docs": ["a", "b"]}
+
+    assert admin.apply(plan).success
+    assert server.collections["docs"]["pipeline"] == "new-pipeline"
+    assert server.collections["docs"]["buckets"] == ["a", "b"]
+
+
+def test_prune(server):
+    server.add_pipeline(name="unused")
+    server.add_collection(name="stale", pipeline="unused")
+    admin = server.admin_client()
+    desired = {"collections": [{"name": "docs", "pipeline": "rag-pipeline"}]}
+
+    assert admin.plan(desired).empty
+    plan = admin.plan(desired, prune=True)
+    assert plan.delete_collections == ["stale"]
+    # pipelines used by desired collections are kept
+    assert plan.delete_pipelines == ["unused"]
+
+    assert admin.apply(plan).success
+    assert set(server.pipelines) == {"rag-pipeline"}
+    assert set(server.collections) == {"docs"}
+
+
+def test_unknown_pipeline(server):
+    with pytest.raises(ValueError):
+        server.admin_client().plan(
+            {"collections": [{"name": "docs", "pipeline": "missing"}]}
+        )
+
+
+def test_apply_stops_after_a_failed_step():
+    server = FakeDIServer()
+    admin = server.admin_client()
+    plan = admin.plan(
+        {
+            "pipelines": [RAG],
+            "collections": [{"name": "docs", "pipeline": "rag-pipeline"}],
+        }
+    )
+    server.fail_next(500, path="/api/v1/pipelines")
+
+    result = admin.apply(plan)
+
+    assert not result.success
+    assert list(result.failed) == ["create pipeline rag-pipeline"]
+    assert "500" in result.failed["create pipeline rag-pipeline"]
+    assert result.applied == []
+    assert server.collections == {}
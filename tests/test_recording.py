@@ -0,0 +1,128 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import gzip
+import json
+import time
+
+import pytest
+
+from pydi_client.di_client import DIAdminClient, DIClient
+from pydi_client.errors import ReplayMissException
+from pydi_client.testing import RecordingTransport, ReplayTransport, recording
+from conftest import CREDENTIALS, search
+
+
+def _record(server, path):
+    transport = RecordingTransport(str(path), transport=server.transport())
+    client = DIClient(uri=server.uri, httpx_args={"transport": transport})
+    results = [search(client, "first"), search(client, "second")]
+    names = [item.name for item in client.get_all_collections().root]
+    client.session.get_httpx_client().close()
+    return results, names
+
+
+def test_record_and_replay(server, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorded_results, recorded_names = _record(server, path)
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3
+    assert CREDENTIALS["secret_key"] not in path.read_text()
+    assert json.loads(lines[0])["request"]["credentials"] == "***"
+
+    replay = ReplayTransport(str(path), time_scale=0)
+    client = DIClient(uri=server.uri, httpx_args={"transport": replay})
+
+    assert search(client, "second") == recorded_results[1]
+    assert search(client, "first") == recorded_results[0]
+    assert [item.name for item in client.get_all_collections().root] == recorded_names
+
+
+def test_replay_miss(server, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    _record(server, path)
+
+    client = DIClient(
+        uri=server.uri,
+        httpx_args={"transport": ReplayTransport(str(path), cycle=False)},
+    )
+    with pytest.raises(ReplayMissException):
+        search(client, "never recorded")
+
+    search(client, "first")
+    with pytest.raises(ReplayMissException):
+        search(client, "first")
+
+
+def test_replay_timing_is_scaled(server, tmp_path):
+    server.latency = 0.05
+    path = tmp_path / "traffic.jsonl.gz"
+    _record(server, path)
+
+    with gzip.open(path, "rt") as f:
+        assert len(f.readlines()) == 3
+
+    for time_scale, check in ((0, lambda t: t < 0.05), (1.0, lambda t: t >= 0.05)):
+        client = DIClient(
+            uri=server.uri,
+            httpx_args={"transport": ReplayTransport(str(path), time_scale=time_scale)},
+        )
+        start = time.perf_counter()
+        search(client, "first")
+        assert check(time.perf_counter() - start)
+
+
+def test_login_token_is_redacted(server, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    transport = RecordingTransport(str(path), transport=server.transport())
+    client = DIAdminClient(
+        uri=server.uri,
+        username=server.username,
+        password=server.password,
+        httpx_args={"transport": transport},
+    )
+    client.get_all_schemas()
+    transport.close()
+
+    content = path.read_text()
+    assert server.password not in content
+    assert client.authenticated_session.token.split()[-1] not in content
+
+    replay = ReplayTransport(str(path), time_scale=0)
+    replayed = DIAdminClient(
+        uri=server.uri,
+        username=server.username,
+        password=server.password,
+        httpx_args={"transport": replay},
+    )
+    assert replayed.get_all_schemas().schemas[0].name == "default-schema"
+
+
+def test_replay_pace(server, tmp_path, monkeypatch):
+    path = tmp_path / "traffic.jsonl"
+    _record(server, path)
+    # the second search was recorded 5 seconds after the first one
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    for entry, offset in zip(entries, (10.0, 15.0, 15.5)):
+        entry["t"], entry["elapsed"] = offset, 0.0
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+    delays = []
+    monkeypatch.setattr(recording.time, "sleep", delays.append)
+
+    client = DIClient(
+        uri=server.uri,
+        httpx_args={"transport": ReplayTransport(str(path), time_scale=0.5)},
+    )
+    search(client, "first")
+    search(client, "second")
+    assert delays == []
+
+    replay = ReplayTransport(str(path), time_scale=0.5, pace=True)
+    client = DIClient(uri=server.uri, httpx_args={"transport": replay})
+    search(client, "first")
+    search(client, "second")
+    assert delays == [pytest.approx(2.5, abs=0.5)]
+
+    # responses served again by cycling the recording are not paced
+    search(client, "second")
+    assert len(delays) == 1
@@ -0,0 +1,107 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import math
+
+import pytest
+
+from pydi_client.api.context import assemble_context
+from pydi_client.api.rerank import LexicalReranker, tokenize
+from pydi_client.data.pipeline import SearchHit
+from conftest import make_server
+
+
+TEXTS = [
+    "Vector databases index embeddings for similarity search.",
+    "The error code E1234 means the bucket is not assigned.",
+    "Similarity search returns the top k chunks.",
+    "Error E1234: bucket not assigned to the collection, error E1234 again.",
+]
+
+
+def _results(texts=TEXTS):
+    return [
+        {"score": round(1.0 - index / 10, 2), "dataChunk": text, "chunkMetadata": {}}
+        for index, text in enumerate(texts)
+    ]
+
+
+def test_tokenize():
+    assert tokenize("Error E1234: bucket-1") == ["error", "e1234", "bucket", "1"]
+
+
+def test_bm25_scores():
+    scores = LexicalReranker().scores("e1234 bucket", TEXTS)
+
+    lengths = [len(tokenize(text)) for text in TEXTS]
+    average = sum(lengths) / len(lengths)
+    idf = math.log1p((4 - 2 + 0.5) / (2 + 0.5))
+
+    def term(tf, length):
+        return idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * length / average))
+
+    assert scores[0] == scores[2] == 0.0
+    assert scores[1] == pytest.approx(term(1, lengths[1]) * 2)
+    assert scores[3] == pytest.approx(term(2, lengths[3]) + term(1, lengths[3]))
+
+
+def test_exact_matches_move_up():
+    results = _results()
+
+    reranked = LexicalReranker(weight=2).rerank("error E1234", results)
+
+    assert [result["dataChunk"] for result in reranked] == [
+        TEXTS[3],
+        TEXTS[1],
+        TEXTS[0],
+        TEXTS[2],
+    ]
+    # with equal weights, the first DI result keeps its place
+    assert LexicalReranker().rerank("error E1234", results)[0] == results[0]
+    assert LexicalReranker(weight=0).rerank("error E1234", results) == results
+    # without any query term in the chunks, the DI order is kept
+    assert LexicalReranker().rerank("unrelated", results) == results
+
+
+def test_hits_are_reranked_like_dictionaries():
+    results = _results()
+    hits = [SearchHit.from_result(result) for result in results]
+
+    reranked = LexicalReranker(method="tfidf").rerank("error E1234", hits)
+
+    assert [hit.to_dict() for hit in reranked] == LexicalReranker(
+        method="tfidf"
+    ).rerank("error E1234", results)
+
+
+def test_empty_inputs():
+    assert LexicalReranker().rerank("query", []) == []
+    assert LexicalReranker().scores("", TEXTS) == [0.0] * len(TEXTS)
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        LexicalReranker(method="bm42")
+
+
+def test_assembled_passages_follow_the_reranked_order():
+    reranked = LexicalReranker(weight=2).rerank("error E1234", _results())
+
+    passages = assemble_context(reranked, ranked=True)
+
+    assert [passage.text for passage in passages] == [
+        result["dataChunk"] for result in reranked
+    ]
+    assert passages[0].score == 0.7
+
+
+def test_similarity_search_rerank():
+    server = make_server()
+    client = server.client()
+    kwargs = dict(
+        collection_name="docs", query="q", top_k=20, access_key="ak", secret_key="sk"
+    )
+
+    reranked = client.similarity_search(rerank=LexicalReranker(), **kwargs)
+
+    # the fake server returns the same text for every chunk, the DI order is kept
+    assert reranked == client.similarity_search(**kwargs)
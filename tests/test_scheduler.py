@@ -0,0 +1,144 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from pydi_client.sessions.scheduler import (
+    RequestScheduler,
+    SchedulingTransport,
+    request_priority,
+)
+from conftest import make_server
+
+
+def _wait_queued(scheduler, count):
+    deadline = time.monotonic() + 1
+    while scheduler.queued < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def _run_queued(scheduler, priorities):
+    """Queue requests of the given priorities behind a busy slot, return the dispatch order."""
+    order = []
+
+    def request(name, priority):
+        scheduler.acquire(priority)
+        order.append(name)
+        scheduler.release()
+
+    scheduler.acquire()
+    threads = []
+    for index, priority in enumerate(priorities):
+        thread = threading.Thread(
+            target=request, args=(f"{priority}-{index}", priority)
+        )
+        thread.start()
+        threads.append(thread)
+        _wait_queued(scheduler, index + 1)
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+    return order
+
+
+def test_interactive_overtakes_queued_batch():
+    scheduler = RequestScheduler(max_in_flight=1)
+    order = _run_queued(scheduler, ["batch", "batch", "batch", "interactive"])
+    assert order == ["interactive-3", "batch-0", "batch-1", "batch-2"]
+
+
+def test_weighted_fair_share():
+    scheduler = RequestScheduler(
+        max_in_flight=1, weights={"a": 2, "b": 1}, default_priority="a"
+    )
+    order = _run_queued(scheduler, ["b"] * 4 + ["a"] * 4)
+    # while both classes wait, "a" gets two slots for every slot of "b"
+    assert [name[0] for name in order[:6]] == ["a", "b", "a", "a", "b", "a"]
+
+
+def test_max_in_flight():
+    scheduler = RequestScheduler(max_in_flight=2)
+    scheduler.acquire()
+    scheduler.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (scheduler.acquire(), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.05)
+    scheduler.release()
+    assert acquired.wait(1)
+    thread.join()
+    assert scheduler.in_flight == 2
+
+
+def test_priority_reaches_the_scheduler():
+    server = make_server()
+    scheduler = RequestScheduler()
+    client = server.client(scheduler=scheduler)
+
+    client.similarity_search(
+        collection_name="docs",
+        query="q",
+        top_k=1,
+        access_key="a",
+        secret_key="s",
+        priority="interactive",
+    )
+    with request_priority("batch"):
+        client.get_all_collections()
+    client.get_all_collections()
+
+    assert scheduler.dispatched == {"interactive": 1, "default": 1, "batch": 1}
+    assert scheduler.in_flight == 0
+
+
+def test_acquire_times_out_and_leaves_the_queue():
+    scheduler = RequestScheduler(max_in_flight=1)
+    scheduler.acquire()
+    with pytest.raises(TimeoutError):
+        scheduler.acquire("batch", timeout=0.01)
+    assert scheduler.queued == 0
+
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (scheduler.acquire(), acquired.set()))
+    thread.start()
+    scheduler.release()
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_slot_is_held_until_the_response_is_closed():
+    scheduler = RequestScheduler(max_in_flight=1)
+    transport = SchedulingTransport(
+        scheduler=scheduler,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, stream=httpx.ByteStream(b"[]"))
+        ),
+    )
+    client = httpx.Client(
+        base_url="http://di.local",
+        transport=transport,
+        timeout=httpx.Timeout(5.0, pool=0.01),
+    )
+
+    with client.stream("GET", "/api/v1/collections"):
+        assert scheduler.in_flight == 1
+        with pytest.raises(httpx.PoolTimeout):
+            client.get("/api/v1/collections")
+    assert scheduler.in_flight == 0
+
+    assert client.get("/api/v1/collections").json() == []
+    assert scheduler.in_flight == 0
+
+
+def test_invalid_priority():
+    scheduler = RequestScheduler()
+    with pytest.raises(ValueError):
+        scheduler.acquire("urgent")
+    with pytest.raises(ValueError):
+        RequestScheduler(weights={"a": 1})
+    with pytest.raises(ValueError):
+        RequestScheduler(max_in_flight=0)
@@ -4,10 +4,15 @@ import pytest
 import httpx
 from httpx import Response as HTTPXResponse
 from http import HTTPStatus
+import dataclasses
+import pickle
+
 from pydi_client.api.search import SimilaritySearchAPI
-from pydi_client.errors import SimilaritySearchFailureException
+from pydi_client.data.pipeline import SearchHit
+from pydi_client.errors import SimilaritySearchFailureException, UnexpectedResponse
 
 from pydi_client.sessions.session import Session
+from conftest import make_server
 
 
 @pytest.fixture
@@ -23,13 +28,16 @@ def similarity_search_api(mock_session):
 
 def test_search_success(mocker, mock_session, similarity_search_api):
 
-    mock_response = mocker.MagicMock()
-    mock_response.status_code = HTTPStatus.OK
-    mock_response.json.return_value = {
-        "success": True,
-        "message": "Similarity search completed successfully.",
-        "results": [{"score": 0.9, "dataChunk": "example_data", "chunkMetadata": {}}],
-    }
+    mock_response = HTTPXResponse(
+        status_code=HTTPStatus.OK,
+        json={
+            "success": True,
+            "message": "Similarity search completed successfully.",
+            "results": [
+                {"score": 0.9, "dataChunk": "example_data", "chunkMetadata": {}}
+            ],
+        },
+    )
 
     # Mock execute_with_retry
     mock_execute_with_retry = mocker.patch(
@@ -58,9 +66,9 @@ def test_search_success(mocker, mock_session, similarity_search_api):
 
 def test_search_failure(mocker, mock_session, similarity_search_api):
 
-    mock_response = mocker.MagicMock()
-    mock_response.status_code = HTTPStatus.BAD_REQUEST
-    mock_response.text = "Bad Request"
+    mock_response = HTTPXResponse(
+        status_code=HTTPStatus.BAD_REQUEST, content=b"Bad Request"
+    )
 
     # Mock execute_with_retry
     mock_execute_with_retry = mocker.patch(
@@ -105,12 +113,10 @@ def test_search_invalid_parameters(mock_session, similarity_search_api):
 
 def test_search_no_results(mocker, similarity_search_api):
     # Mock response without "results"
-    mock_response = mocker.MagicMock()
-    mock_response.status_code = HTTPStatus.OK
-    mock_response.json.return_value = {
-        "success": True,
-        "message": "No results found",
-    }
+    mock_response = HTTPXResponse(
+        status_code=HTTPStatus.OK,
+        json={"success": True, "message": "No results found"},
+    )
 
     # Mock execute_with_retry to return the mock response
     mocker.patch(
@@ -129,3 +135,239 @@ def test_search_no_results(mocker, similarity_search_api):
 
     # Assert that the result is an empty list
     assert result == []
+
+
+def _shard_search(shards, calls):
+    def search(*, collection_name, top_k, **kwargs):
+        calls.append((collection_name, top_k))
+        return [
+            {
+                "score": score,
+                "dataChunk": f"{collection_name}-{score}",
+                "chunkMetadata": {},
+            }
+            for score in shards[collection_name][:top_k]
+        ]
+
+    return search
+
+
+def test_search_federated_merges_top_k(mocker, similarity_search_api):
+    shards = {
+        "c1": [0.9, 0.5, 0.4, 0.1],
+        "c2": [0.8, 0.7, 0.3],
+        "c3": [0.6, 0.2],
+    }
+    calls = []
+    mocker.patch.object(
+        similarity_search_api, "search", side_effect=_shard_search(shards, calls)
+    )
+
+    result = similarity_search_api.search_federated(
+        collection_names=["c1", "c2", "c3"],
+        query="q",
+        top_k=4,
+        access_key="ak",
+        secret_key="sk",
+        overfetch=1.0,
+    )
+
+    assert [r["score"] for r in result] == [0.9, 0.8, 0.7, 0.6]
+    assert [r["collectionName"] for r in result] == ["c1", "c2", "c2", "c3"]
+    # the first round asks every shard for ceil(4 / 3) = 2 results and the k-th score
+    # is 0.6. Only c2 (lowest returned score 0.7) can still beat it and is queried again
+    assert sorted(calls) == [("c1", 2), ("c2", 2), ("c2", 4), ("c3", 2)]
+
+
+def test_search_federated_matches_exhaustive_search(mocker, similarity_search_api):
+    shards = {
+        "c1": [0.99, 0.98, 0.97, 0.96, 0.95, 0.94],
+        "c2": [0.5, 0.4],
+        "c3": [],
+    }
+    calls = []
+    mocker.patch.object(
+        similarity_search_api, "search", side_effect=_shard_search(shards, calls)
+    )
+
+    result = similarity_search_api.search_federated(
+        collection_names=["c1", "c2", "c3"],
+        query="q",
+        top_k=5,
+        access_key="ak",
+        secret_key="sk",
+    )
+
+    # all results come from the skewed shard, which is queried again for the full top_k
+    assert [r["score"] for r in result] == [0.99, 0.98, 0.97, 0.96, 0.95]
+    assert ("c1", 5) in calls
+    assert ("c2", 5) not in calls
+
+
+def test_search_federated_empty(similarity_search_api):
+    assert (
+        similarity_search_api.search_federated(
+            collection_names=[], query="q", top_k=5, access_key="ak", secret_key="sk"
+        )
+        == []
+    )
+
+
+def test_search_federated_propagates_errors(mocker, similarity_search_api):
+    mocker.patch.object(
+        similarity_search_api,
+        "search",
+        side_effect=SimilaritySearchFailureException("boom"),
+    )
+    with pytest.raises(SimilaritySearchFailureException):
+        similarity_search_api.search_federated(
+            collection_names=["c1", "c2"],
+            query="q",
+            top_k=5,
+            access_key="ak",
+            secret_key="sk",
+        )
+
+
+@pytest.fixture
+def fake_server():
+    return make_server(buckets=["b1", "b2"])
+
+
+def test_search_hits_match_dicts(fake_server):
+    client = fake_server.client()
+    kwargs = dict(
+        collection_name="docs", query="q", top_k=20, access_key="ak", secret_key="sk"
+    )
+
+    results = client.similarity_search(**kwargs)
+    hits = client.similarity_search(result_type="hit", **kwargs)
+
+    assert all(isinstance(hit, SearchHit) for hit in hits)
+    assert [hit.to_dict() for hit in hits] == results
+    assert hits[0].bucketName == "b1" and hits[0].startCharIndex == 0
+    # repeated bucket names and object keys share one string
+    assert hits[0].bucketName is hits[2].bucketName
+    assert hits[0].objectKey is hits[1].objectKey
+    assert not hasattr(hits[0], "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        hits[0].score = 1.0
+    assert pickle.loads(pickle.dumps(hits[0])) == hits[0]
+
+
+def test_search_many_hits(fake_server):
+    results = fake_server.client().similarity_search_many(
+        collection_name="docs",
+        queries=["a", "b"],
+        top_k=3,
+        access_key="ak",
+        secret_key="sk",
+        result_type="hit",
+    )
+    assert [len(hits) for hits in results] == [3, 3]
+    assert isinstance(results[1][0], SearchHit)
+
+
+def test_search_hit_extra_metadata():
+    hit = SearchHit.from_result(
+        {
+            "score": 1,
+            "dataChunk": "text",
+            "chunkMetadata": {"objectKey": "k", "startCharIndex": "3", "lang": "en"},
+        }
+    )
+    assert (hit.score, hit.startCharIndex, hit.bucketName) == (1.0, 3, None)
+    assert hit.extraMetadata == {"lang": "en"}
+    assert hit.chunkMetadata == {"objectKey": "k", "startCharIndex": 3, "lang": "en"}
+    assert SearchHit.from_result({"score": 0.5, "dataChunk": ""}).chunkMetadata == {}
+
+
+def test_search_hits_malformed_response(mocker, similarity_search_api):
+    response = httpx.Response(
+        HTTPStatus.OK,
+        json={"success": True, "message": "", "results": [{"dataChunk": "no score"}]},
+    )
+    mocker.patch("pydi_client.api.search.execute_with_retry", return_value=response)
+
+    with pytest.raises(UnexpectedResponse):
+        similarity_search_api.search(
+            collection_name="c",
+            query="q",
+            top_k=1,
+            access_key="ak",
+            secret_key="sk",
+            result_type="hit",
+        )
+
+
+def test_search_unknown_result_type(similarity_search_api):
+    with pytest.raises(ValueError):
+        similarity_search_api.search(
+            collection_name="c",
+            query="q",
+            top_k=1,
+            access_key="ak",
+            secret_key="sk",
+            result_type="model",
+        )
+
+
+@pytest.mark.parametrize("validation", ["strict", "lenient", "trusted"])
+@pytest.mark.parametrize("result_type", ["dict", "hit"])
+def test_search_min_score_and_max_results(fake_server, validation, result_type):
+    client = fake_server.client(validation=validation)
+    kwargs = dict(
+        collection_name="docs",
+        query="q",
+        access_key="ak",
+        secret_key="sk",
+        result_type=result_type,
+    )
+    results = client.similarity_search(top_k=100, **kwargs)
+
+    def score(result):
+        return result.score if result_type == "hit" else result["score"]
+
+    above = client.similarity_search(top_k=100, min_score=0.75, **kwargs)
+    assert above == [result for result in results if score(result) >= 0.75]
+    assert 0 < len(above) < len(results)
+    assert client.similarity_search(
+        top_k=100, max_results=10, **kwargs
+    ) == client.similarity_search(top_k=10, **kwargs)
+    assert (
+        client.similarity_search(top_k=100, min_score=0.75, max_results=1000, **kwargs)
+        == above
+    )
+
+
+def test_search_results_below_min_score_are_not_validated(
+    mocker, similarity_search_api
+):
+    response = httpx.Response(
+        HTTPStatus.OK,
+        json={
+            "success": True,
+            "message": "",
+            "results": [
+                {"score": 0.9, "dataChunk": "a"},
+                {"score": 0.4, "dataChunk": "b"},
+                {"score": 0.3},
+            ],
+        },
+    )
+    execute = mocker.patch(
+        "pydi_client.api.search.execute_with_retry", return_value=response
+    )
+
+    results = similarity_search_api.search(
+        collection_name="c",
+        query="q",
+        top_k=50,
+        access_key="ak",
+        secret_key="sk",
+        min_score=0.5,
+        max_results=20,
+    )
+
+    assert results == [{"score": 0.9, "dataChunk": "a", "chunkMetadata": {}}]
+    assert execute.call_args.kwargs["json"]["topK"] == 20
@@ -0,0 +1,191 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import gzip
+import pickle
+import tracemalloc
+import zlib
+
+import httpx
+import pytest
+
+from pydi_client.di_client import DIClient
+from pydi_client.errors import (
+    ERROR_CONTENT_SIZE,
+    ResponseTooLargeException,
+    UnexpectedStatus,
+)
+from pydi_client.sessions.compression import Compression
+from pydi_client.sessions.size_limits import ResponseSizeLimits
+from pydi_client.testing import FakeDIServer
+from conftest import make_server
+
+
+CHUNK = b"x" * 1024
+SEARCH = dict(collection_name="docs", query="q", access_key="ak", secret_key="sk")
+
+
+class EndlessStream(httpx.SyncByteStream):
+    """Body which never ends, counting the chunks read from it."""
+
+    def __init__(self):
+        self.chunks = 0
+        self.closed = False
+
+    def __iter__(self):
+        while True:
+            self.chunks += 1
+            yield CHUNK
+
+    def close(self):
+        self.closed = True
+
+
+def _client(status, size_limits, headers=None):
+    stream = EndlessStream()
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(status, headers=headers, stream=stream)
+    )
+    client = DIClient(
+        uri="http://di.example.com",
+        httpx_args={"transport": transport},
+        size_limits=size_limits,
+    )
+    return client, stream
+
+
+def test_large_response_is_aborted():
+    client, stream = _client(200, ResponseSizeLimits(metadata=10 * len(CHUNK)))
+
+    with pytest.raises(ResponseTooLargeException) as error:
+        client.get_all_collections()
+
+    assert error.value.limit == 10 * len(CHUNK)
+    assert stream.chunks == 11
+    assert stream.closed
+
+
+class GzipBombStream(EndlessStream):
+    """Endless gzip body of zeros, each chunk decoding to 16 MiB."""
+
+    def __iter__(self):
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        zeros = bytes(16 * 1024 * 1024)
+        while True:
+            self.chunks += 1
+            yield compressor.compress(zeros) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+@pytest.mark.parametrize("compression", [None, Compression(encodings=["gzip"])])
+def test_decompression_bomb_is_aborted(compression):
+    stream = GzipBombStream()
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, headers={"Content-Encoding": "gzip"}, stream=stream
+        )
+    )
+    client = DIClient(
+        uri="http://di.example.com",
+        httpx_args={"transport": transport},
+        size_limits=ResponseSizeLimits(metadata=100 * 1024),
+        compression=compression,
+    )
+
+    tracemalloc.start()
+    try:
+        with pytest.raises(ResponseTooLargeException):
+            client.get_all_collections()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # stopped while decoding the first chunk, without decoding all of it
+    assert stream.chunks == 1
+    assert stream.closed
+    # the zeros compressed by the stream take 16 MiB, the decoded body is not held at once
+    assert peak < 20 * 1024 * 1024
+
+
+def test_encoded_response_is_decoded():
+    body = gzip.compress(b'[{"name": "docs", "pipeline": "rag-pipeline"}]')
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200,
+            headers={"Content-Encoding": "gzip"},
+            stream=httpx.ByteStream(body),
+        )
+    )
+    client = DIClient(
+        uri="http://di.example.com",
+        httpx_args={"transport": transport},
+        size_limits=ResponseSizeLimits(),
+    )
+
+    assert [item.name for item in client.get_all_collections().root] == ["docs"]
+
+
+def test_announced_size_is_rejected_without_reading():
+    client, stream = _client(
+        200, ResponseSizeLimits(default=1024), headers={"Content-Length": "4096"}
+    )
+
+    with pytest.raises(ResponseTooLargeException) as error:
+        client.get_all_collections()
+
+    assert error.value.size == 4096
+    assert stream.chunks == 0
+
+
+def test_error_body_is_truncated():
+    client, stream = _client(502, ResponseSizeLimits(error=4000))
+
+    with pytest.raises(UnexpectedStatus) as error:
+        client.get_all_collections()
+
+    assert error.value.status_code == 502
+    assert error.value.content == b"x" * 4000
+    assert stream.chunks == 4
+    assert len(str(error.value)) < 3000
+
+
+def test_limits_per_operation_class():
+    server = make_server()
+    client = server.client(size_limits=ResponseSizeLimits(search=10_000, metadata=1000))
+
+    assert len(client.similarity_search(top_k=5, **SEARCH)) == 5
+    assert client.get_collection(name="docs").name == "docs"
+    with pytest.raises(ResponseTooLargeException):
+        client.similarity_search(top_k=100, **SEARCH)
+
+
+def test_in_memory_error_body_is_truncated():
+    server = FakeDIServer()
+    server.add_pipeline(name="rag-pipeline")
+    client = server.client(size_limits=ResponseSizeLimits(error=10))
+
+    with pytest.raises(UnexpectedStatus) as error:
+        client.get_collection(name="missing")
+
+    assert len(error.value.content) == 10
+
+
+def test_exceptions_truncate_the_body():
+    error = UnexpectedStatus(500, b"<html>" + b"x" * 10**6)
+
+    assert len(error.content) == ERROR_CONTENT_SIZE
+    assert str(error).endswith("more bytes]")
+    assert len(str(error)) < 3000
+
+
+def test_sessions_keep_the_limits():
+    size_limits = ResponseSizeLimits(search=10)
+    admin = FakeDIServer().admin_client(size_limits=size_limits)
+
+    assert admin.authenticated_session.size_limits is size_limits
+    session = DIClient(uri="http://di.example.com", size_limits=size_limits).session
+    restored = pickle.loads(pickle.dumps(session))
+    assert restored.size_limits.limits == size_limits.limits
+
+
+def test_negative_limit():
+    with pytest.raises(ValueError):
+        ResponseSizeLimits(error=-1)
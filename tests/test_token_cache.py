@@ -0,0 +1,149 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import base64
+import json
+import multiprocessing
+import os
+import stat
+import time
+
+import pytest
+
+from pydi_client.sessions.token_cache import TokenCache, token_expiry
+from conftest import make_server
+
+
+LOGIN = ("POST", "/login")
+
+
+def _jwt(**claims):
+    return "Bearer " + ".".join(
+        base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b"=").decode()
+        for part in ({"alg": "none"}, claims, "signature")
+    )
+
+
+@pytest.fixture
+def server():
+    return make_server(token_ttl=3600)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "tokens.json")
+
+
+def _admin(server, cache):
+    return server.admin_client(token_cache=cache)
+
+
+def test_token_expiry():
+    assert token_expiry(_jwt(exp=1234)) == 1234
+    assert token_expiry(_jwt(sub="admin")) is None
+    assert token_expiry("Bearer opaque-token") is None
+    assert token_expiry("a.!!!.c") is None
+
+
+def test_get_and_set(path):
+    cache = TokenCache(path)
+    token = _jwt(exp=time.time() + 600)
+    cache.set("http://di", "admin", token)
+
+    assert TokenCache(path).get("http://di", "admin") == token
+    assert cache.get("http://di", "other") is None
+    assert cache.get("http://other", "admin") is None
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+    cache.remove("http://di", "admin")
+    assert cache.get("http://di", "admin") is None
+
+
+def test_tokens_close_to_expiry_are_not_reused(path):
+    cache = TokenCache(path, min_ttl=60)
+    cache.set("http://di", "admin", _jwt(exp=time.time() + 30))
+    assert cache.get("http://di", "admin") is None
+
+
+def test_tokens_without_exp_are_not_cached(path):
+    cache = TokenCache(path)
+    cache.set("http://di", "admin", "Bearer opaque-token")
+    assert cache.get("http://di", "admin") is None
+    assert not os.path.exists(path)
+
+
+def test_cache_readable_by_others_is_ignored(path):
+    cache = TokenCache(path)
+    cache.set("http://di", "admin", _jwt(exp=time.time() + 600))
+    os.chmod(path, 0o644)
+    assert cache.get("http://di", "admin") is None
+
+
+def test_corrupt_cache_is_ignored(path):
+    cache = TokenCache(path)
+    cache.set("http://di", "admin", _jwt(exp=time.time() + 600))
+    with open(path, "w") as file:
+        file.write("{not json")
+    assert cache.get("http://di", "admin") is None
+
+    token = _jwt(exp=time.time() + 600)
+    cache.set("http://di", "admin", token)
+    assert cache.get("http://di", "admin") == token
+
+
+def test_admin_client_reuses_cached_token(server, path):
+    first = _admin(server, TokenCache(path))
+    # a later process
+    second = _admin(server, TokenCache(path))
+
+    second.get_all_schemas()
+    assert server.request_count[LOGIN] == 1
+    assert second.authenticated_session.token == first.authenticated_session.token
+
+
+def test_rejected_cached_token_is_replaced(server, path):
+    _admin(server, TokenCache(path))
+    server.expire_tokens()
+
+    admin = _admin(server, TokenCache(path))
+    admin.get_all_schemas()
+
+    assert server.request_count[LOGIN] == 2
+    assert (
+        TokenCache(path).get(server.uri, "admin") == admin.authenticated_session.token
+    )
+
+
+def test_refresh_uses_token_cached_by_another_process(server, path):
+    first = _admin(server, TokenCache(path))
+    second = _admin(server, TokenCache(path))
+    server.expire_tokens()
+
+    first.get_all_schemas()
+    second.get_all_schemas()
+
+    assert server.request_count[LOGIN] == 2
+    assert second.authenticated_session.token == first.authenticated_session.token
+
+
+def _cache_tokens(path, index):
+    cache = TokenCache(path)
+    for iteration in range(20):
+        cache.set("http://di", f"user{index}", _jwt(exp=time.time() + 600, n=iteration))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_concurrent_processes_do_not_lose_updates(path):
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_cache_tokens, args=(path, index)) for index in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+
+    cache = TokenCache(path)
+    assert all(cache.get("http://di", f"user{index}") for index in range(4))
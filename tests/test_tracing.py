@@ -0,0 +1,192 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import pytest
+import httpx
+from http import HTTPStatus
+
+from pydi_client import tracing
+from pydi_client.api.search import SimilaritySearchAPI
+from pydi_client.sessions.session import Session
+from conftest import make_server
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    # a provider of its own for every test, the global tracer provider is left untouched
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(
+        trace, "get_tracer", lambda name, *args, **kwargs: provider.get_tracer(name)
+    )
+    yield exporter
+    provider.shutdown()
+
+
+def test_search_records_spans(mocker, exporter):
+    mock_session = mocker.MagicMock(spec=Session)
+    mock_httpx_client = mocker.MagicMock()
+    mock_httpx_client.request.return_value = httpx.Response(
+        status_code=HTTPStatus.OK,
+        json={
+            "success": True,
+            "message": "ok",
+            "results": [
+                {"score": 0.9, "dataChunk": "a", "chunkMetadata": {}},
+                {"score": 0.8, "dataChunk": "b", "chunkMetadata": {}},
+            ],
+        },
+    )
+    mock_session.get_httpx_client.return_value = mock_httpx_client
+
+    result = SimilaritySearchAPI(session=mock_session).search(
+        collection_name="test_collection",
+        query="test_query",
+        access_key="ak",
+        secret_key="sk",
+        top_k=2,
+    )
+
+    assert len(result) == 2
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert set(spans) == {
+        "SimilaritySearchAPI.search",
+        "pydi.http.request",
+        "pydi.validate",
+    }
+
+    root = spans["SimilaritySearchAPI.search"]
+    assert root.attributes[tracing.ATTR_COLLECTION_NAME] == "test_collection"
+    assert root.attributes[tracing.ATTR_TOP_K] == 2
+    assert root.attributes[tracing.ATTR_RESULT_COUNT] == 2
+    for name in ("pydi.http.request", "pydi.validate"):
+        assert spans[name].parent.span_id == root.context.span_id
+
+    request_span = spans["pydi.http.request"]
+    assert request_span.attributes[tracing.ATTR_HTTP_METHOD] == "POST"
+    assert request_span.attributes[tracing.ATTR_HTTP_STATUS_CODE] == 200
+
+    # W3C trace context is propagated to the server
+    headers = mock_httpx_client.request.call_args.kwargs["headers"]
+    assert headers["traceparent"].split("-")[1] == format(root.context.trace_id, "032x")
+
+
+def test_refresh_and_retry_spans(mocker, exporter):
+    from pydi_client.api.utils import execute_with_retry
+    from pydi_client.sessions.authenticated_session import AuthenticatedSession
+
+    session = AuthenticatedSession(
+        uri="http://example.com", token="old", username="user", password="pass"
+    )
+    request_func = mocker.MagicMock(
+        side_effect=[
+            httpx.Response(status_code=HTTPStatus.UNAUTHORIZED),
+            httpx.Response(status_code=HTTPStatus.OK),
+        ]
+    )
+    mocker.patch(
+        "pydi_client.api.auth.AuthAPI.login",
+        return_value=mocker.MagicMock(token="new"),
+    )
+    mocker.patch.object(
+        AuthenticatedSession,
+        "get_httpx_client",
+        return_value=mocker.MagicMock(request=request_func),
+    )
+
+    with tracing.start_span("parent") as parent:
+        response = execute_with_retry(
+            session, request_func, method="get", url="/api/v1/models"
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert session.token == "new"
+    spans = exporter.get_finished_spans()
+    assert [span.name for span in spans] == [
+        "pydi.http.request",
+        "AuthAPI.refresh",
+        "pydi.http.request",
+        "parent",
+    ]
+    first, refresh, retry, _ = spans
+    for span in (first, refresh, retry):
+        assert span.parent.span_id == parent.context.span_id
+    assert first.attributes[tracing.ATTR_ATTEMPT] == 1
+    assert first.attributes[tracing.ATTR_HTTP_STATUS_CODE] == 401
+    assert retry.attributes[tracing.ATTR_ATTEMPT] == 2
+    assert retry.attributes[tracing.ATTR_HTTP_STATUS_CODE] == 200
+    assert retry.attributes[tracing.ATTR_HTTP_METHOD] == "GET"
+    assert retry.attributes[tracing.ATTR_URL_PATH] == "/api/v1/models"
+
+
+@pytest.mark.parametrize("record_username", [False, True])
+def test_username_recording_is_opt_in(monkeypatch, exporter, record_username):
+    from pydi_client.api.auth import AuthAPI
+    from pydi_client.testing import FakeDIServer
+
+    monkeypatch.setattr(tracing, "record_username", record_username)
+    server = FakeDIServer()
+
+    with AuthAPI.login(
+        uri=server.uri,
+        username=server.username,
+        password=server.password,
+        httpx_args={"transport": server.transport()},
+    ):
+        pass
+
+    (span,) = [
+        span for span in exporter.get_finished_spans() if span.name == "AuthAPI.login"
+    ]
+    if record_username:
+        assert span.attributes[tracing.ATTR_USERNAME] == server.username
+    else:
+        assert tracing.ATTR_USERNAME not in span.attributes
+
+
+def test_bytes_on_the_wire(exporter):
+    from pydi_client.sessions.compression import Compression
+    from pydi_client.testing import FakeDIServer
+
+    server = make_server(compression=True)
+    client = server.client(compression=Compression())
+
+    client.similarity_search(
+        collection_name="docs", query="q", top_k=50, access_key="ak", secret_key="sk"
+    )
+
+    (span,) = [
+        span
+        for span in exporter.get_finished_spans()
+        if span.name == "pydi.http.request"
+    ]
+    attributes = span.attributes
+    assert attributes[tracing.ATTR_REQUEST_BODY_SIZE] > 0
+    assert attributes[tracing.ATTR_RESPONSE_CONTENT_ENCODING] == "gzip"
+    assert (
+        attributes[tracing.ATTR_RESPONSE_DECODED_SIZE]
+        > 10 * attributes[tracing.ATTR_RESPONSE_BODY_SIZE]
+    )
+
+
+def test_noop_without_opentelemetry(monkeypatch):
+    monkeypatch.setattr(tracing, "otel_trace", None)
+    monkeypatch.setattr(tracing, "otel_propagate", None)
+
+    def func():
+        return 42
+
+    assert tracing.traced()(func) is func
+    assert not tracing.is_enabled()
+    with tracing.start_span("span", {"a": 1}) as span:
+        assert span is None
+    tracing.set_current_attributes({"a": 1})
+    assert tracing.inject_trace_context({"x": "y"}) == {"x": "y"}
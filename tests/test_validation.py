@@ -0,0 +1,148 @@
+# Copyright Hewlett Packard Enterprise Development LP
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from pydi_client.api.search import SimilaritySearchAPI
+from pydi_client.api.utils import _type_adapter, build_response
+from pydi_client.data.collection_manager import ListCollection, ListCollectionItem
+from pydi_client.data.pipeline import (
+    BucketUpdateResponse,
+    NodeWithScore,
+    V1SimilaritySearchResponse,
+)
+from pydi_client.errors import UnexpectedResponse
+from pydi_client.sessions.session import Session
+from conftest import make_server
+
+
+MODES = ("strict", "lenient", "trusted")
+
+
+def _response(content):
+    if isinstance(content, bytes):
+        return httpx.Response(200, content=content)
+    return httpx.Response(200, json=content)
+
+
+@pytest.mark.parametrize("validation", MODES)
+def test_models_are_built_in_every_mode(validation):
+    search = build_response(
+        response=_response(
+            {
+                "success": True,
+                "message": "ok",
+                "results": [
+                    {"score": 0.5, "dataChunk": "a", "chunkMetadata": {"k": 1}}
+                ],
+            }
+        ),
+        response_cls=V1SimilaritySearchResponse,
+        validation=validation,
+    )
+    assert isinstance(search, V1SimilaritySearchResponse)
+    assert isinstance(search.results[0], NodeWithScore)
+    assert search.results[0].chunkMetadata == {"k": 1}
+
+    collections = build_response(
+        response=_response([{"id": "1", "name": "docs"}]),
+        response_cls=ListCollection,
+        validation=validation,
+    )
+    assert isinstance(collections, ListCollection)
+    assert collections.root == [ListCollectionItem(id="1", name="docs")]
+
+
+def test_strict_rejects_coercion():
+    response = _response({"success": "true", "message": "ok"})
+
+    assert build_response(response=response, response_cls=BucketUpdateResponse).success
+    with pytest.raises(ValidationError):
+        build_response(
+            response=response, response_cls=BucketUpdateResponse, validation="strict"
+        )
+
+
+def test_trusted_responses_are_validated_like_lenient_ones():
+    response = _response({"success": "true", "message": "ok", "results": [{}]})
+
+    with pytest.raises(ValidationError):
+        build_response(
+            response=response,
+            response_cls=V1SimilaritySearchResponse,
+            validation="trusted",
+        )
+
+
+@pytest.mark.parametrize("validation", MODES)
+@pytest.mark.parametrize("content", [b"<html>bad gateway</html>", [1, 2]])
+def test_unexpected_body(validation, content):
+    with pytest.raises(UnexpectedResponse):
+        build_response(
+            response=_response(content),
+            response_cls=BucketUpdateResponse,
+            validation=validation,
+        )
+
+
+def test_invalid_field_raises_validation_error():
+    with pytest.raises(ValidationError):
+        build_response(
+            response=_response({"success": True}), response_cls=BucketUpdateResponse
+        )
+
+
+def test_type_adapters_are_cached():
+    assert _type_adapter(ListCollection) is _type_adapter(ListCollection)
+
+
+def test_unknown_validation_mode():
+    with pytest.raises(ValueError):
+        Session(uri="http://example.com", validation="fast")
+
+
+@pytest.mark.parametrize("validation", ("strict", "trusted"))
+def test_client_validation_mode(validation):
+    server = make_server(buckets=["b1"])
+    kwargs = dict(
+        collection_name="docs", query="q", top_k=5, access_key="ak", secret_key="sk"
+    )
+
+    client = server.client(validation=validation)
+    assert client.similarity_search(**kwargs) == server.client().similarity_search(
+        **kwargs
+    )
+    assert client.get_collection(name="docs").buckets == ["b1"]
+
+    admin = server.admin_client(validation=validation)
+    assert admin.authenticated_session.validation == validation
+    assert admin.get_all_collections().root[0].name == "docs"
+
+
+@pytest.mark.parametrize(
+    "validation, expected",
+    [
+        ("lenient", {"score": 0.5, "dataChunk": "a", "chunkMetadata": {}}),
+        # trusted results are returned as decoded, without the defaults of the models
+        ("trusted", {"score": 0.5, "dataChunk": "a"}),
+    ],
+)
+def test_trusted_search_results_are_not_defaulted(validation, expected):
+    payload = {
+        "success": True,
+        "message": "ok",
+        "results": [{"score": 0.5, "dataChunk": "a"}],
+    }
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=payload))
+    session = Session(
+        uri="http://example.com",
+        validation=validation,
+        httpx_args={"transport": transport},
+    )
+
+    results = SimilaritySearchAPI(session).search(
+        access_key="ak", secret_key="sk", collection_name="docs", query="q", top_k=1
+    )
+
+    assert results == [expected]